@@ -0,0 +1,86 @@
+"""Create core tables (users, boards, lists, cards)
+
+Revision ID: 20260107190000
+Revises:
+Create Date: 2026-01-07 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20260107190000'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def has_table(name: str) -> bool:
+    # Databases built with create_all before migrations existed already have these tables
+    if op.get_context().as_sql:
+        return False
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    if not has_table('users'):
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('username', sa.String(), nullable=False),
+            sa.Column('email', sa.String(), nullable=False),
+            sa.Column('password_hash', sa.String(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+        op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+
+    if not has_table('boards'):
+        op.create_table(
+            'boards',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('title', sa.String(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_boards_id'), 'boards', ['id'], unique=False)
+
+    if not has_table('lists'):
+        op.create_table(
+            'lists',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('title', sa.String(), nullable=False),
+            sa.Column('board_id', sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(['board_id'], ['boards.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_lists_id'), 'lists', ['id'], unique=False)
+
+    if not has_table('cards'):
+        op.create_table(
+            'cards',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('title', sa.String(), nullable=False),
+            sa.Column('list_id', sa.Integer(), nullable=True),
+            sa.Column('status', sa.String(), nullable=True),
+            sa.Column('order', sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(['list_id'], ['lists.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_cards_id'), 'cards', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_cards_id'), table_name='cards')
+    op.drop_table('cards')
+    op.drop_index(op.f('ix_lists_id'), table_name='lists')
+    op.drop_table('lists')
+    op.drop_index(op.f('ix_boards_id'), table_name='boards')
+    op.drop_table('boards')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_table('users')
@@ -1,7 +1,7 @@
 """Add worklogs table
 
 Revision ID: 20260107190928
-Revises:
+Revises: 20260107190000
 Create Date: 2026-01-07 19:09:28.000000
 
 """
@@ -13,12 +13,22 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision: str = '20260107190928'
-down_revision: Union[str, None] = None
+down_revision: Union[str, None] = '20260107190000'
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
+def has_table(name: str) -> bool:
+    # Databases built with create_all before migrations existed already have this table
+    if op.get_context().as_sql:
+        return False
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
 def upgrade() -> None:
+    if has_table('worklogs'):
+        return
+
     # Create worklogs table
     op.create_table(
         'worklogs',
@@ -0,0 +1,67 @@
+"""Add foreign key and composite indexes
+
+Revision ID: 20261017110000
+Revises: 20261017100000
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261017110000'
+down_revision: Union[str, None] = '20261017100000'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index, table, columns): ownership checks, board/list listings, reordering,
+# worklogs per card and per user-week, and the weekly reports
+INDEXES = [
+    ('ix_boards_user_id', 'boards', ['user_id']),
+    ('ix_lists_board_id', 'lists', ['board_id']),
+    ('ix_cards_list_id_order', 'cards', ['list_id', 'order']),
+    ('ix_worklogs_card_id_date', 'worklogs', ['card_id', 'date']),
+    ('ix_worklogs_user_id_date', 'worklogs', ['user_id', 'date']),
+]
+
+
+def _drop_invalid_index(name: str) -> None:
+    # A CREATE INDEX CONCURRENTLY that failed leaves an INVALID index behind; IF NOT EXISTS would keep it
+    if op.get_context().as_sql:
+        return
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {'name': name}
+    ).first()
+    if invalid:
+        op.drop_index(name, postgresql_concurrently=True, if_exists=True)
+
+
+def upgrade() -> None:
+    # Tables created with create_all already have these indexes: IF NOT EXISTS skips them
+    if op.get_bind().dialect.name == 'postgresql':
+        # CONCURRENTLY does not lock writes but cannot run inside a transaction
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                _drop_invalid_index(name)
+                op.create_index(name, table, columns, unique=False, if_not_exists=True, postgresql_concurrently=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+    else:
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,38 @@
+"""Add expires_at to api_keys
+
+Revision ID: 20261017120000
+Revises: 20261017110000
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from datetime import datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261017120000'
+down_revision: Union[str, None] = '20261017110000'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Keys created before expiry existed keep working for the default API_KEY_TTL_DAYS
+EXISTING_KEYS_TTL_DAYS = 90
+
+
+def upgrade() -> None:
+    if op.get_context().as_sql or 'expires_at' not in {
+        column['name'] for column in sa.inspect(op.get_bind()).get_columns('api_keys')
+    }:
+        op.add_column('api_keys', sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute(
+        sa.text("UPDATE api_keys SET expires_at = :expires_at WHERE expires_at IS NULL").bindparams(
+            expires_at=datetime.utcnow() + timedelta(days=EXISTING_KEYS_TTL_DAYS)
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('api_keys', 'expires_at')
@@ -0,0 +1,20 @@
+"""Benchmarks de rendimiento del backend.
+
+Se ejecutan como módulos desde la raíz del repositorio, por ejemplo:
+
+    python -m backend.benchmarks.auth_overhead
+"""
+import os
+import tempfile
+
+# DATABASE_URL indicada por el usuario (antes de poner la de por defecto): los
+# benchmarks que siembran datos usan una base nueva propia si no la hay
+USER_DATABASE_URL = os.getenv("DATABASE_URL")
+
+# backend.core.config exige estas variables; si no se indican, los benchmarks
+# trabajan sobre una base SQLite temporal.
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.gettempdir(), 'neocare_bench.db')}"
+)
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-not-for-production")
@@ -0,0 +1,84 @@
+"""Coste por request de get_current_user con y sin caches de autenticación.
+
+    python -m backend.benchmarks.auth_overhead --iterations 5000
+"""
+import argparse
+import time
+import uuid
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from backend.core.config import Base, SessionLocal, engine
+from backend.models import board, card, list as list_model, worklog  # noqa: F401 (registrar tablas)
+from backend.models.user import User
+from backend.routers import auth
+
+
+def _create_user(db) -> User:
+    user = User(
+        username="bench",
+        email=f"bench-{uuid.uuid4().hex[:8]}@neocare.test",
+        password_hash="not-a-real-hash"
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def _run(credentials, iterations: int) -> float:
+    """Devuelve microsegundos por request"""
+    db = SessionLocal()
+    try:
+        auth.get_current_user(credentials, db)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            auth.get_current_user(credentials, db)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+    return elapsed / iterations * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = _create_user(db)
+        token = auth.create_access_token({
+            "sub": user.email,
+            "user_id": user.id,
+            "username": user.username
+        })
+    finally:
+        db.close()
+
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    caches = (auth.token_cache, auth.user_cache)
+    sizes = [cache.maxsize for cache in caches]
+
+    # Sin cache: jwt.decode + SELECT por primary key en cada request
+    for cache in caches:
+        cache.clear()
+        cache.maxsize = 0
+    uncached = _run(credentials, args.iterations)
+
+    for cache, size in zip(caches, sizes):
+        cache.maxsize = size
+    cached = _run(credentials, args.iterations)
+
+    print(f"Base de datos: {engine.url.render_as_string(hide_password=True)}")
+    print(f"Iteraciones:   {args.iterations}")
+    print(f"Sin cache:     {uncached:10.1f} µs/request")
+    print(f"Con cache:     {cached:10.1f} µs/request")
+    print(f"Mejora:        {uncached / cached:10.1f}x")
+    print(f"Token cache:   {auth.token_cache.stats()}")
+    print(f"User cache:    {auth.user_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
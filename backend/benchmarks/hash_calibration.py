@@ -0,0 +1,74 @@
+"""Calibración del coste de hashing de contraseñas en la máquina actual.
+
+Mide el tiempo de verify y recomienda el coste (PBKDF2_ROUNDS o
+BCRYPT_ROUNDS) más alto que cumple la latencia objetivo:
+
+    python -m backend.benchmarks.hash_calibration --target-ms 50
+"""
+import argparse
+import statistics
+import time
+
+from backend.core.config import PASSWORD_HASH_SCHEME, PBKDF2_ROUNDS, BCRYPT_ROUNDS
+from backend.core.hashing import build_context
+
+PASSWORD = "Calibracion2026"
+
+
+def measure_verify_ms(scheme: str, rounds: int, samples: int) -> float:
+    """Mediana en milisegundos de un verify con el coste indicado"""
+    if scheme == "bcrypt":
+        context = build_context(scheme, bcrypt_rounds=rounds)
+    else:
+        context = build_context(scheme, pbkdf2_rounds=rounds)
+    password_hash = context.hash(PASSWORD)
+
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.verify(PASSWORD, password_hash)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def recommend_pbkdf2(target_ms: float, samples: int) -> int:
+    # El coste de PBKDF2 es lineal en el número de iteraciones
+    probe = 20000
+    per_round = measure_verify_ms("pbkdf2_sha256", probe, samples) / probe
+    return max(1000, int(target_ms / per_round) // 1000 * 1000)
+
+
+def recommend_bcrypt(target_ms: float, samples: int) -> int:
+    # bcrypt duplica el coste con cada round; se sube mientras quepa en el objetivo
+    rounds = 4
+    while rounds < 20 and measure_verify_ms("bcrypt", rounds + 1, samples) <= target_ms:
+        rounds += 1
+    return rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=50.0, help="Latencia objetivo por verify")
+    parser.add_argument("--scheme", choices=["pbkdf2_sha256", "bcrypt"], default=PASSWORD_HASH_SCHEME)
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.scheme == "bcrypt":
+        current, variable = BCRYPT_ROUNDS, "BCRYPT_ROUNDS"
+        recommended = recommend_bcrypt(args.target_ms, args.samples)
+    else:
+        current, variable = PBKDF2_ROUNDS, "PBKDF2_ROUNDS"
+        recommended = recommend_pbkdf2(args.target_ms, args.samples)
+
+    current_ms = measure_verify_ms(args.scheme, current, args.samples)
+    recommended_ms = measure_verify_ms(args.scheme, recommended, args.samples)
+
+    print(f"Esquema:      {args.scheme}")
+    print(f"Objetivo:     {args.target_ms:.1f} ms por verify")
+    print(f"Actual:       {variable}={current} -> {current_ms:.1f} ms")
+    print(f"Recomendado:  {variable}={recommended} -> {recommended_ms:.1f} ms")
+    print("Los hashes existentes se regeneran con el nuevo coste en el siguiente login.")
+
+
+if __name__ == "__main__":
+    main()
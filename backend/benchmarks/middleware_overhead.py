@@ -0,0 +1,115 @@
+"""Sobrecoste por request del middleware de logging: BaseHTTPMiddleware frente a ASGI puro.
+
+Llama a la aplicación ASGI directamente (sin servidor ni cliente HTTP) con
+un endpoint trivial, así la diferencia es solo la del middleware:
+
+    python -m backend.benchmarks.middleware_overhead --requests 20000
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from fastapi import FastAPI, Request
+
+from backend.core.timing import TimingMiddleware
+
+
+def _bare_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    return app
+
+
+def _base_http_app() -> FastAPI:
+    # Réplica del antiguo log_requests de main.py
+    app = _bare_app()
+    logger = logging.getLogger("neocare")
+
+    @app.middleware("http")
+    async def log_requests(request: Request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        logger.info(
+            f"{request.method} {request.url.path} - "
+            f"Status: {response.status_code} - "
+            f"Time: {process_time:.3f}s"
+        )
+        response.headers["X-Process-Time"] = str(process_time)
+        return response
+
+    return app
+
+
+def _asgi_app() -> FastAPI:
+    app = _bare_app()
+    app.add_middleware(TimingMiddleware)
+    return app
+
+
+async def _call(app, scope):
+    received = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal received
+        if received:
+            # Como un servidor real: la desconexión llega tras enviar la respuesta
+            await finished.wait()
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            finished.set()
+
+    await app(dict(scope), receive, send)
+
+
+async def _run(app, requests: int) -> float:
+    """Devuelve microsegundos por request"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/ping", "raw_path": b"/ping", "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1234), "server": ("bench", 80),
+    }
+    for _ in range(200):
+        await _call(app, scope)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await _call(app, scope)
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    # Medir el middleware, no el handler de logging
+    logging.getLogger("neocare").setLevel(logging.WARNING)
+
+    results = {}
+    for name, factory in (
+        ("sin middleware", _bare_app),
+        ("@app.middleware('http')", _base_http_app),
+        ("TimingMiddleware (ASGI)", _asgi_app),
+    ):
+        results[name] = asyncio.run(_run(factory(), args.requests))
+
+    baseline = results["sin middleware"]
+    print(f"{args.requests} requests GET /ping llamando a la app ASGI directamente")
+    for name, us in results.items():
+        print(f"  {name:<26} {us:8.1f} µs/request   sobrecoste {us - baseline:+7.1f} µs")
+    saved = results["@app.middleware('http')"] - results["TimingMiddleware (ASGI)"]
+    print(f"Ahorro por request: {saved:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
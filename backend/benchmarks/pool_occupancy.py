@@ -0,0 +1,271 @@
+"""Ocupación de los pools de conexiones bajo carga, con y sin DB_SESSION_EARLY_RELEASE.
+
+Arranca la aplicación con uvicorn en este proceso (uno por modo, porque la
+configuración se lee al importar), la carga con clientes concurrentes sobre
+una mezcla de endpoints de lectura y mide con los eventos checkout/checkin
+de cada pool cuánto tiempo pasa cada conexión fuera del pool y cuántas hay
+prestadas de media:
+
+    python -m backend.benchmarks.pool_occupancy --duration 10 --concurrency 16
+    DATABASE_URL=postgresql://... python -m backend.benchmarks.pool_occupancy --user-cache-ttl 0
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from typing import Dict, List, Tuple
+
+from backend.benchmarks import USER_DATABASE_URL
+
+MODES = ("false", "true")
+
+
+class PoolOccupancy:
+    """Conexiones prestadas por pool: media ponderada en el tiempo, pico y duración de cada préstamo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools: Dict[str, dict] = {}
+
+    def install(self, engine, label: str) -> None:
+        from sqlalchemy import event
+
+        state = self._pools[label] = {"in_use": 0, "peak": 0, "area": 0.0, "last": time.perf_counter(), "holds": []}
+
+        @event.listens_for(engine, "checkout")
+        def _checkout(dbapi_connection, record, proxy):
+            now = time.perf_counter()
+            record.info["benchmark_checkout"] = now
+            with self._lock:
+                self._advance(state, now)
+                state["in_use"] += 1
+                state["peak"] = max(state["peak"], state["in_use"])
+
+        @event.listens_for(engine, "checkin")
+        def _checkin(dbapi_connection, record):
+            now = time.perf_counter()
+            start = record.info.pop("benchmark_checkout", None)
+            with self._lock:
+                self._advance(state, now)
+                state["in_use"] = max(0, state["in_use"] - 1)
+                if start is not None:
+                    state["holds"].append(now - start)
+
+    @staticmethod
+    def _advance(state: dict, now: float) -> None:
+        state["area"] += state["in_use"] * (now - state["last"])
+        state["last"] = now
+
+    def reset(self) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            for state in self._pools.values():
+                state.update(peak=state["in_use"], area=0.0, last=now, holds=[])
+
+    def summary(self, elapsed: float) -> Dict[str, dict]:
+        now = time.perf_counter()
+        result = {}
+        with self._lock:
+            for label, state in self._pools.items():
+                self._advance(state, now)
+                holds = sorted(state["holds"])
+                result[label] = {
+                    "mean_in_use": state["area"] / elapsed,
+                    "connection_seconds": state["area"],
+                    "peak_in_use": state["peak"],
+                    "checkouts": len(holds),
+                    "hold_p50_ms": _percentile(holds, 0.5) * 1000,
+                    "hold_p95_ms": _percentile(holds, 0.95) * 1000,
+                }
+        return result
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _request(connection: http.client.HTTPConnection, method: str, path: str, headers: dict, body=None):
+    payload = json.dumps(body).encode() if body is not None else None
+    connection.request(method, path, body=payload, headers={**headers, "Content-Type": "application/json"})
+    response = connection.getresponse()
+    data = response.read()
+    if response.status >= 400:
+        raise RuntimeError(f"{method} {path}: {response.status} {data[:200]!r}")
+    return json.loads(data) if data else None
+
+
+def _seed(port: int) -> Tuple[dict, List[str]]:
+    # Un usuario con un board, una lista, tarjetas y horas: todos los endpoints devuelven datos
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+    _request(connection, "POST", "/auth/register", {}, {"username": "bench", "email": email, "password": "Passw0rd!"})
+    token = _request(connection, "POST", "/auth/login", {}, {"email": email, "password": "Passw0rd!"})["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    board_id = _request(connection, "GET", "/boards/", headers)[0]["id"]
+    list_id = _request(connection, "POST", "/lists/", headers, {"title": "Bench", "board_id": board_id})["id"]
+    for index in range(5):
+        card_id = _request(connection, "POST", "/cards/", headers, {"title": f"Card {index}", "list_id": list_id})["id"]
+        _request(connection, "POST", f"/cards/{card_id}/worklogs", headers,
+                 {"date": time.strftime("%Y-%m-%d"), "hours": 1, "note": "bench"})
+    connection.close()
+    return headers, [
+        "/auth/me",                          # síncrono, solo autenticación
+        "/auth/api-keys",                    # síncrono, una consulta
+        "/health/metrics",                   # síncrono, varias consultas
+        "/boards/",                          # async
+        "/cards/",                           # async
+        f"/report/{board_id}/summary",       # async, agregaciones
+        "/users/me/worklogs",                # async
+    ]
+
+
+def _load(port: int, headers: dict, paths: List[str], concurrency: int, duration: float) -> dict:
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(offset: int):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        own: List[float] = []
+        index = offset
+        while time.perf_counter() < deadline:
+            path = paths[index % len(paths)]
+            index += 1
+            start = time.perf_counter()
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 400:
+                    with lock:
+                        errors[0] += 1
+            except (OSError, http.client.HTTPException):
+                with lock:
+                    errors[0] += 1
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                continue
+            own.append(time.perf_counter() - start)
+        connection.close()
+        with lock:
+            latencies.extend(own)
+
+    threads = [threading.Thread(target=client, args=(offset,)) for offset in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": len(latencies) / duration,
+        "latency_p50_ms": _percentile(latencies, 0.5) * 1000,
+        "latency_p95_ms": _percentile(latencies, 0.95) * 1000,
+    }
+
+
+def run_child(args) -> None:
+    import uvicorn
+
+    from backend.core.config import Base, engine, get_async_engine
+    from backend.main import app
+
+    Base.metadata.create_all(bind=engine)
+    occupancy = PoolOccupancy()
+    occupancy.install(engine, "sync")
+    occupancy.install(get_async_engine().sync_engine, "async")
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    try:
+        headers, paths = _seed(port)
+        _load(port, headers, paths, args.concurrency, min(1.0, args.duration))  # calentamiento
+        occupancy.reset()
+        start = time.perf_counter()
+        result = _load(port, headers, paths, args.concurrency, args.duration)
+        result["pools"] = occupancy.summary(time.perf_counter() - start)
+    finally:
+        server.should_exit = True
+        thread.join()
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10, help="Segundos de carga por modo")
+    parser.add_argument("--concurrency", type=int, default=16, help="Clientes simultáneos")
+    parser.add_argument("--user-cache-ttl", type=int, default=None,
+                        help="USER_CACHE_TTL_SECONDS (0 = cada request consulta el usuario)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(args)
+        return
+
+    # Sin DATABASE_URL explícita, una base nueva: la compartida de los benchmarks puede traer datos de otras pasadas
+    database_url = USER_DATABASE_URL or "sqlite:///" + os.path.join(
+        tempfile.mkdtemp(prefix="neocare_pool_"), "pool.db"
+    )
+    print(f"Base de datos: {database_url.split('@')[-1]}")
+    print(f"Carga:         {args.concurrency} clientes durante {args.duration:.0f}s por modo\n")
+
+    results = {}
+    for mode in MODES:
+        env = dict(os.environ)
+        env.setdefault("SECRET_KEY", "pool-benchmark-" + "x" * 32)
+        env.update(
+            DATABASE_URL=database_url, DB_SESSION_EARLY_RELEASE=mode, RATE_LIMIT_ENABLED="false",
+            LOG_LEVEL="WARNING", PASSWORD_HASH_WORKERS="0", METRICS_MULTIPROC_DIR=""
+        )
+        if args.user_cache_ttl is not None:
+            env["USER_CACHE_TTL_SECONDS"] = str(args.user_cache_ttl)
+        command = [sys.executable, "-m", "backend.benchmarks.pool_occupancy", "--child",
+                   "--duration", str(args.duration), "--concurrency", str(args.concurrency)]
+        output = subprocess.run(command, env=env, capture_output=True, text=True, check=True).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"{'DB_SESSION_EARLY_RELEASE':<26}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'errores':>9}")
+    for mode in MODES:
+        r = results[mode]
+        print(f"  {mode:<24}{r['rps']:9.0f}{r['latency_p50_ms']:9.1f}{r['latency_p95_ms']:9.1f}{r['errors']:9d}")
+
+    # ms de conexión por request: la ocupación normalizada por el throughput de cada modo
+    print(f"\n{'Pool':<7}{'modo':<7}{'prestadas (media)':>18}{'pico':>6}{'préstamo p50':>14}{'p95':>10}"
+          f"{'ms conexión/req':>17}")
+    for label in ("sync", "async"):
+        per_request = {}
+        for mode in MODES:
+            r = results[mode]
+            pool = r["pools"][label]
+            per_request[mode] = pool["connection_seconds"] * 1000 / max(r["requests"], 1)
+            print(f"{label:<7}{mode:<7}{pool['mean_in_use']:18.2f}{pool['peak_in_use']:6d}"
+                  f"{pool['hold_p50_ms']:11.2f} ms{pool['hold_p95_ms']:7.2f} ms{per_request[mode]:17.3f}")
+        if per_request["false"]:
+            reduction = (1 - per_request["true"] / per_request["false"]) * 100
+            print(f"{'':<14}tiempo de conexión por request: {reduction:.1f}% menos con liberación temprana")
+
+
+if __name__ == "__main__":
+    main()
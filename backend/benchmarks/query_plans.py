@@ -0,0 +1,305 @@
+"""Planes de ejecución y latencia de cada endpoint antes y después de los índices de FK.
+
+Crea el esquema sin los índices de la migración 20261017110000, siembra un
+volumen grande de datos (usuarios, boards, listas, tarjetas y horas), llama
+a cada endpoint de lectura (y al reordenado de tarjetas) con un usuario
+sembrado, captura sus sentencias SQL y las explica (``EXPLAIN QUERY PLAN``
+en SQLite, ``EXPLAIN (FORMAT JSON)`` en PostgreSQL). Después crea los
+índices, ejecuta ANALYZE y repite:
+
+    python -m backend.benchmarks.query_plans --users 2000
+    DATABASE_URL=postgresql://.../neocare_bench python -m backend.benchmarks.query_plans
+
+Borra y vuelve a crear las tablas: usar siempre una base de datos desechable.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+# Índices que añade la migración 20261017110000 (los mismos que declaran los modelos)
+BENCHMARK_INDEXES = (
+    "ix_boards_user_id",
+    "ix_lists_board_id",
+    "ix_cards_list_id_order",
+    "ix_worklogs_card_id_date",
+    "ix_worklogs_user_id_date",
+)
+CHUNK = 10000
+
+
+def _configure_environment() -> str:
+    from backend.benchmarks import USER_DATABASE_URL
+
+    # Sin DATABASE_URL explícita, una base nueva (no la compartida de los benchmarks)
+    database_url = USER_DATABASE_URL or "sqlite:///" + os.path.join(
+        tempfile.mkdtemp(prefix="neocare_plans_"), "plans.db"
+    )
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("SECRET_KEY", "query-plans-benchmark-" + "x" * 32)
+    os.environ.update(
+        RATE_LIMIT_ENABLED="false", LOG_LEVEL="WARNING", PASSWORD_HASH_WORKERS="0", METRICS_MULTIPROC_DIR="",
+        SLOW_QUERY_EXPLAIN="false", SLOW_QUERY_THRESHOLD_MS="1000000", SQL_BUDGET_MODE="warn",
+        DATABASE_REPLICA_URLS=""
+    )
+    return database_url
+
+
+def _indexes():
+    from backend.core.config import Base
+
+    return [
+        index
+        for table in Base.metadata.tables.values()
+        for index in table.indexes
+        if index.name in BENCHMARK_INDEXES
+    ]
+
+
+def _analyze(engine) -> None:
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+
+
+def _seed(engine, owner_id: int, owner_board_id: int, args) -> Dict[str, int]:
+    """Inserta los datos con ids explícitos; el usuario del benchmark recibe la misma forma de datos"""
+    from sqlalchemy import insert
+
+    from backend.models.board import Board
+    from backend.models.card import Card
+    from backend.models.list import List
+    from backend.models.user import User
+    from backend.models.worklog import Worklog
+
+    rng = random.Random(42)
+    today = date.today()
+    users, boards, lists, cards, worklogs = [], [], [], [], []
+    next_ids = {"user": owner_id + 1, "board": owner_board_id + 1, "list": 1, "card": 1, "worklog": 1}
+
+    def add_board(board_id: int, user_id: int):
+        for _ in range(args.lists):
+            list_id = next_ids["list"]
+            next_ids["list"] += 1
+            lists.append({"id": list_id, "title": f"Lista {list_id}", "board_id": board_id})
+            for position in range(args.cards):
+                card_id = next_ids["card"]
+                next_ids["card"] += 1
+                cards.append({
+                    "id": card_id, "title": f"Tarjeta {card_id}", "list_id": list_id,
+                    "status": rng.choice(("todo", "doing", "done")), "order": position,
+                })
+                for _ in range(args.worklogs):
+                    worklogs.append({
+                        "id": next_ids["worklog"], "card_id": card_id, "user_id": user_id,
+                        "date": today - timedelta(days=rng.randrange(182)), "hours": rng.choice((0.5, 1, 2, 4)),
+                        "note": None,
+                    })
+                    next_ids["worklog"] += 1
+
+    add_board(owner_board_id, owner_id)
+    for _ in range(1, args.users):
+        user_id = next_ids["user"]
+        next_ids["user"] += 1
+        users.append({
+            "id": user_id, "username": f"user{user_id}", "email": f"user{user_id}@example.com",
+            "password_hash": "!",
+        })
+        for _ in range(args.boards):
+            board_id = next_ids["board"]
+            next_ids["board"] += 1
+            boards.append({"id": board_id, "title": f"Board {board_id}", "user_id": user_id})
+            add_board(board_id, user_id)
+
+    with engine.begin() as connection:
+        for table, rows in ((User, users), (Board, boards), (List, lists), (Card, cards), (Worklog, worklogs)):
+            for start in range(0, len(rows), CHUNK):
+                connection.execute(insert(table.__table__), rows[start:start + CHUNK])
+    return {"users": args.users, "boards": len(boards) + 1, "lists": len(lists), "cards": len(cards),
+            "worklogs": len(worklogs)}
+
+
+class StatementCapture:
+    """Sentencias distintas ejecutadas por cada endpoint, con el engine que las ejecutó"""
+
+    def __init__(self):
+        self.current: Optional[str] = None
+        self.statements: Dict[str, Dict[str, tuple]] = {}
+
+    def install(self, engine, kind: str) -> None:
+        from sqlalchemy import event
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _capture(conn, cursor, statement, parameters, context, executemany):
+            if self.current is not None and statement.lstrip().upper().startswith("SELECT"):
+                self.statements.setdefault(self.current, {}).setdefault(statement, (kind, parameters))
+
+
+def _endpoints(board_id: int, card_id: int) -> List[Tuple[str, str, str, Optional[dict]]]:
+    return [
+        ("GET /boards/", "GET", "/boards/", None),
+        ("GET /boards/{id}", "GET", f"/boards/{board_id}", None),
+        ("GET /lists/board/{id}", "GET", f"/lists/board/{board_id}", None),
+        ("GET /cards/", "GET", "/cards/", None),
+        ("PUT /cards/{id} (orden)", "PUT", f"/cards/{card_id}", {"order": 0}),
+        ("GET /cards/{id}/worklogs", "GET", f"/cards/{card_id}/worklogs", None),
+        ("GET /users/me/worklogs", "GET", "/users/me/worklogs", None),
+        ("GET /report/{id}/summary", "GET", f"/report/{board_id}/summary", None),
+        ("GET /report/{id}/hours-by-user", "GET", f"/report/{board_id}/hours-by-user", None),
+        ("GET /report/{id}/hours-by-card", "GET", f"/report/{board_id}/hours-by-card", None),
+    ]
+
+
+def _measure(client, headers: dict, endpoints, capture: StatementCapture, repeat: int) -> Dict[str, float]:
+    latencies = {}
+    for name, method, path, body in endpoints:
+        capture.current = name
+        response = client.request(method, path, headers=headers, json=body)
+        capture.current = None
+        if response.status_code >= 400:
+            raise RuntimeError(f"{name}: {response.status_code} {response.text[:200]}")
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            client.request(method, path, headers=headers, json=body)
+            timings.append((time.perf_counter() - start) * 1000)
+        latencies[name] = statistics.median(timings)
+    return latencies
+
+
+def _summarize_postgres(plan: dict) -> List[str]:
+    nodes = []
+
+    def walk(node):
+        label = node["Node Type"]
+        if "Index Name" in node:
+            label += f" using {node['Index Name']}"
+        if "Relation Name" in node:
+            label += f" on {node['Relation Name']}"
+        if "Scan" in node["Node Type"]:
+            nodes.append(label)
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan["Plan"])
+    return nodes + [f"cost={plan['Plan']['Total Cost']:.0f}"]
+
+
+async def _explain_async(async_engine, statements) -> List[List[str]]:
+    plans = []
+    async with async_engine.connect() as connection:
+        for statement, parameters in statements:
+            plans.append(_plan_rows(
+                async_engine.dialect.name, await connection.exec_driver_sql(_explain_prefix(async_engine) + statement,
+                                                                            parameters)
+            ))
+    await async_engine.dispose()
+    return plans
+
+
+def _explain_prefix(engine) -> str:
+    return "EXPLAIN (FORMAT JSON) " if engine.dialect.name == "postgresql" else "EXPLAIN QUERY PLAN "
+
+
+def _plan_rows(dialect: str, result) -> List[str]:
+    rows = result.fetchall()
+    if dialect == "postgresql":
+        plan = rows[0][0]
+        return _summarize_postgres(plan[0] if isinstance(plan, list) else plan)
+    return [row[-1] for row in rows]
+
+
+def _explain(engine, async_engine, capture: StatementCapture) -> Dict[str, List[List[str]]]:
+    """Planes de cada sentencia capturada, explicada en el mismo engine (y paramstyle) que la ejecutó"""
+    plans: Dict[str, List[List[str]]] = {}
+    for name, statements in capture.statements.items():
+        sync = [(s, p) for s, (kind, p) in statements.items() if kind == "sync"]
+        async_ = [(s, p) for s, (kind, p) in statements.items() if kind == "async"]
+        endpoint_plans = []
+        with engine.connect() as connection:
+            for statement, parameters in sync:
+                endpoint_plans.append(_plan_rows(
+                    engine.dialect.name, connection.exec_driver_sql(_explain_prefix(engine) + statement, parameters)
+                ))
+        if async_:
+            endpoint_plans.extend(asyncio.run(_explain_async(async_engine, async_)))
+        plans[name] = endpoint_plans
+    return plans
+
+
+def _report(seeded: Dict[str, int], before: Dict[str, float], after: Dict[str, float],
+            plans_before: Dict[str, List[List[str]]], plans_after: Dict[str, List[List[str]]]) -> None:
+    print("Datos: " + ", ".join(f"{count} {name}" for name, count in seeded.items()) + "\n")
+    print(f"{'Endpoint':<34}{'sin índices':>13}{'con índices':>13}{'mejora':>9}")
+    for name in before:
+        speedup = before[name] / after[name] if after[name] else 0
+        print(f"{name:<34}{before[name]:10.2f} ms{after[name]:10.2f} ms{speedup:8.1f}x")
+
+    print("\nPlanes (una línea por sentencia SELECT del endpoint; la autenticación sale de cache):")
+    for name in before:
+        print(f"\n{name}")
+        for label, plans in (("antes", plans_before.get(name, [])), ("después", plans_after.get(name, []))):
+            for plan in plans:
+                print(f"  {label:<8} " + "; ".join(plan))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--boards", type=int, default=3, help="Boards por usuario")
+    parser.add_argument("--lists", type=int, default=4, help="Listas por board")
+    parser.add_argument("--cards", type=int, default=10, help="Tarjetas por lista")
+    parser.add_argument("--worklogs", type=int, default=3, help="Registros de horas por tarjeta")
+    parser.add_argument("--repeat", type=int, default=20, help="Llamadas medidas por endpoint")
+    args = parser.parse_args()
+    if os.getenv("ENVIRONMENT") == "production":
+        parser.error("borra y vuelve a crear las tablas: no se ejecuta con ENVIRONMENT=production")
+
+    database_url = _configure_environment()
+    from fastapi.testclient import TestClient
+
+    from backend.core.config import Base, engine, get_async_engine
+    from backend.main import app
+
+    print(f"Base de datos: {database_url.split('@')[-1]}")
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    for index in _indexes():
+        index.drop(bind=engine)
+
+    capture = StatementCapture()
+    capture.install(engine, "sync")
+    capture.install(get_async_engine().sync_engine, "async")
+
+    with TestClient(app) as client:
+        credentials = {"email": "bench@example.com", "password": "Passw0rd!"}
+        registered = client.post("/auth/register", json={"username": "bench", **credentials}).json()
+        token = client.post("/auth/login", json=credentials).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        start = time.perf_counter()
+        seeded = _seed(engine, registered["id"], registered["default_board_id"], args)
+        _analyze(engine)
+        print(f"Siembra: {time.perf_counter() - start:.1f}s\n")
+        card_id = client.get("/cards/", headers=headers).json()[-1]["id"]
+        endpoints = _endpoints(registered["default_board_id"], card_id)
+        before = _measure(client, headers, endpoints, capture, args.repeat)
+    plans_before = _explain(engine, get_async_engine(), capture)
+
+    for index in _indexes():
+        index.create(bind=engine)
+    _analyze(engine)
+    capture.statements.clear()
+
+    with TestClient(app) as client:
+        after = _measure(client, headers, endpoints, capture, args.repeat)
+    plans_after = _explain(engine, get_async_engine(), capture)
+
+    _report(seeded, before, after, plans_before, plans_after)
+
+
+if __name__ == "__main__":
+    main()
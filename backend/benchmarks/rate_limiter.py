@@ -0,0 +1,79 @@
+"""Comprobaciones por segundo y memoria del rate limiter con muchos clientes.
+
+Compara el token bucket actual con el limitador anterior (lista de
+datetimes por IP) repartiendo las comprobaciones entre N clientes:
+
+    python -m backend.benchmarks.rate_limiter --clients 100000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from backend.core.rate_limit import MemoryRateLimitBackend
+from backend.core.security import RateLimiter
+
+
+class ListRateLimiter:
+    """Algoritmo anterior: lista de datetimes por cliente, reconstruida en cada check"""
+
+    def __init__(self, requests: int, window: int):
+        self.requests = requests
+        self.window = window
+        self.clients = defaultdict(list)
+
+    def hit(self, key: str) -> bool:
+        now = datetime.utcnow()
+        self.clients[key] = [
+            req_time for req_time in self.clients[key]
+            if now - req_time < timedelta(seconds=self.window)
+        ]
+        if len(self.clients[key]) >= self.requests:
+            return False
+        self.clients[key].append(now)
+        return True
+
+
+def run(factory, keys) -> tuple:
+    limiter = factory()
+    start = time.perf_counter()
+    for key in keys:
+        limiter.hit(key)
+    checks_per_second = len(keys) / (time.perf_counter() - start)
+
+    # Segunda pasada con tracemalloc (lo ralentiza) solo para medir memoria
+    tracemalloc.start()
+    limiter = factory()
+    for key in keys:
+        limiter.hit(key)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return checks_per_second, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=100_000)
+    parser.add_argument("--checks", type=int, default=1_000_000)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--window", type=int, default=60)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    clients = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(args.clients)]
+    keys = [rng.choice(clients) for _ in range(args.checks)]
+
+    print(f"{args.checks} comprobaciones repartidas entre {args.clients} clientes "
+          f"(límite {args.requests}/{args.window}s)")
+    for name, factory in (
+        ("token bucket", lambda: RateLimiter(args.requests, args.window, MemoryRateLimitBackend())),
+        ("lista de datetimes", lambda: ListRateLimiter(args.requests, args.window)),
+    ):
+        checks_per_second, peak_mb = run(factory, keys)
+        print(f"  {name:20s} {checks_per_second:12,.0f} checks/s   pico de memoria {peak_mb:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Precisión y rendimiento del rate limiter con varios procesos (workers).
+
+Lanza N procesos que consumen del mismo cliente a la vez, como los workers
+de gunicorn detrás del mismo proxy, y compara las peticiones permitidas con
+el límite configurado. Con ``--event-loop`` cada proceso comprueba desde un
+event loop con ``--concurrency`` requests a la vez (como el middleware) y
+mide además cuánto se retrasa el loop; ``--inline`` llama al backend en el
+propio loop en lugar de en un hilo:
+
+    python -m backend.benchmarks.rate_limiter_workers --processes 4 --backend sqlite
+    python -m backend.benchmarks.rate_limiter_workers --processes 4 --backend sqlite --event-loop
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+from backend.core.config import RATE_LIMIT_SQLITE_TIMEOUT_MS
+from backend.core.rate_limit import create_backend
+from backend.core.security import RateLimiter
+
+
+async def _event_loop_worker(limiter: RateLimiter, checks: int, key: str, concurrency: int, inline: bool) -> tuple:
+    allowed = 0
+    latencies, lags = [], []
+    running = True
+
+    async def probe():
+        # Retraso del loop: lo que tarda en despertar una espera de 1 ms
+        while running:
+            start = time.perf_counter_ns()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter_ns() - start - 1_000_000)
+
+    async def client(count: int):
+        nonlocal allowed
+        for _ in range(count):
+            check_start = time.perf_counter_ns()
+            result = limiter.hit(key) if inline else await limiter.ahit(key)
+            if result[0]:
+                allowed += 1
+            latencies.append(time.perf_counter_ns() - check_start)
+            await asyncio.sleep(0)
+
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(client(checks // concurrency) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    running = False
+    await probe_task
+    return allowed, elapsed, latencies, lags
+
+
+def worker(args) -> tuple:
+    backend_name, sqlite_path, sqlite_timeout, redis_url, limit, window, checks, key, event_loop, concurrency, inline = args
+    limiter = RateLimiter(limit, window, create_backend(
+        backend_name, sqlite_path, redis_url, sqlite_timeout=sqlite_timeout
+    ))
+    if event_loop:
+        return asyncio.run(_event_loop_worker(limiter, checks, key, concurrency, inline))
+    allowed = 0
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(checks):
+        check_start = time.perf_counter_ns()
+        if limiter.hit(key)[0]:
+            allowed += 1
+        latencies.append(time.perf_counter_ns() - check_start)
+    return allowed, time.perf_counter() - start, latencies, []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["memory", "sqlite", "redis"], default="sqlite")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--window", type=int, default=3600)
+    parser.add_argument("--checks", type=int, default=20000, help="Comprobaciones por proceso")
+    parser.add_argument("--sqlite-timeout-ms", type=float, default=RATE_LIMIT_SQLITE_TIMEOUT_MS)
+    parser.add_argument("--redis-url", default="redis://localhost:6379/0")
+    parser.add_argument("--event-loop", action="store_true", help="Comprobar desde un event loop (RateLimiter.ahit)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests simultáneas por proceso con --event-loop")
+    parser.add_argument("--inline", action="store_true", help="Con --event-loop, llamar al backend en el propio loop")
+    args = parser.parse_args()
+
+    sqlite_path = os.path.join(tempfile.mkdtemp(prefix="neocare_rl_"), "ratelimit.sqlite3")
+    key = f"bench-{os.getpid()}-{time.time_ns()}"
+    jobs = [
+        (
+            args.backend, sqlite_path, args.sqlite_timeout_ms / 1000, args.redis_url, args.limit, args.window, args.checks, key,
+            args.event_loop, args.concurrency, args.inline
+        )
+        for _ in range(args.processes)
+    ]
+
+    start = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+        results = pool.map(worker, jobs)
+    elapsed = time.perf_counter() - start
+
+    allowed = sum(result[0] for result in results)
+    busiest = max(result[1] for result in results)
+    # Lo que se recarga durante la prueba también cuenta como permitido
+    expected = args.limit + args.limit / args.window * busiest
+    total_checks = args.processes * args.checks
+    # Con el backend llamado desde el event loop, cada check es una pausa de todo el worker
+    latencies = sorted(latency for result in results for latency in result[2])
+    p50, p99 = (statistics.quantiles(latencies, n=100)[index] / 1000 for index in (49, 98))
+    lags = sorted(lag for result in results for lag in result[3])
+
+    print(f"Backend:       {args.backend}")
+    print(f"Procesos:      {args.processes} x {args.checks} comprobaciones sobre el mismo cliente")
+    print(f"Límite:        {args.limit} por {args.window}s")
+    print(f"Permitidas:    {allowed} (esperadas ~{expected:.0f}, desviación {(allowed - expected) / expected:+.1%})")
+    print(f"Rendimiento:   {total_checks / busiest:,.0f} checks/s agregados, {busiest / args.checks * 1e6:.1f} µs por check")
+    print(f"Latencia:      p50 {p50:.1f} µs, p99 {p99:.1f} µs, máx {latencies[-1] / 1000:.1f} µs por check")
+    if lags:
+        lag_p99 = statistics.quantiles(lags, n=100)[98] / 1000
+        print(f"Retraso loop:  p99 {lag_p99:.1f} µs, máx {lags[-1] / 1000:.1f} µs ({len(lags)} muestras)")
+    print(f"Tiempo total:  {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Tiempo de arranque de un worker: desde lanzar el proceso hasta la primera respuesta.
+
+Lanza uvicorn varias veces con la aplicación, mide cuánto tarda en responder
+a ``GET /health/`` y desglosa el tiempo de import por paquete y por módulo
+(``python -X importtime``). Compara el arranque con y sin ``create_all``:
+
+    python -m backend.benchmarks.startup --runs 5
+    DATABASE_URL=postgresql://... python -m backend.benchmarks.startup --create-all false
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+APP = "backend.main:app"
+
+
+def _environment(database_url: str, create_all: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("SECRET_KEY", "startup-benchmark-" + "x" * 32)
+    env["DATABASE_URL"] = database_url
+    env["DB_CREATE_ALL"] = create_all
+    env["LOG_LEVEL"] = "WARNING"
+    return env
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_request(env: Dict[str, str], timeout: float = 60) -> float:
+    """Segundos desde lanzar uvicorn hasta el primer 200 de /health/"""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/health/"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", APP, "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn terminó con código {process.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        raise TimeoutError(f"Sin respuesta en {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def import_times(env: Dict[str, str]) -> List[Tuple[str, int, int]]:
+    """(módulo, µs propios, µs acumulados) de ``import backend.main``"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"],
+        env=env, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def by_package(modules: List[Tuple[str, int, int]]) -> List[Tuple[str, int]]:
+    # Tiempo propio sumado por paquete de primer nivel (backend.* por subpaquete)
+    totals: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in modules:
+        parts = name.split(".")
+        package = ".".join(parts[:3]) if parts[0] == "backend" else parts[0]
+        totals[package] += self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--create-all", choices=["true", "false", "both"], default="both")
+    parser.add_argument("--top", type=int, default=15, help="Paquetes y módulos a mostrar")
+    args = parser.parse_args()
+
+    database_url = os.getenv("DATABASE_URL") or "sqlite:///" + os.path.join(
+        tempfile.mkdtemp(prefix="neocare_startup_"), "startup.db"
+    )
+    print(f"Base de datos: {database_url.split('@')[-1]}")
+    print(f"Ejecuciones:   {args.runs}\n")
+
+    modes = ["true", "false"] if args.create_all == "both" else [args.create_all]
+    # La primera ejecución crea las tablas: así create_all=false arranca contra un esquema existente
+    time_to_first_request(_environment(database_url, "true"))
+    print("Tiempo hasta la primera respuesta (uvicorn -> GET /health/)")
+    for mode in modes:
+        env = _environment(database_url, mode)
+        timings = [time_to_first_request(env) * 1000 for _ in range(args.runs)]
+        print(f"  DB_CREATE_ALL={mode:<5}  mediana {statistics.median(timings):8.1f} ms   "
+              f"mín {min(timings):8.1f} ms   máx {max(timings):8.1f} ms")
+
+    modules = import_times(_environment(database_url, "false"))
+    total_us = max(cumulative for _, _, cumulative in modules)
+    print(f"\nImport de {APP.split(':')[0]}: {total_us / 1000:.1f} ms")
+    print("  Por paquete (tiempo propio):")
+    for package, self_us in by_package(modules)[:args.top]:
+        print(f"    {package:<36} {self_us / 1000:8.1f} ms  {self_us / total_us * 100:5.1f}%")
+    print("  Módulos más lentos (tiempo propio):")
+    for name, self_us, cumulative_us in sorted(modules, key=lambda module: module[1], reverse=True)[:args.top]:
+        print(f"    {name:<36} {self_us / 1000:8.1f} ms  (acumulado {cumulative_us / 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
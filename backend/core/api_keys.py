@@ -0,0 +1,41 @@
+import hashlib
+import hmac
+import secrets
+from typing import Optional, Tuple
+
+from backend.core.config import SECRET_KEY
+
+# Formato: nck_<prefijo>_<secreto>. El prefijo se guarda en claro e indexado
+# para localizar la clave; el secreto solo se guarda como HMAC-SHA256.
+API_KEY_PREFIX = "nck_"
+
+
+def generate_api_key() -> Tuple[str, str, str]:
+    """Devuelve (clave completa, prefijo, hash). La clave solo se muestra una vez"""
+    prefix = secrets.token_hex(6)
+    key = f"{API_KEY_PREFIX}{prefix}_{secrets.token_urlsafe(32)}"
+    return key, prefix, hash_api_key(key)
+
+
+def hash_api_key(key: str) -> str:
+    # Hash rápido con clave: las API keys tienen 256 bits de entropía, no
+    # necesitan un hash lento como las contraseñas
+    return hmac.new(SECRET_KEY.encode(), key.encode(), hashlib.sha256).hexdigest()
+
+
+def parse_prefix(key: str) -> Optional[str]:
+    if not key.startswith(API_KEY_PREFIX):
+        return None
+    prefix, _, secret = key[len(API_KEY_PREFIX):].partition("_")
+    if not prefix or not secret:
+        return None
+    return prefix
+
+
+def is_api_key(token: str) -> bool:
+    return token.startswith(API_KEY_PREFIX)
+
+
+def revocation_id(prefix: str) -> str:
+    """Identificador de la clave en revoked_tokens: la revocación llega a todos los workers"""
+    return f"apikey:{prefix}"
@@ -1,7 +1,13 @@
 import os
+import tempfile
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
+
+from backend.core.db_pool import (
+    InstrumentedAsyncQueuePool, InstrumentedQueuePool, async_database_url, connection_budgets, pool_limits
+)
 
 # Cargar variables desde el archivo .env
 load_dotenv()
@@ -21,27 +27,298 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
 
 # Security Configuration
+# Esquema de hashing para contraseñas nuevas: pbkdf2_sha256 (por defecto) o bcrypt.
+# Los hashes con otro esquema o coste se regeneran en el siguiente login correcto.
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "pbkdf2_sha256")
+PBKDF2_ROUNDS = int(os.getenv("PBKDF2_ROUNDS", "29000"))
 BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
 
+# Administradores (emails separados por comas) con acceso a /admin
+ADMIN_EMAILS = {email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()}
+BULK_PROVISION_MAX_ROWS = int(os.getenv("BULK_PROVISION_MAX_ROWS", "5000"))
+
+# Rate Limiting (token bucket: RATE_LIMIT_REQUESTS por RATE_LIMIT_WINDOW_SECONDS)
+RATE_LIMIT_REQUESTS = int(os.getenv("RATE_LIMIT_REQUESTS", "100"))
+RATE_LIMIT_WINDOW_SECONDS = int(os.getenv("RATE_LIMIT_WINDOW_SECONDS", "60"))
+RATE_LIMIT_SWEEP_SECONDS = int(os.getenv("RATE_LIMIT_SWEEP_SECONDS", "60"))
+# memory: por proceso; sqlite: compartido por los workers del nodo; redis: entre nodos.
+# sqlite comprueba primero en el event loop sin esperar (~20 µs) y, si otro worker tiene el
+# bloqueo del fichero, en un hilo aparte. Con 4 workers contra el mismo cliente
+# (make bench-rate-limit-workers, 1 CPU) el retraso p99 del event loop baja de ~59 ms
+# (esperando en el propio loop) a ~5 ms; a cambio, las comprobaciones que pasan al hilo
+# tardan más (p99 ~50 ms) y cuestan un salto de hilo. memory no espera nunca, pero cada
+# worker aplica el límite completo (x WEB_CONCURRENCY)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "sqlite")
+RATE_LIMIT_SQLITE_PATH = os.getenv(
+    "RATE_LIMIT_SQLITE_PATH",
+    os.path.join(tempfile.gettempdir(), "neocare_ratelimit.sqlite3")
+)
+# Espera máxima por el bloqueo del fichero SQLite (en el hilo, no en el event loop); pasada,
+# la request se admite sin límite. Con 50 ms y la contención de arriba se admitía ~30% de más
+RATE_LIMIT_SQLITE_TIMEOUT_MS = float(os.getenv("RATE_LIMIT_SQLITE_TIMEOUT_MS", "250"))
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+# Coste por ruta ("METODO /prefijo=coste" separados por comas); sustituye a los valores por defecto
+RATE_LIMIT_ROUTE_COSTS = os.getenv("RATE_LIMIT_ROUTE_COSTS", "")
+
+# Login Throttling
+# Tras N fallos se bloquea el email/IP con backoff exponencial antes de calcular el hash
+LOGIN_MAX_FAILURES_PER_EMAIL = int(os.getenv("LOGIN_MAX_FAILURES_PER_EMAIL", "5"))
+LOGIN_MAX_FAILURES_PER_IP = int(os.getenv("LOGIN_MAX_FAILURES_PER_IP", "20"))
+LOGIN_BACKOFF_BASE_SECONDS = float(os.getenv("LOGIN_BACKOFF_BASE_SECONDS", "1"))
+LOGIN_BACKOFF_MAX_SECONDS = float(os.getenv("LOGIN_BACKOFF_MAX_SECONDS", "900"))
+LOGIN_THROTTLE_IDLE_SECONDS = int(os.getenv("LOGIN_THROTTLE_IDLE_SECONDS", "3600"))
+LOGIN_THROTTLE_MAX_ENTRIES = int(os.getenv("LOGIN_THROTTLE_MAX_ENTRIES", "100000"))
+
+# Proxies de confianza delante de la app. Con 0 se usa la IP de la conexión; con N
+# se toma la IP añadida por el N-ésimo proxy en X-Forwarded-For. Procfile,
+# railway.json, render.yaml y start.sh ponen 1 (el proxy de la plataforma): con 0
+# detrás de un proxy todos los clientes comparten la IP del proxy (rate limit y
+# bloqueo de login globales). Con N mayor que los proxies reales la IP es falsificable
+FORWARDED_PROXY_HOPS = int(os.getenv("FORWARDED_PROXY_HOPS", "0"))
+
+# Workers de gunicorn del nodo (los comandos de arranque usan --workers ${WEB_CONCURRENCY:-4});
+# los recursos por proceso (pool de hashing, pools de conexiones) se reparten entre ellos
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "4"))
+
+# Password Hashing Pool
+# Procesos dedicados al hashing en cada worker (0 = threadpool por defecto, útil en desarrollo).
+# Por defecto los cores del nodo repartidos entre los WEB_CONCURRENCY workers (mínimo 1): con
+# un proceso por core en cada worker, 4 workers lanzarían 4 x cores procesos de hashing. El
+# tope de concurrencia y la cola se derivan de él, así que también son por worker
+PASSWORD_HASH_WORKERS = int(os.getenv(
+    "PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 1) // max(WEB_CONCURRENCY, 1)))
+))
+PASSWORD_HASH_MAX_CONCURRENCY = int(os.getenv("PASSWORD_HASH_MAX_CONCURRENCY", str(max(PASSWORD_HASH_WORKERS, 1))))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", str(max(PASSWORD_HASH_WORKERS, 1) * 8)))
+PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", "2"))
+
+# Auth Cache Configuration
+# Usuarios autenticados se sirven desde memoria sin consultar la tabla users. Modificar o
+# borrar un usuario solo invalida el cache del worker que lo hace: el resto sigue sirviendo
+# la copia anterior hasta USER_CACHE_TTL_SECONDS (bajarlo acota esa ventana; 0 la elimina)
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+# Tokens JWT ya verificados (clave: digest del token, expiran con su claim exp)
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+# API keys de cuentas de servicio ya verificadas
+API_KEY_CACHE_TTL_SECONDS = int(os.getenv("API_KEY_CACHE_TTL_SECONDS", "60"))
+# Caducidad de las API keys (días): la de por defecto y el máximo que puede pedir un admin
+API_KEY_TTL_DAYS = int(os.getenv("API_KEY_TTL_DAYS", "90"))
+API_KEY_MAX_TTL_DAYS = int(os.getenv("API_KEY_MAX_TTL_DAYS", "365"))
+# Tokens revocados: cada worker sincroniza su copia en memoria con revoked_tokens
+TOKEN_REVOCATION_SYNC_SECONDS = int(os.getenv("TOKEN_REVOCATION_SYNC_SECONDS", "5"))
+TOKEN_REVOCATION_PRUNE_SECONDS = int(os.getenv("TOKEN_REVOCATION_PRUNE_SECONDS", "3600"))
+
+# Logging
+# Los handlers (consola y fichero) corren en un hilo aparte detrás de una cola acotada
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_DIR = os.getenv("LOG_DIR", "logs")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Con la cola llena: "drop" descarta el mensaje (y lo cuenta), "block" espera
+LOG_QUEUE_OVERFLOW = os.getenv("LOG_QUEUE_OVERFLOW", "drop")
+# Rotación por tamaño (0 = sin rotar: un app_YYYYMMDD.log compartido por los workers).
+# Con rotación cada proceso escribe su propio app_YYYYMMDD_<pid>.log
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", "0"))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "10"))
+LOG_COMPRESS = os.getenv("LOG_COMPRESS", "true").lower() == "true"
+# Access log: "text" (una línea legible) o "json" (un objeto por request, con la plantilla de ruta)
+ACCESS_LOG_FORMAT = os.getenv("ACCESS_LOG_FORMAT", "text")
+# Fracción de requests registradas por tipo de respuesta; los 5xx y las lentas se registran siempre
+ACCESS_LOG_SAMPLE_2XX = float(os.getenv("ACCESS_LOG_SAMPLE_2XX", "1.0"))
+ACCESS_LOG_SAMPLE_4XX = float(os.getenv("ACCESS_LOG_SAMPLE_4XX", "1.0"))
+ACCESS_LOG_SLOW_MS = float(os.getenv("ACCESS_LOG_SLOW_MS", "1000"))
+
+# Métricas (formato de texto de Prometheus en /metrics)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Si se define, /metrics exige "Authorization: Bearer <METRICS_TOKEN>". Obligatorio con
+# ENVIRONMENT=production: sin él /metrics (exento del rate limit) expone tráfico por ruta,
+# caches de auth y estado del pool a cualquiera
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+# Directorio donde los workers de gunicorn comparten sus métricas ("" = solo este proceso)
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "neocare_metrics"))
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
 # CORS Configuration
 CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
 
-# Environment
+# Environment (los comandos de arranque de Procfile, railway.json, render.yaml y start.sh ponen production)
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
+if ENVIRONMENT == "production" and METRICS_ENABLED and not METRICS_TOKEN:
+    raise ValueError("METRICS_TOKEN must be set when METRICS_ENABLED=true in production")
+
+# Presupuesto de SQL por request: nº de sentencias y repeticiones de la misma sentencia (N+1)
+SQL_STATEMENT_BUDGET = int(os.getenv("SQL_STATEMENT_BUDGET", "15"))
+SQL_REPEAT_BUDGET = int(os.getenv("SQL_REPEAT_BUDGET", "5"))
+# "warn" registra un aviso al terminar la request; "raise" corta la sentencia que se pasa (tests)
+SQL_BUDGET_MODE = os.getenv("SQL_BUDGET_MODE", "warn")
+# Slow-query log: sentencias por encima del umbral, con su plan (EXPLAIN en segundo plano)
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "100"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+# Profiler de muestreo (GET /admin/profile y requests con X-Profile-Token: <PROFILE_TOKEN>)
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "10"))
+PROFILE_REQUEST_INTERVAL_MS = float(os.getenv("PROFILE_REQUEST_INTERVAL_MS", "1"))
+PROFILE_MAX_SECONDS = int(os.getenv("PROFILE_MAX_SECONDS", "60"))
+PROFILE_HISTORY = int(os.getenv("PROFILE_HISTORY", "20"))
+# Diagnóstico de memoria (POST /admin/memory/tracemalloc/start, snapshots y diffs)
+MEMORY_TRACEMALLOC_FRAMES = int(os.getenv("MEMORY_TRACEMALLOC_FRAMES", "1"))
+MEMORY_SNAPSHOT_HISTORY = int(os.getenv("MEMORY_SNAPSHOT_HISTORY", "10"))
+# Crear las tablas que falten con create_all al arrancar (no añade índices a tablas que ya
+# existen: eso lo hace "alembic upgrade head", que ejecutan todos los comandos de arranque).
+# Con false cada worker se ahorra la inspección de tablas; solo si el despliegue migra antes
+DB_CREATE_ALL = os.getenv("DB_CREATE_ALL", "true").lower() == "true"
+# Cabeceras X-DB-Statements / X-DB-Time-Ms en las respuestas (por defecto solo en desarrollo)
+SQL_DEBUG_HEADERS = os.getenv("SQL_DEBUG_HEADERS", str(ENVIRONMENT == "development")).lower() == "true"
+
+# Pools de conexiones por worker. Por defecto se reparte DB_MAX_CONNECTIONS entre los
+# WEB_CONCURRENCY workers de gunicorn: mitad para el engine asíncrono (routers async) y
+# mitad para el síncrono, sin pasar de lo que puede pedir el threadpool
+# Hilos para handlers y dependencias síncronas por worker (40 es el valor por defecto de anyio)
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
+# Conexiones que puede usar la aplicación entre todos los workers (max_connections de
+# PostgreSQL es 100: el margen queda para migraciones y conexiones de administración)
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "90"))
+_sync_limit, _async_limit = connection_budgets(WEB_CONCURRENCY, THREADPOOL_SIZE, DB_MAX_CONNECTIONS)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str(pool_limits(_sync_limit)[0])))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", str(pool_limits(_sync_limit)[1])))
+DB_ASYNC_POOL_SIZE = int(os.getenv("DB_ASYNC_POOL_SIZE", str(pool_limits(_async_limit)[0])))
+DB_ASYNC_MAX_OVERFLOW = int(os.getenv("DB_ASYNC_MAX_OVERFLOW", str(pool_limits(_async_limit)[1])))
+# Segundos esperando una conexión libre antes de fallar (por debajo del timeout de gunicorn)
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Renovar conexiones con más de N segundos (-1 = nunca); los proxies gestionados cortan las inactivas
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# LIFO reutiliza siempre las mismas conexiones y deja caducar las sobrantes
+DB_POOL_USE_LIFO = os.getenv("DB_POOL_USE_LIFO", "true").lower() == "true"
+# Devolver la conexión al pool en cuanto la request deja de necesitarla (tras autenticar,
+# antes del hashing del login y al terminar el handler) y no después de enviar la respuesta
+DB_SESSION_EARLY_RELEASE = os.getenv("DB_SESSION_EARLY_RELEASE", "true").lower() == "true"
+# Conexiones abiertas al arrancar cada worker en cada pool (como mucho su pool_size)
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", str(max(DB_POOL_SIZE, DB_ASYNC_POOL_SIZE))))
+# URL del engine asíncrono; por defecto la de DATABASE_URL con el driver asyncpg (o aiosqlite)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_database_url(SQLALCHEMY_DATABASE_URL)
+
+# Réplicas de lectura (URLs separadas por comas, mismo formato que DATABASE_URL). Los GET de
+# boards, lists, cards, worklogs y reportes leen de ellas; sin réplicas todo va al primario
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+# least_connections (la réplica con menos sesiones abiertas en el worker) o round_robin
+REPLICA_BALANCING = os.getenv("REPLICA_BALANCING", "least_connections")
+# Tras escribir, las lecturas del usuario van al primario durante N segundos (lag de replicación)
+REPLICA_READ_YOUR_WRITES_SECONDS = float(os.getenv("REPLICA_READ_YOUR_WRITES_SECONDS", "5"))
+# Dónde se apunta la última escritura de cada usuario: memory (solo la ve el worker que
+# escribió) o sqlite (fichero local compartido por los workers del nodo)
+REPLICA_WRITE_TRACKER = os.getenv("REPLICA_WRITE_TRACKER", "sqlite")
+REPLICA_WRITE_TRACKER_PATH = os.getenv(
+    "REPLICA_WRITE_TRACKER_PATH",
+    os.path.join(tempfile.gettempdir(), "neocare_replica_writes.sqlite3")
+)
+# Espera máxima por el bloqueo del fichero (se consulta desde el event loop); si se agota,
+# las lecturas del usuario van al primario
+REPLICA_WRITE_TRACKER_TIMEOUT_MS = float(os.getenv("REPLICA_WRITE_TRACKER_TIMEOUT_MS", "50"))
+# Segundos sin usar una réplica tras un fallo de conexión o un lag excesivo
+REPLICA_COOLDOWN_SECONDS = float(os.getenv("REPLICA_COOLDOWN_SECONDS", "30"))
+# Lag máximo tolerado (PostgreSQL), comprobado como mucho cada REPLICA_LAG_CHECK_SECONDS por réplica
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "10"))
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", "5"))
 
 # Database Engine
 # SQLite requires check_same_thread=False for FastAPI
-connect_args = {"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args)
+if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+    engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+else:
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_use_lifo=DB_POOL_USE_LIFO
+    )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 # Database dependency
-def get_db():
+# La sesión no pide conexión al pool hasta su primera sentencia. Es async para que
+# abrirla y cerrarla no pase por el threadpool: get_current_user servido desde los
+# caches no toca la base y el cierre solo hace I/O si la sesión aún tiene conexión
+async def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
+        if db.in_transaction():
+            await run_in_threadpool(db.close)
+        else:
+            db.close()
+
+def release_connection(db) -> None:
+    """Devolver al pool la conexión de una sesión que hasta ahora solo ha leído.
+
+    Termina la transacción sin expirar ni desligar los objetos cargados, y la
+    siguiente sentencia pide otra conexión. Con cambios pendientes no hace
+    nada: los confirmará o descartará el handler.
+    """
+    if not DB_SESSION_EARLY_RELEASE or not db.in_transaction() or db.new or db.dirty or db.deleted:
+        return
+    expire_on_commit, db.expire_on_commit = db.expire_on_commit, False
+    try:
+        db.commit()
+    finally:
+        db.expire_on_commit = expire_on_commit
+
+# Async Database Engine
+# Se crea con el primer uso: scripts, alembic y benchmarks no necesitan el driver asíncrono
+_async_engine = None
+_async_sessionmaker = None
+
+def create_async_db_engine(url: str, poolclass=InstrumentedAsyncQueuePool):
+    """Engine asíncrono con la configuración de pool de DB_ASYNC_* (primario y réplicas)"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    if url.startswith("sqlite"):
+        return create_async_engine(url)
+    return create_async_engine(
+        url,
+        poolclass=poolclass,
+        pool_size=DB_ASYNC_POOL_SIZE,
+        max_overflow=DB_ASYNC_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_use_lifo=DB_POOL_USE_LIFO
+    )
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_db_engine(ASYNC_DATABASE_URL)
+    return _async_engine
+
+def async_engine_created() -> bool:
+    return _async_engine is not None
+
+def get_async_sessionmaker():
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        # Sin expirar al hacer commit: leer atributos después no puede lanzar I/O implícita
+        _async_sessionmaker = async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _async_sessionmaker
+
+# Async database dependency
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+async def release_async_connection(db) -> None:
+    """``release_connection`` para una ``AsyncSession`` (ya creada con expire_on_commit=False)"""
+    if not DB_SESSION_EARLY_RELEASE or not db.in_transaction() or db.new or db.dirty or db.deleted:
+        return
+    await db.commit()
 
 
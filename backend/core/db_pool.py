@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from backend.core.metrics import db_pool_wait, db_pool_timeouts
+
+logger = logging.getLogger("neocare.db")
+
+# Hilos propios que también usan el pool: sincronización de revocaciones y EXPLAIN de consultas lentas
+BACKGROUND_CONNECTIONS = 2
+
+
+# Driver asíncrono equivalente a cada driver síncrono
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """``postgresql://...`` -> ``postgresql+asyncpg://...``, ``sqlite:///...`` -> ``sqlite+aiosqlite:///...``"""
+    scheme, separator, rest = url.partition("://")
+    if scheme in ASYNC_DRIVERS.values():
+        return url
+    if scheme not in ASYNC_DRIVERS:
+        raise ValueError(f"Sin driver asíncrono conocido para {scheme!r}: definir ASYNC_DATABASE_URL")
+    driver = ASYNC_DRIVERS[scheme]
+    if driver == "postgresql+asyncpg":
+        # asyncpg no entiende sslmode (libpq): el equivalente es ssl
+        rest = rest.replace("?sslmode=", "?ssl=").replace("&sslmode=", "&ssl=")
+    return driver + separator + rest
+
+
+def connection_budgets(workers: int, threadpool_size: int, max_connections: int) -> Tuple[int, int]:
+    """Conexiones por worker para el engine síncrono y el asíncrono.
+
+    Entre todos los workers no deben pasar de ``max_connections``; la mitad
+    del reparto de cada worker es para el engine asíncrono de los routers
+    async. El síncrono (auth, admin, health, hilos de fondo) nunca necesita
+    más conexiones que hilos pueden pedirlas.
+    """
+    per_worker = max(2, max_connections // max(workers, 1))
+    async_limit = per_worker // 2
+    sync_limit = max(1, min(threadpool_size + BACKGROUND_CONNECTIONS, per_worker - async_limit))
+    return sync_limit, async_limit
+
+
+def pool_limits(limit: int) -> Tuple[int, int]:
+    """(pool_size, max_overflow): la mitad del tope abierta siempre y el resto como overflow para picos"""
+    pool_size = max(1, limit // 2)
+    return pool_size, max(0, limit - pool_size)
+
+
+class _TimedCheckout:
+    """Mide cuánto espera cada checkout y cuenta los timeouts (etiqueta ``pool``)"""
+
+    pool_label = ("sync",)
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            db_pool_timeouts.inc(self.pool_label)
+            raise
+        finally:
+            db_pool_wait.observe(time.perf_counter() - start, self.pool_label)
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    """QueuePool del engine síncrono con telemetría de esperas"""
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """Pool del engine asíncrono con telemetría de esperas"""
+
+    pool_label = ("async",)
+
+
+class InstrumentedReplicaQueuePool(InstrumentedAsyncQueuePool):
+    """Pool de cada réplica de lectura (una etiqueta para todas)"""
+
+    pool_label = ("replica",)
+
+
+def warm_pool(engine, connections: int) -> int:
+    """Abrir ``connections`` conexiones a la vez y devolverlas al pool.
+
+    Así las primeras requests del worker no pagan el handshake (TCP, TLS y
+    autenticación) con la base de datos. Devuelve las conexiones abiertas.
+    """
+    if connections <= 0:
+        return 0
+    with ThreadPoolExecutor(max_workers=connections, thread_name_prefix="db-pool-warmup") as executor:
+        futures = [executor.submit(engine.connect) for _ in range(connections)]
+    opened, error = [], None
+    for future in futures:
+        try:
+            opened.append(future.result())
+        except exc.SQLAlchemyError as e:
+            error = e
+    for connection in opened:
+        connection.close()
+    if error is not None:
+        logger.warning(f"No se pudo precalentar el pool de conexiones: {error}")
+    return len(opened)
+
+
+async def warm_async_pool(engine, connections: int) -> int:
+    """Versión de ``warm_pool`` para un ``AsyncEngine``"""
+    if connections <= 0:
+        return 0
+    results = await asyncio.gather(*(engine.connect().start() for _ in range(connections)), return_exceptions=True)
+    opened = [result for result in results if not isinstance(result, BaseException)]
+    for connection in opened:
+        await connection.close()
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        logger.warning(f"No se pudo precalentar el pool asíncrono: {errors[0]}")
+    return len(opened)
@@ -0,0 +1,206 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from backend.core.config import (
+    PASSWORD_HASH_SCHEME,
+    PBKDF2_ROUNDS,
+    BCRYPT_ROUNDS,
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_CONCURRENCY,
+    PASSWORD_HASH_MAX_QUEUE,
+    PASSWORD_HASH_RETRY_AFTER
+)
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+def build_context(scheme: str = PASSWORD_HASH_SCHEME,
+                  pbkdf2_rounds: int = PBKDF2_ROUNDS,
+                  bcrypt_rounds: int = BCRYPT_ROUNDS) -> "CryptContext":
+    """Crear el CryptContext con el coste fijado para cada esquema.
+
+    min_rounds y max_rounds coinciden con el coste configurado, de modo que
+    needs_update marca cualquier hash generado con otro coste (más alto o más
+    bajo) además de los de esquemas obsoletos.
+    """
+    from passlib.context import CryptContext
+
+    return CryptContext(
+        schemes=["pbkdf2_sha256", "bcrypt"],
+        default=scheme,
+        deprecated="auto",
+        pbkdf2_sha256__default_rounds=pbkdf2_rounds,
+        pbkdf2_sha256__min_rounds=pbkdf2_rounds,
+        pbkdf2_sha256__max_rounds=pbkdf2_rounds,
+        bcrypt__default_rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        bcrypt__max_rounds=bcrypt_rounds
+    )
+
+@lru_cache(maxsize=None)
+def pwd_context() -> "CryptContext":
+    # passlib se importa con el primer hash, no al arrancar el worker
+    return build_context()
+
+
+# Funciones de nivel de módulo para poder ejecutarlas en los procesos del pool
+def _hash(password: str) -> str:
+    return pwd_context().hash(password)
+
+def _verify(password: str, password_hash: str) -> bool:
+    return pwd_context().verify(password, password_hash)
+
+def _verify_and_update(password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context().verify_and_update(password, password_hash)
+
+def _hash_batch(passwords: List[str]) -> List[str]:
+    context = pwd_context()
+    return [context.hash(password) for password in passwords]
+
+def _split(items: list, parts: int) -> List[list]:
+    size = max(1, -(-len(items) // max(parts, 1)))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _mp_context():
+    # forkserver evita hacer fork de un worker con hilos activos
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class PasswordHasher:
+    """Pool de procesos acotado para hashing de contraseñas.
+
+    El hashing no ocupa hilos del threadpool de requests: como máximo
+    ``max_concurrency`` operaciones corren a la vez en el pool y otras
+    ``max_queue`` esperan turno. Con la cola llena se responde 503 con
+    Retry-After en lugar de encolar sin límite.
+    """
+
+    # Contraseñas por bloque de hash_many: cada bloque ocupa una plaza del semáforo
+    # solo unos cientos de ms (bcrypt ~30 ms/hash), así los logins se intercalan
+    bulk_chunk_size = 8
+
+    def __init__(self, workers: int, max_concurrency: int, max_queue: int, retry_after: int):
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        # Plazas que puede ocupar a la vez un lote: el resto queda libre para los logins
+        self.bulk_slots = max(1, max_concurrency // 2)
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.rejected = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self._running = 0
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None  # threadpool por defecto del event loop
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=_mp_context()
+                    )
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._waiting = 0
+            self._running = 0
+        return self._semaphore
+
+    async def _submit(self, fn, *args, bulk: bool = False):
+        # Los bloques de un lote no cuentan para max_queue (ya los limita bulk_slots):
+        # ni llenan la cola de los logins ni se rechazan a mitad de una importación
+        semaphore = self._get_semaphore()
+        if semaphore.locked() and not bulk:
+            if self._waiting >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail="Servicio de autenticación saturado, inténtalo de nuevo en unos segundos",
+                    headers={"Retry-After": str(self.retry_after)}
+                )
+            self._waiting += 1
+            try:
+                await semaphore.acquire()
+            finally:
+                self._waiting -= 1
+        else:
+            await semaphore.acquire()
+
+        self._running += 1
+        try:
+            return await self._loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._running -= 1
+            semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._submit(_verify, password, password_hash)
+
+    async def verify_and_update(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        """Verificar y, si el hash usa otro esquema o coste, devolver uno nuevo"""
+        return await self._submit(_verify_and_update, password, password_hash)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """Hashear un lote en bloques de ``bulk_chunk_size`` con como mucho ``bulk_slots``
+        bloques a la vez: un alta masiva no deja a los logins sin plazas del pool"""
+        chunks = [passwords[i:i + self.bulk_chunk_size] for i in range(0, len(passwords), self.bulk_chunk_size)]
+        results: List[Optional[List[str]]] = [None] * len(chunks)
+        pending = iter(enumerate(chunks))
+
+        async def lane():
+            for index, chunk in pending:
+                results[index] = await self._submit(_hash_batch, chunk, bulk=True)
+
+        await asyncio.gather(*(lane() for _ in range(min(self.bulk_slots, len(chunks)))))
+        return [password_hash for chunk in results for password_hash in chunk]
+
+    def hash_many_sync(self, passwords: List[str]) -> List[str]:
+        """Versión bloqueante de hash_many para scripts fuera del event loop"""
+        executor = self._get_executor()
+        if executor is None:
+            return _hash_batch(passwords)
+        chunks = _split(passwords, self.workers)
+        return [password_hash for chunk in executor.map(_hash_batch, chunks) for password_hash in chunk]
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "in_flight": self._running,
+            "waiting": self._waiting,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+# Instancia global
+password_hasher = PasswordHasher(
+    workers=PASSWORD_HASH_WORKERS,
+    max_concurrency=PASSWORD_HASH_MAX_CONCURRENCY,
+    max_queue=PASSWORD_HASH_MAX_QUEUE,
+    retry_after=PASSWORD_HASH_RETRY_AFTER
+)
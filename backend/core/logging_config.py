@@ -1,22 +1,290 @@
+import atexit
+import gzip
+import json
 import logging
+import os
+import queue
+import random
+import shutil
 import sys
+import threading
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from typing import Optional
 
+from backend.core.config import (
+    LOG_LEVEL,
+    LOG_DIR,
+    LOG_QUEUE_SIZE,
+    LOG_QUEUE_OVERFLOW,
+    LOG_MAX_BYTES,
+    LOG_BACKUP_COUNT,
+    LOG_COMPRESS,
+    ACCESS_LOG_FORMAT,
+    ACCESS_LOG_SAMPLE_2XX,
+    ACCESS_LOG_SAMPLE_4XX,
+    ACCESS_LOG_SLOW_MS
+)
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler con cola acotada y política de desbordamiento.
+
+    Con ``overflow="drop"`` un mensaje que no cabe se descarta y se cuenta;
+    el total se notifica en cuanto la cola vuelve a tener sitio. Con
+    ``overflow="block"`` el hilo que loguea espera a que haya hueco.
+    """
+
+    def __init__(self, log_queue: queue.Queue, overflow: str = "drop"):
+        super().__init__(log_queue)
+        if overflow not in ("drop", "block"):
+            raise ValueError(f"LOG_QUEUE_OVERFLOW desconocido: {overflow}")
+        self.overflow = overflow
+        self.dropped = 0
+        self._unreported = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # La cola es en memoria: el mensaje se formatea en el hilo del listener,
+        # no en el del request (QueueHandler.prepare lo haría aquí)
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                self._unreported += 1
+            return
+        if self._unreported:
+            self._report_dropped()
+
+    def _report_dropped(self) -> None:
+        with self._lock:
+            count, self._unreported = self._unreported, 0
+        record = logging.makeLogRecord({
+            "name": "neocare.logging",
+            "levelno": logging.WARNING,
+            "levelname": "WARNING",
+            "msg": f"Cola de logs llena: {count} mensajes descartados",
+        })
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self._unreported += count
+
+
+class DailyRotatingFileHandler(RotatingFileHandler):
+    """Escribe en ``<directorio>/app_YYYYMMDD.log`` y cambia de fichero cada día.
+
+    Sin ``max_bytes`` el fichero del día es solo de anexado y lo comparten
+    todos los workers (rotarlo queda para logrotate o la plataforma). Con
+    ``max_bytes`` rota por tamaño, y como renombrar un fichero que otros
+    procesos están escribiendo pierde líneas, cada proceso escribe el suyo:
+    ``app_YYYYMMDD_<pid>.log`` (``.1.gz``, ...). Las copias rotadas se
+    comprimen con gzip en un hilo aparte para no frenar la escritura.
+    """
+
+    def __init__(self, directory: str, prefix: str = "app", max_bytes: int = 0,
+                 backup_count: int = 0, compress: bool = True):
+        self.directory = directory
+        self.prefix = prefix
+        self._day = datetime.now().strftime("%Y%m%d")
+        self.maxBytes = max_bytes
+        super().__init__(self._path(self._day), maxBytes=max_bytes, backupCount=backup_count,
+                         encoding="utf-8", delay=True)
+        if compress:
+            self.namer = lambda name: name + ".gz"
+            self.rotator = self._rotate_compressed
+
+    def _open(self):
+        # El directorio se crea con el primer mensaje, desde el hilo del listener. El
+        # pid se toma aquí y no en __init__: el handler pudo crearse antes de un fork
+        os.makedirs(self.directory, exist_ok=True)
+        self.baseFilename = os.path.abspath(self._path(self._day))
+        return super()._open()
+
+    def _path(self, day: str) -> str:
+        if self.maxBytes > 0:
+            return os.path.join(self.directory, f"{self.prefix}_{day}_{os.getpid()}.log")
+        return os.path.join(self.directory, f"{self.prefix}_{day}.log")
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        day = datetime.now().strftime("%Y%m%d")
+        if day != self._day:
+            self._day = day
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+            self.baseFilename = os.path.abspath(self._path(day))
+        return super().shouldRollover(record)
+
+    @staticmethod
+    def _rotate_compressed(source: str, dest: str) -> None:
+        pending = dest + ".tmp"
+        os.replace(source, pending)
+        threading.Thread(target=_gzip_file, args=(pending, dest), name="log-compress", daemon=True).start()
+
+
+def _gzip_file(source: str, dest: str) -> None:
+    try:
+        with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(source)
+    except OSError as e:
+        # Desde el hilo de compresión, no desde un handler: el registro pasa por la cola como cualquier otro
+        logging.getLogger("neocare.logging").error(f"No se pudo comprimir {source}: {e}")
+
+
+class AccessLogEntry:
+    """Datos de una request del access log; se formatea al escribirse.
+
+    En modo texto ``str(entry)`` es la línea clásica; en modo JSON
+    ``LogFormatter`` escribe un objeto por línea con la plantilla de ruta
+    (``/boards/{board_id}``) en lugar de la ruta concreta.
+    """
+
+    __slots__ = (
+        "method", "path", "route", "status", "duration_ms", "db_ms", "db_statements", "db_max_repeat", "sample_rate"
+    )
+
+    def __init__(self, method: str, path: str, route: Optional[str], status: int, duration_ms: float,
+                 db_ms: float = 0.0, db_statements: int = 0, db_max_repeat: int = 0, sample_rate: float = 1.0):
+        self.method = method
+        self.path = path
+        self.route = route
+        self.status = status
+        self.duration_ms = duration_ms
+        self.db_ms = db_ms
+        self.db_statements = db_statements
+        self.db_max_repeat = db_max_repeat
+        self.sample_rate = sample_rate
+
+    def __str__(self) -> str:
+        return (
+            f"{self.method} {self.path} - Status: {self.status} - Time: {self.duration_ms / 1000:.3f}s"
+            f" - SQL: {self.db_statements} ({self.db_ms:.1f}ms)"
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "method": self.method,
+            "route": self.route or "<unmatched>",
+            "status": self.status,
+            "duration_ms": round(self.duration_ms, 3),
+            "db_ms": round(self.db_ms, 3),
+            "db_statements": self.db_statements,
+            "db_max_repeat": self.db_max_repeat,
+            "sample_rate": self.sample_rate,
+        }
+
+
+class LogFormatter(logging.Formatter):
+    """Formato de texto de siempre; las entradas del access log en JSON si ACCESS_LOG_FORMAT=json"""
+
+    def __init__(self, fmt: str = LOG_FORMAT, access_format: str = "text"):
+        super().__init__(fmt)
+        self.access_format = access_format
+
+    def format(self, record: logging.LogRecord) -> str:
+        if self.access_format == "json" and isinstance(record.msg, AccessLogEntry):
+            data = {
+                "ts": datetime.utcfromtimestamp(record.created).isoformat(timespec="milliseconds") + "Z",
+                "logger": record.name,
+            }
+            data.update(record.msg.to_dict())
+            return json.dumps(data, separators=(",", ":"))
+        return super().format(record)
+
+
+_access_logger = logging.getLogger("neocare.http")
+
+
+def access_sample_rate(status: int, duration_ms: float) -> float:
+    """Fracción de requests que se registran para este status y duración"""
+    if status >= 500 or duration_ms >= ACCESS_LOG_SLOW_MS:
+        return 1.0
+    if status >= 400:
+        return ACCESS_LOG_SAMPLE_4XX
+    return ACCESS_LOG_SAMPLE_2XX
+
+
+def log_access(method: str, path: str, route: Optional[str], status: int, duration_ms: float,
+               db_ms: float = 0.0, db_statements: int = 0, db_max_repeat: int = 0) -> None:
+    """Registrar una request en el access log (muestreado; el formateo ocurre en el listener)"""
+    if not _access_logger.isEnabledFor(logging.INFO):
+        return
+    rate = access_sample_rate(status, duration_ms)
+    if rate < 1.0 and random.random() >= rate:
+        return
+    _access_logger.info(
+        AccessLogEntry(method, path, route, status, duration_ms, db_ms, db_statements, db_max_repeat, rate)
+    )
+
+
+_listener: Optional[QueueListener] = None
+
+
 def setup_logging():
-    """Configurar logging estructurado para la aplicación"""
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler(f'logs/app_{datetime.now().strftime("%Y%m%d")}.log')
-        ]
+    """Configurar logging estructurado para la aplicación.
+
+    Los loggers solo encolan el mensaje; la consola y el fichero se escriben
+    desde el hilo del QueueListener, así un disco lento no bloquea el event
+    loop.
+    """
+    global _listener
+    if _listener is not None:
+        return logging.getLogger("neocare")
+
+    formatter = LogFormatter(LOG_FORMAT, access_format=ACCESS_LOG_FORMAT)
+    console = logging.StreamHandler(sys.stdout)
+    file_handler = DailyRotatingFileHandler(
+        LOG_DIR, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT, compress=LOG_COMPRESS
     )
-    
+    for handler in (console, file_handler):
+        handler.setFormatter(formatter)
+
+    queue_handler = BoundedQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE), overflow=LOG_QUEUE_OVERFLOW)
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(LOG_LEVEL)
+
+    _listener = QueueListener(queue_handler.queue, console, file_handler, respect_handler_level=True)
+    _listener.queue_handler = queue_handler
+    _listener.start()
+    atexit.register(stop_logging)
+
     return logging.getLogger("neocare")
 
+
+def stop_logging() -> None:
+    """Vaciar la cola y detener el hilo de logging (al apagar la aplicación)"""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    # Sin listener nadie vaciaría la cola; los avisos posteriores van a stderr (lastResort)
+    logging.getLogger().removeHandler(listener.queue_handler)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+def log_queue_size() -> Optional[int]:
+    """Mensajes pendientes en la cola de logs (None si el logging no está iniciado)"""
+    listener = _listener
+    return listener.queue.qsize() if listener is not None else None
+
+
 def log_auth_attempt(email: str, success: bool, ip: Optional[str] = None):
     """Registrar intentos de autenticación"""
     logger = logging.getLogger("neocare.auth")
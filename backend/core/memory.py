@@ -0,0 +1,163 @@
+import gc
+import itertools
+import os
+import sys
+import threading
+import tracemalloc
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import List, Optional
+
+from backend.core.config import MEMORY_SNAPSHOT_HISTORY
+
+# Las asignaciones del propio tracemalloc y del import system no interesan
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class MemoryTracker:
+    """Snapshots de tracemalloc de este worker y diferencias entre ellos.
+
+    tracemalloc ralentiza las asignaciones mientras está activo, así que
+    solo se arranca bajo demanda (``start``) y se para con ``stop``, que
+    también descarta los snapshots guardados.
+    """
+
+    def __init__(self, max_snapshots: int = 10):
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[int, tuple]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+        tracemalloc.stop()
+
+    def status(self) -> dict:
+        traced, peak = tracemalloc.get_traced_memory()
+        return {
+            "pid": os.getpid(),
+            "tracing": tracemalloc.is_tracing(),
+            "frames": tracemalloc.get_traceback_limit(),
+            "traced_bytes": traced,
+            "peak_traced_bytes": peak,
+            "overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+        }
+
+    def take_snapshot(self) -> dict:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc no está activo")
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        taken_at = datetime.utcnow()
+        with self._lock:
+            snapshot_id = next(self._ids)
+            self._snapshots[snapshot_id] = (snapshot, taken_at)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return self._describe(snapshot_id, snapshot, taken_at)
+
+    def snapshots(self) -> List[dict]:
+        with self._lock:
+            items = list(self._snapshots.items())
+        return [self._describe(snapshot_id, snapshot, taken_at) for snapshot_id, (snapshot, taken_at) in items]
+
+    def diff(self, from_id: int, to_id: Optional[int] = None, group_by: str = "lineno", limit: int = 25) -> dict:
+        """Mayores diferencias de memoria entre dos snapshots (por defecto, contra uno nuevo)"""
+        with self._lock:
+            old = self._snapshots.get(from_id)
+            new = self._snapshots.get(to_id) if to_id is not None else None
+        if old is None or (to_id is not None and new is None):
+            raise KeyError("Snapshot no encontrado")
+        if new is None:
+            to_id = self.take_snapshot()["id"]
+            new = self._snapshots[to_id]
+
+        stats = new[0].compare_to(old[0], group_by)
+        return {
+            "from_id": from_id,
+            "to_id": to_id,
+            "group_by": group_by,
+            "size_diff_bytes": sum(stat.size_diff for stat in stats),
+            "top": [
+                {
+                    "location": _location(stat.traceback, group_by),
+                    "size_bytes": stat.size,
+                    "size_diff_bytes": stat.size_diff,
+                    "count": stat.count,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in stats[:limit]
+            ],
+        }
+
+    def __len__(self) -> int:
+        return len(self._snapshots)
+
+    @staticmethod
+    def _describe(snapshot_id: int, snapshot, taken_at: datetime) -> dict:
+        return {
+            "id": snapshot_id,
+            "taken_at": taken_at,
+            "traced_bytes": sum(trace.size for trace in snapshot.traces),
+            "traces": len(snapshot.traces),
+        }
+
+
+def _location(traceback, group_by: str) -> str:
+    # Traceback va del frame más antiguo al que hizo la asignación
+    frame = traceback[-1]
+    if group_by == "filename":
+        return short_path(frame.filename)
+    if group_by == "traceback":
+        return " <- ".join(f"{short_path(f.filename)}:{f.lineno}" for f in reversed(traceback))
+    return f"{short_path(frame.filename)}:{frame.lineno}"
+
+
+def short_path(filename: str) -> str:
+    """Ruta relativa a sys.path (``backend/core/cache.py``, ``sqlalchemy/orm/session.py``)"""
+    best = filename
+    for path in sys.path:
+        if path and filename.startswith(path + os.sep) and len(filename) - len(path) - 1 < len(best):
+            best = filename[len(path) + 1:]
+    return best
+
+
+def process_memory() -> dict:
+    """RSS actual y pico del proceso (de /proc en Linux; getrusage como alternativa)"""
+    memory = {"pid": os.getpid(), "rss_bytes": None, "peak_rss_bytes": None}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    memory["rss_bytes"] = int(line.split()[1]) * 1024
+                elif line.startswith("VmHWM:"):
+                    memory["peak_rss_bytes"] = int(line.split()[1]) * 1024
+    except OSError:
+        # Sin /proc (macOS): solo el pico. ru_maxrss está en KB en Linux y en bytes en macOS
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        memory["peak_rss_bytes"] = maxrss if sys.platform == "darwin" else maxrss * 1024
+    return memory
+
+
+def object_counts(limit: int = 25) -> List[dict]:
+    """Objetos vivos seguidos por el GC, agrupados por tipo (recorre todo el heap: es lento)"""
+    counts = Counter(type(obj).__qualname__ for obj in gc.get_objects())
+    return [{"type": name, "count": count} for name, count in counts.most_common(limit)]
+
+
+# Instancia global
+memory_tracker = MemoryTracker(MEMORY_SNAPSHOT_HISTORY)
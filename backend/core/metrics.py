@@ -0,0 +1,326 @@
+import bisect
+import json
+import os
+import shutil
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Buckets de latencia en segundos (el último, +Inf, es implícito)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def family(self) -> dict:
+        with self._lock:
+            samples = [[list(labels), _copy(value)] for labels, value in self._values.items()]
+        return {
+            "name": self.name,
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": samples,
+        }
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value: float, labels: tuple = ()) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, labels: tuple = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    """Histograma de buckets fijos: por serie guarda [conteos por bucket, suma, total]"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def family(self) -> dict:
+        family = super().family()
+        family["buckets"] = list(self.buckets)
+        return family
+
+
+def _copy(value):
+    if isinstance(value, list):
+        return [list(value[0]), value[1], value[2]]
+    return value
+
+
+class MetricsRegistry:
+    """Registro de métricas en memoria del proceso.
+
+    Además de las métricas propias admite *collectors*: funciones que
+    devuelven familias calculadas en el momento de exportar (pool de la base
+    de datos, caches de autenticación, ...).
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[dict]]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[dict]]) -> None:
+        self._collectors.append(collector)
+
+    def collect(self) -> List[dict]:
+        families = [metric.family() for metric in self._metrics]
+        for collector in self._collectors:
+            families.extend(collector())
+        return families
+
+
+def family(name: str, metric_type: str, documentation: str, labelnames: Sequence[str],
+           samples: Iterable[Tuple[tuple, float]]) -> dict:
+    """Construir una familia para un collector"""
+    return {
+        "name": name,
+        "type": metric_type,
+        "help": documentation,
+        "labelnames": list(labelnames),
+        "samples": [[list(labels), value] for labels, value in samples],
+    }
+
+
+# --- Agregación entre workers ---
+
+class MultiProcessStore:
+    """Comparte las métricas de los workers de gunicorn a través de un directorio.
+
+    Cada worker vuelca su registro en ``<directorio>/<pid>.json`` cada
+    ``flush_interval`` segundos (y justo antes de servir /metrics). Al
+    exportar se suman contadores e histogramas de todos los ficheros, también
+    los de workers ya terminados para que los contadores no retrocedan; los
+    gauges solo cuentan los de workers vivos.
+    """
+
+    def __init__(self, directory: str, registry: MetricsRegistry, flush_interval: float = 5.0):
+        self.directory = directory
+        self.registry = registry
+        self.flush_interval = flush_interval
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, f"{os.getpid()}.json")
+
+    def flush(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        snapshot = {"pid": os.getpid(), "families": self.registry.collect()}
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval)
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+    def collect(self) -> List[dict]:
+        self.flush()
+        snapshots = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return merge_snapshots(snapshots)
+
+
+def merge_snapshots(snapshots: List[dict]) -> List[dict]:
+    merged: Dict[str, dict] = {}
+    for snapshot in snapshots:
+        alive = _pid_alive(snapshot["pid"])
+        for fam in snapshot["families"]:
+            if fam["type"] == "gauge" and not alive:
+                continue
+            target = merged.setdefault(fam["name"], {**fam, "samples": {}})
+            samples = target["samples"]
+            for labels, value in fam["samples"]:
+                key = tuple(labels)
+                if key not in samples:
+                    samples[key] = _copy(value)
+                elif fam["type"] == "histogram":
+                    current = samples[key]
+                    current[0] = [a + b for a, b in zip(current[0], value[0])]
+                    current[1] += value[1]
+                    current[2] += value[2]
+                else:
+                    samples[key] += value
+    for fam in merged.values():
+        fam["samples"] = [[list(labels), value] for labels, value in fam["samples"].items()]
+    return list(merged.values())
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def prune_stale_directories(base_dir: str, current: str) -> None:
+    """Borrar los directorios de despliegues anteriores (maestro de gunicorn ya terminado)"""
+    if not os.path.isdir(base_dir):
+        return
+    for name in os.listdir(base_dir):
+        path = os.path.join(base_dir, name)
+        if path == current or not name.isdigit() or _pid_alive(int(name)):
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+
+
+# --- Formato de texto de Prometheus ---
+
+def render(families: List[dict]) -> str:
+    lines = []
+    for fam in families:
+        name = fam["name"]
+        lines.append(f"# HELP {name} {fam['help']}")
+        lines.append(f"# TYPE {name} {fam['type']}")
+        labelnames = fam["labelnames"]
+        for labels, value in fam["samples"]:
+            pairs = list(zip(labelnames, labels))
+            if fam["type"] == "histogram":
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip(fam["buckets"] + ["+Inf"], counts):
+                    cumulative += bucket_count
+                    le = bound if bound == "+Inf" else _format_value(bound)
+                    lines.append(f"{name}_bucket{_labels(pairs + [('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{_labels(pairs)} {_format_value(total)}")
+                lines.append(f"{name}_count{_labels(pairs)} {count}")
+            else:
+                lines.append(f"{name}{_labels(pairs)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _labels(pairs: List[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def status_class(status: int) -> str:
+    return f"{status // 100}xx"
+
+
+# --- Métricas de la aplicación ---
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "neocare_http_requests_total", "Requests HTTP atendidas", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "neocare_http_request_duration_seconds", "Latencia de las requests HTTP", ("method", "route", "status")
+)
+http_requests_in_flight = registry.gauge(
+    "neocare_http_requests_in_flight", "Requests HTTP en curso"
+)
+db_pool_wait = registry.histogram(
+    "neocare_db_pool_wait_seconds", "Espera para obtener una conexión del pool (incluye abrir conexiones nuevas)",
+    ("pool",), buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+db_pool_timeouts = registry.counter(
+    "neocare_db_pool_timeouts_total", "Esperas del pool que agotaron DB_POOL_TIMEOUT", ("pool",)
+)
+rate_limit_fail_open = registry.counter(
+    "neocare_rate_limit_fail_open_total", "Requests admitidas sin rate limit porque el backend SQLite estaba bloqueado"
+)
+replica_write_tracker_errors = registry.counter(
+    "neocare_replica_write_tracker_errors_total",
+    "Consultas al registro SQLite de escrituras que agotaron REPLICA_WRITE_TRACKER_TIMEOUT_MS", ("operation",)
+)
+db_read_routing = registry.counter(
+    "neocare_db_read_routing_total", "Sesiones de lectura por destino y motivo (con réplicas configuradas)",
+    ("target", "reason")
+)
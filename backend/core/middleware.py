@@ -0,0 +1,111 @@
+import json
+import math
+from typing import List, Optional, Tuple
+
+from jose import JWTError
+from starlette.requests import Request
+
+from backend.core.api_keys import hash_api_key, is_api_key, parse_prefix
+from backend.core.config import RATE_LIMIT_ROUTE_COSTS
+from backend.core.security import RateLimiter, get_client_ip, rate_limiter
+from backend.routers.auth import api_key_cache, decode_token
+
+# (método, prefijo de ruta, coste en tokens). Gana el prefijo más largo; el resto cuesta 1
+DEFAULT_ROUTE_COSTS: List[Tuple[str, str, float]] = [
+    ("POST", "/auth/login", 10),
+    ("POST", "/auth/register", 10),
+    ("POST", "/auth/refresh", 5),
+    ("POST", "/admin/users/bulk", 20),
+    ("GET", "/report/", 5),
+    ("GET", "/users/me/worklogs", 2),
+]
+
+# Rutas que no consumen tokens (health checks, scraper de métricas y documentación)
+EXEMPT_PATHS = ("/health", "/metrics", "/docs", "/redoc", "/openapi.json")
+
+
+def parse_route_costs(value: str) -> List[Tuple[str, str, float]]:
+    """Parsear RATE_LIMIT_ROUTE_COSTS: ``"POST /auth/login=10,GET /report/=5"``"""
+    costs = []
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        route, _, cost = item.rpartition("=")
+        method, _, prefix = route.strip().partition(" ")
+        if not method or not prefix or not cost:
+            raise ValueError(f"RATE_LIMIT_ROUTE_COSTS inválido: {item!r}")
+        costs.append((method.upper(), prefix.strip(), float(cost)))
+    return costs
+
+
+class RateLimitMiddleware:
+    """Middleware ASGI que aplica el rate limiter antes del routing.
+
+    La clave es el ``user_id`` del JWT de acceso, leído con ``decode_token``
+    (verificación cacheada, sin consultar la base); con una API key ya
+    validada por este worker, su prefijo (cada integración tiene su bucket).
+    Sin token válido se usa la IP del cliente detrás del proxy
+    (``FORWARDED_PROXY_HOPS``). Cada ruta consume
+    tokens según su coste, así las rutas caras se frenan antes de llegar a la
+    base de datos.
+    """
+
+    def __init__(self, app, limiter: Optional[RateLimiter] = None, route_costs=None):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+        costs = route_costs if route_costs is not None else (
+            parse_route_costs(RATE_LIMIT_ROUTE_COSTS) or DEFAULT_ROUTE_COSTS
+        )
+        self.route_costs = sorted(costs, key=lambda entry: len(entry[1]), reverse=True)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if path == "/" or path.startswith(EXEMPT_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        allowed, retry_after = await self.limiter.ahit(self.client_key(scope), self.route_cost(scope["method"], path))
+        if allowed:
+            await self.app(scope, receive, send)
+            return
+
+        body = json.dumps({
+            "detail": f"Rate limit excedido. Máximo {self.limiter.requests} requests por {self.limiter.window} segundos"
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(math.ceil(retry_after)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def route_cost(self, method: str, path: str) -> float:
+        for route_method, prefix, cost in self.route_costs:
+            if method == route_method and path.startswith(prefix):
+                return cost
+        return 1
+
+    @staticmethod
+    def client_key(scope) -> str:
+        request = Request(scope)
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and token and is_api_key(token):
+            # Solo claves que ya pasaron la autenticación: un prefijo inventado no abre un bucket nuevo
+            if api_key_cache.get(hash_api_key(token)) is not None:
+                return f"key:{parse_prefix(token)}"
+        elif scheme.lower() == "bearer" and token:
+            try:
+                payload = decode_token(token)
+            except JWTError:
+                payload = None
+            if payload and payload.get("type") == "access" and payload.get("user_id"):
+                return f"user:{payload['user_id']}"
+        return f"ip:{get_client_ip(request)}"
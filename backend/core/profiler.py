@@ -0,0 +1,255 @@
+import hmac
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from backend.core.config import (
+    PROFILE_TOKEN,
+    PROFILE_REQUEST_INTERVAL_MS,
+    PROFILE_HISTORY
+)
+
+# Funciones donde un hilo espera sin consumir CPU (fichero, función de la hoja de la pila)
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("_base.py", "wait"),
+    ("socket.py", "accept"),
+}
+
+
+class Profile:
+    """Resultado de un muestreo: cuántas veces se vio cada pila (raíz -> hoja)"""
+
+    def __init__(self, profile_id: int, name: str, counts: Dict[Tuple[str, ...], int], interval: float,
+                 duration: float, samples: int, overhead: float, started_at: datetime):
+        self.id = profile_id
+        self.name = name
+        self.counts = counts
+        self.interval = interval
+        self.duration = duration
+        self.samples = samples
+        self.overhead = overhead
+        self.started_at = started_at
+
+    @property
+    def overhead_pct(self) -> float:
+        """Tiempo de CPU del muestreador respecto a la duración del perfil"""
+        return round(self.overhead / self.duration * 100, 3) if self.duration else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_s": round(self.duration, 3),
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "stacks": sum(self.counts.values()),
+            "overhead_pct": self.overhead_pct,
+        }
+
+    def collapsed(self) -> str:
+        """Formato "collapsed stacks" (flamegraph.pl, speedscope, inferno)"""
+        lines = [f"{';'.join(stack)} {count}" for stack, count in sorted(self.counts.items())]
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> dict:
+        """Perfil "sampled" en el formato de fichero de speedscope"""
+        frames: List[dict] = []
+        index: Dict[str, int] = {}
+        samples, weights = [], []
+        for stack, count in self.counts.items():
+            sample = []
+            for label in stack:
+                if label not in index:
+                    index[label] = len(frames)
+                    frames.append(_speedscope_frame(label))
+                sample.append(index[label])
+            samples.append(sample)
+            weights.append(round(count * self.interval * 1000, 3))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "exporter": "neocare-profiler",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": self.name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 3),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+
+def _speedscope_frame(label: str) -> dict:
+    # label: "funcion (ruta/fichero.py:linea)" o "thread:Nombre"
+    name, _, location = label.partition(" (")
+    if not location:
+        return {"name": label}
+    file, _, line = location.rstrip(")").rpartition(":")
+    return {"name": name, "file": file, "line": int(line) if line.isdigit() else None}
+
+
+class StackSampler:
+    """Muestreador estadístico de pilas de todos los hilos del proceso.
+
+    Cada ``interval`` segundos un hilo aparte lee ``sys._current_frames()``
+    y cuenta la pila de cada hilo. No instrumenta el código, así que el
+    coste es fijo por muestra (medido en ``Profile.overhead``) e
+    independiente de la carga. Los hilos en espera (pool sin trabajo, event
+    loop en select, ...) se descartan salvo ``include_idle``.
+    """
+
+    def __init__(self, interval: float = 0.01, include_idle: bool = False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.counts: Dict[Tuple[str, ...], int] = {}
+        self.samples = 0
+        self.overhead = 0.0
+        self._labels: Dict[object, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+        self._started_at = datetime.utcnow()
+
+    def start(self) -> "StackSampler":
+        self._started = time.perf_counter()
+        self._started_at = datetime.utcnow()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, profile_id: int = 0, name: str = "profile") -> Profile:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return Profile(
+            profile_id, name, self.counts, self.interval, time.perf_counter() - self._started,
+            self.samples, self.overhead, self._started_at
+        )
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            start = time.perf_counter()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = self._stack(frame, names.get(thread_id, str(thread_id)))
+                if stack is not None:
+                    self.counts[stack] = self.counts.get(stack, 0) + 1
+            self.samples += 1
+            self.overhead += time.perf_counter() - start
+
+    def _stack(self, frame, thread_name: str) -> Optional[Tuple[str, ...]]:
+        if not self.include_idle:
+            code = frame.f_code
+            if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                return None
+        labels = []
+        while frame is not None:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        labels.append(f"thread:{thread_name}")
+        labels.reverse()
+        return tuple(labels)
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            for path in sys.path:
+                if path and filename.startswith(path):
+                    filename = filename[len(path):].lstrip(os.sep)
+                    break
+            label = self._labels[code] = f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ",")
+        return label
+
+
+class ProfileStore:
+    """Últimos perfiles de este worker, consultables por id"""
+
+    def __init__(self, capacity: int = 20):
+        self.capacity = capacity
+        self._profiles: "OrderedDict[int, Profile]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        # Un solo muestreo a la vez por worker
+        self.busy = threading.Lock()
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def add(self, profile: Profile) -> None:
+        with self._lock:
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self.capacity:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: int) -> Optional[Profile]:
+        return self._profiles.get(profile_id)
+
+    def list(self) -> List[Profile]:
+        with self._lock:
+            return list(reversed(self._profiles.values()))
+
+
+profile_store = ProfileStore(PROFILE_HISTORY)
+
+
+class ProfilingMiddleware:
+    """Perfila una request concreta si trae ``X-Profile-Token: <PROFILE_TOKEN>``.
+
+    El perfil queda en ``profile_store`` y la respuesta indica su id en
+    ``X-Profile-Id`` (se descarga desde /admin/profiles/{id}). Sin
+    PROFILE_TOKEN configurado el middleware no hace nada. Se muestrean todos
+    los hilos, así que otras requests simultáneas también aparecen.
+    """
+
+    def __init__(self, app, token: str = PROFILE_TOKEN, interval_ms: float = PROFILE_REQUEST_INTERVAL_MS):
+        self.app = app
+        self.token = token.encode()
+        self.interval = interval_ms / 1000
+
+    async def __call__(self, scope, receive, send):
+        if not self.token or scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+        if not profile_store.busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = profile_store.next_id()
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + [
+                    (b"x-profile-id", str(profile_id).encode())
+                ]}
+            await send(message)
+
+        sampler = StackSampler(self.interval).start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile_store.add(sampler.stop(profile_id, f"{scope['method']} {scope['path']}"))
+            profile_store.busy.release()
+
+    def _requested(self, scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == b"x-profile-token":
+                return hmac.compare_digest(value, self.token)
+        return False
+
@@ -0,0 +1,138 @@
+import csv
+import io
+import json
+from typing import Iterable, List, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.core.config import release_connection
+from backend.models.board import Board
+from backend.models.user import User
+from backend.routers.auth import UserCreate
+from backend.schemas.provisioning import ProvisioningReport, ProvisioningRowResult
+
+DEFAULT_BOARD_TITLE = "Mi primer tablero"
+
+
+def parse_rows(content: bytes, content_type: str = "application/json") -> List[dict]:
+    """Leer el personal a dar de alta desde CSV (cabecera username,email,password) o JSON"""
+    text = content.decode("utf-8-sig")
+    if "csv" in content_type:
+        return [dict(row) for row in csv.DictReader(io.StringIO(text))]
+
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = data.get("users", [])
+    if not isinstance(data, list):
+        raise ValueError("Se esperaba una lista de usuarios")
+    return data
+
+
+def prepare_rows(db: Session, rows: List[dict]) -> Tuple[List[Tuple[int, UserCreate]], List[ProvisioningRowResult]]:
+    """Validar las filas y descartar emails duplicados (en el lote o ya registrados)"""
+    results: List[ProvisioningRowResult] = []
+    candidates: List[Tuple[int, UserCreate]] = []
+    seen = set()
+
+    for number, row in enumerate(rows, start=1):
+        email = row.get("email") if isinstance(row, dict) else None
+        try:
+            user = UserCreate.model_validate(row)
+        except ValidationError as e:
+            error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            results.append(ProvisioningRowResult(row=number, email=email, status="error", error=error))
+            continue
+
+        key = user.email.lower()
+        if key in seen:
+            results.append(ProvisioningRowResult(row=number, email=user.email, status="error", error="Email duplicado en el lote"))
+            continue
+        seen.add(key)
+        candidates.append((number, user))
+
+    # Una sola consulta para todos los emails ya registrados
+    existing = _registered_emails(db, [user.email for _, user in candidates])
+    # Sin retener la conexión durante el hashing: insert_users abre otra transacción
+    release_connection(db)
+
+    valid = []
+    for number, user in candidates:
+        if user.email.lower() in existing:
+            results.append(ProvisioningRowResult(row=number, email=user.email, status="error", error="El email ya está registrado"))
+        else:
+            valid.append((number, user))
+    return valid, results
+
+
+def _registered_emails(db: Session, emails: Iterable[str]) -> Set[str]:
+    emails = list(emails)
+    if not emails:
+        return set()
+    return {email.lower() for (email,) in db.query(User.email).filter(User.email.in_(emails)).all()}
+
+
+def insert_users(db: Session, valid: List[Tuple[int, UserCreate]], password_hashes: List[str]) -> List[ProvisioningRowResult]:
+    """Insertar usuarios y tableros por defecto con INSERT multi-fila en una transacción.
+
+    Si otra request registra alguno de los emails entre ``prepare_rows`` y el
+    INSERT, esas filas se devuelven como ``conflict`` y el resto se reintenta.
+    """
+    results: List[ProvisioningRowResult] = []
+    while valid:
+        try:
+            return results + _insert_batch(db, valid, password_hashes)
+        except IntegrityError:
+            taken = _registered_emails(db, [user.email for _, user in valid])
+            if not taken:
+                raise
+            results += [
+                ProvisioningRowResult(row=number, email=user.email, status="conflict", error="El email ya está registrado")
+                for number, user in valid if user.email.lower() in taken
+            ]
+            remaining = [(row, password_hash) for row, password_hash in zip(valid, password_hashes)
+                         if row[1].email.lower() not in taken]
+            valid = [row for row, _ in remaining]
+            password_hashes = [password_hash for _, password_hash in remaining]
+    return results
+
+
+def _insert_batch(db: Session, valid: List[Tuple[int, UserCreate]], password_hashes: List[str]) -> List[ProvisioningRowResult]:
+    try:
+        users = db.execute(
+            insert(User).returning(User.id, sort_by_parameter_order=True),
+            [
+                {"username": user.username, "email": user.email, "password_hash": password_hash}
+                for (_, user), password_hash in zip(valid, password_hashes)
+            ]
+        ).all()
+        user_ids = [row.id for row in users]
+
+        boards = db.execute(
+            insert(Board).returning(Board.id, sort_by_parameter_order=True),
+            [{"title": DEFAULT_BOARD_TITLE, "user_id": user_id} for user_id in user_ids]
+        ).all()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return [
+        ProvisioningRowResult(row=number, email=user.email, status="created", id=user_id, default_board_id=board.id)
+        for (number, user), user_id, board in zip(valid, user_ids, boards)
+    ]
+
+
+def build_report(total: int, results: List[ProvisioningRowResult], elapsed: float) -> ProvisioningReport:
+    results = sorted(results, key=lambda result: result.row)
+    created = sum(1 for result in results if result.status == "created")
+    return ProvisioningReport(
+        total=total,
+        created=created,
+        failed=total - created,
+        elapsed_ms=round(elapsed * 1000, 1),
+        rows_per_second=round(created / elapsed, 1) if elapsed > 0 else 0.0,
+        results=results
+    )
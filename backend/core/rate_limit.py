@@ -0,0 +1,216 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from backend.core.metrics import rate_limit_fail_open
+
+
+class MemoryRateLimitBackend:
+    """Token buckets en memoria del proceso: el más rápido, pero cada worker
+    de gunicorn tiene su propio presupuesto."""
+
+    # Sin I/O: se comprueba directamente en el event loop
+    blocking = False
+
+    def __init__(self, sweep_interval: int = 60):
+        self.sweep_interval = sweep_interval
+        self.buckets: Dict[str, list] = {}
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    def hit(self, key: str, cost: float, capacity: float, rate: float, window: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self.evict_idle(window, now)
+
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            tokens = capacity
+            bucket = self.buckets[key] = [tokens, now]
+        else:
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+
+        if tokens >= cost:
+            bucket[0] = tokens - cost
+            return True, 0.0
+        bucket[0] = tokens
+        return False, (cost - tokens) / rate
+
+    def evict_idle(self, window: float, now: Optional[float] = None) -> int:
+        # Un bucket inactivo durante una ventana completa ya está lleno
+        if now is None:
+            now = time.monotonic()
+        cutoff = now - window
+        idle = [key for key, bucket in self.buckets.items() if bucket[1] <= cutoff]
+        for key in idle:
+            del self.buckets[key]
+        self._next_sweep = now + self.sweep_interval
+        return len(idle)
+
+    def __len__(self) -> int:
+        return len(self.buckets)
+
+
+class SQLiteRateLimitBackend:
+    """Token buckets en un fichero SQLite local compartido por los workers del nodo.
+
+    Cada comprobación es un único UPSERT ... RETURNING, atómico frente al
+    resto de procesos. El fichero va en WAL y sin fsync: el estado del rate
+    limiter no necesita sobrevivir a un reinicio.
+
+    Desde el event loop (``RateLimiter.ahit``) se intenta primero sin esperar
+    (``try_hit``); solo si otro proceso tiene el bloqueo del fichero la
+    comprobación pasa a un hilo, que espera como mucho ``timeout`` segundos.
+    Pasado ese tiempo la request se admite (fail open, contado en
+    ``neocare_rate_limit_fail_open_total``) en lugar de retenerla.
+    """
+
+    blocking = True
+
+    _UPSERT = """
+        INSERT INTO buckets (key, tokens, updated, allowed)
+        VALUES (:key, :capacity - :cost, :now, :capacity >= :cost)
+        ON CONFLICT(key) DO UPDATE SET
+            allowed = min(:capacity, tokens + (:now - updated) * :rate) >= :cost,
+            tokens = CASE
+                WHEN min(:capacity, tokens + (:now - updated) * :rate) >= :cost
+                THEN min(:capacity, tokens + (:now - updated) * :rate) - :cost
+                ELSE min(:capacity, tokens + (:now - updated) * :rate)
+            END,
+            updated = :now
+        RETURNING tokens, allowed
+    """
+
+    def __init__(self, path: str, sweep_interval: int = 60, timeout: float = 0.05):
+        self.path = path
+        self.sweep_interval = sweep_interval
+        self.timeout = timeout
+        self._local = threading.local()
+        self._next_sweep = 0.0
+
+    def _connection(self, timeout: Optional[float] = None) -> sqlite3.Connection:
+        # Una conexión por proceso, hilo y espera máxima: las conexiones no sobreviven a un fork
+        if timeout is None:
+            timeout = self.timeout
+        if getattr(self._local, "pid", None) != os.getpid():
+            self._local.conns = {}
+            self._local.pid = os.getpid()
+        conn = self._local.conns.get(timeout)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, allowed INTEGER NOT NULL)"
+            )
+            self._local.conns[timeout] = conn
+        return conn
+
+    def _upsert(self, key: str, cost: float, capacity: float, rate: float, window: float,
+                timeout: float) -> Optional[Tuple[bool, float]]:
+        now = time.time()
+        try:
+            conn = self._connection(timeout)
+            if now >= self._next_sweep:
+                self.evict_idle(window, now, conn)
+
+            tokens, allowed = conn.execute(
+                self._UPSERT,
+                {"key": key, "cost": cost, "capacity": capacity, "rate": rate, "now": now}
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        if allowed:
+            return True, 0.0
+        return False, (cost - tokens) / rate
+
+    def hit(self, key: str, cost: float, capacity: float, rate: float, window: float) -> Tuple[bool, float]:
+        result = self._upsert(key, cost, capacity, rate, window, self.timeout)
+        if result is None:
+            # Fichero bloqueado más de ``timeout``: mejor sin límite que con la request retenida
+            rate_limit_fail_open.inc()
+            return True, 0.0
+        return result
+
+    def try_hit(self, key: str, cost: float, capacity: float, rate: float,
+                window: float) -> Optional[Tuple[bool, float]]:
+        """``hit`` sin esperar por el bloqueo del fichero; ``None`` si otro proceso lo tiene"""
+        return self._upsert(key, cost, capacity, rate, window, 0)
+
+    def evict_idle(self, window: float, now: Optional[float] = None, conn: Optional[sqlite3.Connection] = None) -> int:
+        if now is None:
+            now = time.time()
+        self._next_sweep = now + self.sweep_interval
+        conn = conn if conn is not None else self._connection()
+        return conn.execute("DELETE FROM buckets WHERE updated <= ?", (now - window,)).rowcount
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT count(*) FROM buckets").fetchone()[0]
+
+
+class RedisRateLimitBackend:
+    """Token buckets en Redis (o compatible) mediante un script Lua atómico.
+
+    Requiere el paquete opcional ``redis``; sirve también para compartir el
+    límite entre varios nodos. El cliente es síncrono: desde el event loop
+    cada comprobación se ejecuta en un hilo.
+    """
+
+    blocking = True
+
+    _SCRIPT = """
+        local capacity = tonumber(ARGV[1])
+        local rate = tonumber(ARGV[2])
+        local cost = tonumber(ARGV[3])
+        local ttl = tonumber(ARGV[4])
+        local now = redis.call('TIME')
+        now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+        local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+        local tokens = capacity
+        if bucket[1] then
+            tokens = math.min(capacity, tonumber(bucket[1]) + (now - tonumber(bucket[2])) * rate)
+        end
+        local allowed = 0
+        if tokens >= cost then
+            tokens = tokens - cost
+            allowed = 1
+        end
+        redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+        redis.call('EXPIRE', KEYS[1], ttl)
+        return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url: str, prefix: str = "neocare:ratelimit:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requiere el paquete 'redis' (pip install redis)") from e
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(self._SCRIPT)
+
+    def hit(self, key: str, cost: float, capacity: float, rate: float, window: float) -> Tuple[bool, float]:
+        # Las claves expiran solas tras una ventana de inactividad
+        allowed, tokens = self._script(keys=[self.prefix + key], args=[capacity, rate, cost, int(window) + 1])
+        if int(allowed):
+            return True, 0.0
+        return False, (cost - float(tokens)) / rate
+
+    def try_hit(self, key: str, cost: float, capacity: float, rate: float,
+                window: float) -> Optional[Tuple[bool, float]]:
+        # Siempre hay un viaje de red: directamente al hilo
+        return None
+
+
+def create_backend(name: str, sqlite_path: str = "", redis_url: str = "", sweep_interval: int = 60,
+                   sqlite_timeout: float = 0.05):
+    if name == "memory":
+        return MemoryRateLimitBackend(sweep_interval=sweep_interval)
+    if name == "sqlite":
+        return SQLiteRateLimitBackend(sqlite_path, sweep_interval=sweep_interval, timeout=sqlite_timeout)
+    if name == "redis":
+        return RedisRateLimitBackend(redis_url)
+    raise ValueError(f"RATE_LIMIT_BACKEND desconocido: {name}")
@@ -0,0 +1,315 @@
+import asyncio
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+from urllib.parse import urlsplit
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.core.config import (
+    create_async_db_engine,
+    get_async_sessionmaker,
+    DATABASE_REPLICA_URLS,
+    REPLICA_BALANCING,
+    REPLICA_READ_YOUR_WRITES_SECONDS,
+    REPLICA_WRITE_TRACKER,
+    REPLICA_WRITE_TRACKER_PATH,
+    REPLICA_WRITE_TRACKER_TIMEOUT_MS,
+    REPLICA_COOLDOWN_SECONDS,
+    REPLICA_MAX_LAG_SECONDS,
+    REPLICA_LAG_CHECK_SECONDS
+)
+from backend.core.db_pool import InstrumentedReplicaQueuePool, async_database_url
+from backend.core.metrics import db_read_routing, replica_write_tracker_errors
+
+logger = logging.getLogger("neocare.db")
+
+# Segundos de retraso de la réplica respecto al primario (0 si ya aplicó todo lo recibido)
+_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReadOnlySessionError(RuntimeError):
+    """Se intentó escribir con una sesión de ``get_read_db``"""
+
+
+class MemoryWriteTracker:
+    """Última escritura de cada usuario en memoria: solo la ve el worker que escribió"""
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._writes: "OrderedDict[int, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, user_id: int, at: float) -> None:
+        with self._lock:
+            self._writes[user_id] = at
+            self._writes.move_to_end(user_id)
+            while len(self._writes) > self.max_entries:
+                self._writes.popitem(last=False)
+
+    def last_write(self, user_id: int) -> Optional[float]:
+        return self._writes.get(user_id)
+
+
+class SQLiteWriteTracker:
+    """Última escritura de cada usuario en un fichero SQLite local compartido por
+    los workers del nodo (como ``SQLiteRateLimitBackend``): la lectura que sigue
+    a una escritura puede caer en cualquier worker.
+
+    Se llama desde el event loop (cada sesión de ``get_read_db`` y cada commit
+    con escrituras), así que la espera por el bloqueo del fichero se limita a
+    ``timeout`` segundos. Si se agota, la lectura va al primario y la escritura
+    se apunta solo en la memoria del worker (``neocare_replica_write_tracker_errors_total``).
+    """
+
+    def __init__(self, path: str, retention: float = 60, sweep_interval: int = 60, timeout: float = 0.05):
+        self.path = path
+        self.retention = retention
+        self.sweep_interval = sweep_interval
+        self.timeout = timeout
+        self._local = threading.local()
+        self._next_sweep = 0.0
+        self._fallback = MemoryWriteTracker()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Una conexión por proceso e hilo: las conexiones no sobreviven a un fork
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE IF NOT EXISTS writes (user_id INTEGER PRIMARY KEY, written_at REAL NOT NULL)")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def record(self, user_id: int, at: float) -> None:
+        try:
+            conn = self._connection()
+            if at >= self._next_sweep:
+                self._next_sweep = at + self.sweep_interval
+                conn.execute("DELETE FROM writes WHERE written_at < ?", (at - self.retention,))
+            conn.execute(
+                "INSERT INTO writes (user_id, written_at) VALUES (?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET written_at = max(written_at, excluded.written_at)",
+                (user_id, at)
+            )
+        except sqlite3.OperationalError:
+            # Fichero bloqueado más de ``timeout``: al menos este worker leerá del primario
+            replica_write_tracker_errors.inc(("record",))
+            self._fallback.record(user_id, at)
+
+    def last_write(self, user_id: int) -> Optional[float]:
+        local = self._fallback.last_write(user_id)
+        try:
+            row = self._connection().execute(
+                "SELECT written_at FROM writes WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        except sqlite3.OperationalError:
+            # Sin saber si hubo escritura reciente, lo seguro es leer del primario
+            replica_write_tracker_errors.inc(("last_write",))
+            return time.time()
+        if row is None:
+            return local
+        return row[0] if local is None else max(row[0], local)
+
+
+class Replica:
+    """Una réplica de lectura con su engine y su estado en este worker"""
+
+    def __init__(self, name: str, engine):
+        self.name = name
+        self.engine = engine
+        self.in_use = 0
+        self.unhealthy_until = 0.0
+        self.next_lag_check = 0.0
+        self.last_error: Optional[str] = None
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+
+class ReplicaRouter:
+    """Reparte las sesiones de lectura entre las réplicas de DATABASE_REPLICA_URLS.
+
+    - Balanceo ``least_connections`` (la réplica con menos sesiones abiertas
+      en el worker; los empates rotan) o ``round_robin``.
+    - Read-your-writes: durante ``read_your_writes`` segundos después de que
+      un usuario confirme una escritura, sus lecturas van al primario.
+    - Salud: la conexión se pide al abrir la sesión, así que una réplica caída
+      falla antes de llegar al handler; se aparta ``cooldown`` segundos y se
+      prueba la siguiente. En PostgreSQL también se aparta si su lag supera
+      ``max_lag`` (comprobado como mucho cada ``lag_check_interval``).
+    - Sin réplicas sanas (o sin réplicas) se lee del primario.
+    """
+
+    def __init__(self, urls: List[str], balancing: str = "least_connections", read_your_writes: float = 5,
+                 cooldown: float = 30, max_lag: float = 10, lag_check_interval: float = 5,
+                 write_tracker=None, engine_factory=create_async_db_engine):
+        if balancing not in ("least_connections", "round_robin"):
+            raise ValueError(f"REPLICA_BALANCING desconocido: {balancing}")
+        self.balancing = balancing
+        self.read_your_writes = read_your_writes
+        self.cooldown = cooldown
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self.write_tracker = write_tracker if write_tracker is not None else MemoryWriteTracker()
+        self.replicas = [
+            Replica(_replica_name(url, index), engine_factory(async_database_url(url), InstrumentedReplicaQueuePool))
+            for index, url in enumerate(urls, 1)
+        ]
+        self._turn = itertools.count()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def note_write(self, user_id: int) -> None:
+        if self.replicas:
+            self.write_tracker.record(user_id, time.time())
+
+    def recently_wrote(self, user_id: int) -> bool:
+        last_write = self.write_tracker.last_write(user_id)
+        return last_write is not None and time.time() - last_write < self.read_your_writes
+
+    def candidates(self) -> List[Replica]:
+        """Réplicas sanas en el orden en que se probarán"""
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return []
+        start = next(self._turn) % len(healthy)
+        ordered = healthy[start:] + healthy[:start]
+        if self.balancing == "least_connections":
+            # sort es estable: a igualdad de sesiones se mantiene la rotación
+            ordered.sort(key=lambda replica: replica.in_use)
+        return ordered
+
+    def mark_unhealthy(self, replica: Replica, reason: str) -> None:
+        replica.unhealthy_until = time.monotonic() + self.cooldown
+        replica.last_error = reason
+        logger.warning(f"Réplica {replica.name} apartada {self.cooldown:.0f}s: {reason}")
+
+    @asynccontextmanager
+    async def session(self, user_id: int) -> AsyncIterator[AsyncSession]:
+        """Sesión de solo lectura en una réplica o, si no puede ser, en el primario"""
+        if self.replicas and self.recently_wrote(user_id):
+            db_read_routing.inc(("primary", "recent_write"))
+        elif self.replicas:
+            for replica in self.candidates():
+                db = await self._open(replica)
+                if db is None:
+                    continue
+                db_read_routing.inc(("replica", "balanced"))
+                replica.in_use += 1
+                try:
+                    yield db
+                finally:
+                    replica.in_use -= 1
+                    await db.close()
+                return
+            db_read_routing.inc(("primary", "unavailable"))
+
+        async with get_async_sessionmaker()() as db:
+            db.info["read_only"] = True
+            yield db
+
+    async def _open(self, replica: Replica) -> Optional[AsyncSession]:
+        db = AsyncSession(replica.engine, autoflush=False, expire_on_commit=False)
+        db.info["read_only"] = True
+        try:
+            # Checkout y BEGIN ahora: una réplica caída falla aquí y no a mitad del handler
+            connection = await db.connection()
+            if replica.engine.dialect.name == "postgresql" and time.monotonic() >= replica.next_lag_check:
+                replica.next_lag_check = time.monotonic() + self.lag_check_interval
+                lag = float(await connection.scalar(_LAG_QUERY) or 0)
+                if lag > self.max_lag:
+                    self.mark_unhealthy(replica, f"lag de {lag:.1f}s")
+                    await db.close()
+                    return None
+        except exc.TimeoutError:
+            # Pool agotado: la réplica está ocupada, no caída
+            await db.close()
+            return None
+        except (exc.SQLAlchemyError, OSError, asyncio.TimeoutError) as e:
+            await db.close()
+            self.mark_unhealthy(replica, str(e).splitlines()[0] if str(e) else type(e).__name__)
+            return None
+        return db
+
+    def status(self) -> List[dict]:
+        return [
+            {
+                "name": replica.name,
+                "healthy": replica.healthy,
+                "in_use": replica.in_use,
+                "last_error": replica.last_error,
+            }
+            for replica in self.replicas
+        ]
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+def _replica_name(url: str, index: int) -> str:
+    # host:puerto sin credenciales (etiqueta de métricas y logs)
+    parts = urlsplit(url)
+    if not parts.hostname:
+        return f"replica{index}"
+    return f"{parts.hostname}:{parts.port}" if parts.port else parts.hostname
+
+
+def create_write_tracker(name: str, sqlite_path: str = "", retention: float = 60, sqlite_timeout: float = 0.05):
+    if name == "memory":
+        return MemoryWriteTracker()
+    if name == "sqlite":
+        return SQLiteWriteTracker(sqlite_path, retention=retention, timeout=sqlite_timeout)
+    raise ValueError(f"REPLICA_WRITE_TRACKER desconocido: {name}")
+
+
+# Eventos de sesión (primario y réplicas). ``info["user_id"]`` lo pone la autenticación
+# en la sesión de la request; ``info["read_only"]``, get_read_db
+@event.listens_for(Session, "before_flush")
+def _reject_read_only_flush(session, flush_context, instances):
+    if session.info.get("read_only"):
+        raise ReadOnlySessionError("La sesión de lectura (get_read_db) no admite escrituras")
+
+
+@event.listens_for(Session, "after_flush")
+def _flag_write(session, flush_context):
+    if "user_id" in session.info:
+        session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _track_write(session):
+    if session.info.pop("wrote", False):
+        replica_router.note_write(session.info["user_id"])
+
+
+# Instancia global
+replica_router = ReplicaRouter(
+    DATABASE_REPLICA_URLS,
+    balancing=REPLICA_BALANCING,
+    read_your_writes=REPLICA_READ_YOUR_WRITES_SECONDS,
+    cooldown=REPLICA_COOLDOWN_SECONDS,
+    max_lag=REPLICA_MAX_LAG_SECONDS,
+    lag_check_interval=REPLICA_LAG_CHECK_SECONDS,
+    write_tracker=create_write_tracker(
+        REPLICA_WRITE_TRACKER, REPLICA_WRITE_TRACKER_PATH, retention=max(60, REPLICA_READ_YOUR_WRITES_SECONDS * 2),
+        sqlite_timeout=REPLICA_WRITE_TRACKER_TIMEOUT_MS / 1000
+    )
+)
@@ -0,0 +1,141 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from backend.core.config import (
+    SessionLocal,
+    TOKEN_REVOCATION_SYNC_SECONDS,
+    TOKEN_REVOCATION_PRUNE_SECONDS
+)
+from backend.models.revoked_token import RevokedToken
+
+logger = logging.getLogger("neocare.auth")
+
+
+class RevocationStore:
+    """Tokens revocados (jti o familia de refresh) consultables en O(1).
+
+    La fuente de verdad es la tabla revoked_tokens; cada worker mantiene una
+    copia en memoria (jti -> exp) que sincroniza como mucho cada
+    ``sync_interval`` segundos, así get_current_user no consulta la base en
+    cada request. Las entradas se descartan al expirar el token.
+    """
+
+    def __init__(self, session_factory=SessionLocal, sync_interval: int = 5, prune_interval: int = 3600):
+        self.session_factory = session_factory
+        self.sync_interval = sync_interval
+        self.prune_interval = prune_interval
+        self._revoked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._watermark: Optional[datetime] = None
+        self._next_sync = 0.0
+        self._next_prune = 0.0
+
+    def is_revoked(self, *token_ids: Optional[str]) -> bool:
+        self._maybe_sync()
+        now = time.time()
+        for token_id in token_ids:
+            if token_id is None:
+                continue
+            expires_at = self._revoked.get(token_id)
+            if expires_at is not None and expires_at > now:
+                return True
+        return False
+
+    def sync_due(self) -> bool:
+        """Si la próxima llamada a ``is_revoked`` consultará la base de datos"""
+        return time.monotonic() >= self._next_sync
+
+    def revoke(self, token_id: str, expires_at: datetime) -> bool:
+        """Revocar un token. Devuelve False si ya estaba revocado (en cualquier worker)"""
+        db = self.session_factory()
+        try:
+            db.add(RevokedToken(jti=token_id, expires_at=expires_at, revoked_at=datetime.utcnow()))
+            db.commit()
+            newly_revoked = True
+        except IntegrityError:
+            db.rollback()
+            newly_revoked = False
+        finally:
+            db.close()
+
+        with self._lock:
+            self._revoked[token_id] = _timestamp(expires_at)
+        return newly_revoked
+
+    def _maybe_sync(self) -> None:
+        now = time.monotonic()
+        if now < self._next_sync:
+            return
+        with self._lock:
+            if now < self._next_sync:
+                return
+            self._next_sync = now + self.sync_interval
+        self.sync()
+        if now >= self._next_prune:
+            self._next_prune = now + self.prune_interval
+            self.prune()
+
+    def sync(self) -> None:
+        """Cargar revocaciones hechas por otros workers desde la última sincronización"""
+        started = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            query = db.query(RevokedToken.jti, RevokedToken.expires_at).filter(
+                RevokedToken.expires_at > started
+            )
+            if self._watermark is not None:
+                # Margen para tolerar desfase de reloj entre nodos
+                query = query.filter(
+                    RevokedToken.revoked_at >= self._watermark - timedelta(seconds=self.sync_interval * 2)
+                )
+            rows = query.all()
+        except SQLAlchemyError as e:
+            logger.warning(f"No se pudo sincronizar la lista de tokens revocados: {e}")
+            return
+        finally:
+            db.close()
+
+        with self._lock:
+            for token_id, expires_at in rows:
+                self._revoked[token_id] = _timestamp(expires_at)
+            self._watermark = started
+
+    def prune(self) -> None:
+        """Eliminar de memoria y de la tabla las revocaciones de tokens ya expirados"""
+        now = time.time()
+        with self._lock:
+            expired = [token_id for token_id, expires_at in self._revoked.items() if expires_at <= now]
+            for token_id in expired:
+                del self._revoked[token_id]
+
+        db = self.session_factory()
+        try:
+            db.query(RevokedToken).filter(RevokedToken.expires_at <= datetime.utcnow()).delete(
+                synchronize_session=False
+            )
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.warning(f"No se pudieron purgar los tokens revocados expirados: {e}")
+        finally:
+            db.close()
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+
+def _timestamp(value: datetime) -> float:
+    # Las fechas se guardan en UTC sin zona horaria
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+
+# Instancia global
+revocation_store = RevocationStore(
+    sync_interval=TOKEN_REVOCATION_SYNC_SECONDS,
+    prune_interval=TOKEN_REVOCATION_PRUNE_SECONDS
+)
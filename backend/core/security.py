@@ -1,39 +1,192 @@
 from fastapi import Request, HTTPException
-from collections import defaultdict
-from datetime import datetime, timedelta
-from typing import Dict, Tuple
-import asyncio
+from collections import OrderedDict
+from typing import Tuple
+import anyio.to_thread
+import hashlib
+import math
+import threading
+import time
+from backend.core.rate_limit import MemoryRateLimitBackend, create_backend
+from backend.core.config import (
+    FORWARDED_PROXY_HOPS,
+    RATE_LIMIT_REQUESTS,
+    RATE_LIMIT_WINDOW_SECONDS,
+    RATE_LIMIT_SWEEP_SECONDS,
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_SQLITE_PATH,
+    RATE_LIMIT_SQLITE_TIMEOUT_MS,
+    RATE_LIMIT_REDIS_URL,
+    LOGIN_MAX_FAILURES_PER_EMAIL,
+    LOGIN_MAX_FAILURES_PER_IP,
+    LOGIN_BACKOFF_BASE_SECONDS,
+    LOGIN_BACKOFF_MAX_SECONDS,
+    LOGIN_THROTTLE_IDLE_SECONDS,
+    LOGIN_THROTTLE_MAX_ENTRIES
+)
+
+def get_client_ip(request: Request) -> str:
+    """IP del cliente teniendo en cuenta los proxies de confianza"""
+    if FORWARDED_PROXY_HOPS > 0:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            hops = [ip.strip() for ip in forwarded.split(",") if ip.strip()]
+            if hops:
+                return hops[-min(FORWARDED_PROXY_HOPS, len(hops))]
+    return request.client.host if request.client else "unknown"
 
 class RateLimiter:
-    """Rate limiter simple basado en IP"""
+    """Rate limiter por token bucket.
+
+    Cada cliente tiene un bucket de tamaño fijo y la comprobación es O(1): los
+    tokens se recargan a ``requests / window`` por segundo hasta ``requests``.
+    El estado vive en un backend intercambiable (ver core/rate_limit.py):
+    memoria del proceso, SQLite compartido por los workers del nodo o Redis.
+    Desde el event loop se usa ``ahit``: con los backends que hacen I/O, lo que
+    no se resuelve sin esperar corre en sus propios ``threads`` hilos, aparte
+    del threadpool de los handlers.
+    """
     
-    def __init__(self, requests: int = 100, window: int = 60):
+    def __init__(self, requests: int = 100, window: int = 60, backend=None, threads: int = 4):
         self.requests = requests
         self.window = window
-        self.clients: Dict[str, list] = defaultdict(list)
+        self.rate = requests / window
+        self.backend = backend if backend is not None else MemoryRateLimitBackend()
+        self.threads = threads
+        self._thread_limiter = None
+
+    def hit(self, key: str, cost: float = 1) -> Tuple[bool, float]:
+        """Consumir ``cost`` tokens. Devuelve (permitido, segundos hasta poder reintentar)"""
+        return self.backend.hit(key, cost, self.requests, self.rate, self.window)
+
+    async def ahit(self, key: str, cost: float = 1) -> Tuple[bool, float]:
+        """``hit`` sin bloquear el event loop con la espera de SQLite o Redis"""
+        if not self.backend.blocking:
+            return self.hit(key, cost)
+        result = self.backend.try_hit(key, cost, self.requests, self.rate, self.window)
+        if result is not None:
+            return result
+        if self._thread_limiter is None:
+            # Se crea con el primer uso: necesita el event loop en marcha
+            self._thread_limiter = anyio.CapacityLimiter(self.threads)
+        return await anyio.to_thread.run_sync(self.hit, key, cost, limiter=self._thread_limiter)
     
     async def check_rate_limit(self, request: Request):
-        client_ip = request.client.host if request.client else "unknown"
-        now = datetime.utcnow()
-        
-        # Limpiar requests antiguos
-        self.clients[client_ip] = [
-            req_time for req_time in self.clients[client_ip]
-            if now - req_time < timedelta(seconds=self.window)
-        ]
-        
-        # Verificar límite
-        if len(self.clients[client_ip]) >= self.requests:
+        allowed, retry_after = await self.ahit(get_client_ip(request))
+        if not allowed:
             raise HTTPException(
                 status_code=429,
-                detail=f"Rate limit excedido. Máximo {self.requests} requests por {self.window} segundos"
+                detail=f"Rate limit excedido. Máximo {self.requests} requests por {self.window} segundos",
+                headers={"Retry-After": str(math.ceil(retry_after))}
             )
-        
-        # Registrar request
-        self.clients[client_ip].append(now)
 
 # Instancia global
-rate_limiter = RateLimiter(requests=100, window=60)
+rate_limiter = RateLimiter(
+    requests=RATE_LIMIT_REQUESTS,
+    window=RATE_LIMIT_WINDOW_SECONDS,
+    backend=create_backend(
+        RATE_LIMIT_BACKEND,
+        sqlite_path=RATE_LIMIT_SQLITE_PATH,
+        redis_url=RATE_LIMIT_REDIS_URL,
+        sweep_interval=RATE_LIMIT_SWEEP_SECONDS,
+        sqlite_timeout=RATE_LIMIT_SQLITE_TIMEOUT_MS / 1000
+    )
+)
+
+class _FailureEntry:
+    __slots__ = ("failures", "blocked_until", "last_seen")
+
+    def __init__(self, now: float):
+        self.failures = 0
+        self.blocked_until = 0.0
+        self.last_seen = now
+
+class LoginThrottle:
+    """Contadores de fallos de login por email y por IP con backoff exponencial.
+
+    Se consulta antes de buscar al usuario y de calcular el hash, así un
+    ataque de credential stuffing cuesta microsegundos por intento. Las claves
+    se guardan como digest de 8 bytes y las entradas inactivas se desalojan.
+    La IP es la de ``get_client_ip``: detrás de un proxy requiere
+    ``FORWARDED_PROXY_HOPS``, o el límite por IP sería uno global.
+    """
+
+    def __init__(self, email_threshold: int = 5, ip_threshold: int = 20,
+                 base_delay: float = 1.0, max_delay: float = 900.0,
+                 idle_ttl: int = 3600, max_entries: int = 100_000):
+        self.email_threshold = email_threshold
+        self.ip_threshold = ip_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.idle_ttl = idle_ttl
+        self.max_entries = max_entries
+        self.rejected = 0
+        self._entries: "OrderedDict[bytes, _FailureEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(kind: str, value: str) -> bytes:
+        return hashlib.blake2b(f"{kind}:{value.lower()}".encode(), digest_size=8).digest()
+
+    def _evict(self, now: float) -> None:
+        # Las entradas se mantienen ordenadas por último uso
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if len(self._entries) <= self.max_entries and now - entry.last_seen < self.idle_ttl:
+                break
+            del self._entries[key]
+
+    def check(self, email: str, ip: str) -> None:
+        """Lanza 429 con Retry-After si el email o la IP están bloqueados"""
+        now = time.time()
+        with self._lock:
+            blocked_until = 0.0
+            for key in (self._key("email", email), self._key("ip", ip)):
+                entry = self._entries.get(key)
+                if entry is not None and entry.blocked_until > blocked_until:
+                    blocked_until = entry.blocked_until
+
+        if blocked_until > now:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=429,
+                detail="Demasiados intentos fallidos. Inténtalo más tarde",
+                headers={"Retry-After": str(math.ceil(blocked_until - now))}
+            )
+
+    def record_failure(self, email: str, ip: str) -> None:
+        now = time.time()
+        with self._lock:
+            for key, threshold in ((self._key("email", email), self.email_threshold),
+                                   (self._key("ip", ip), self.ip_threshold)):
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = self._entries[key] = _FailureEntry(now)
+                else:
+                    self._entries.move_to_end(key)
+                entry.failures += 1
+                entry.last_seen = now
+                if entry.failures >= threshold:
+                    delay = self.base_delay * 2 ** (entry.failures - threshold)
+                    entry.blocked_until = now + min(delay, self.max_delay)
+            self._evict(now)
+
+    def record_success(self, email: str, ip: str) -> None:
+        # Solo el contador del email: el de la IP caduca solo. Si un login correcto lo
+        # reiniciara, quien prueba contraseñas desde una IP lo vaciaría entrando en su cuenta
+        with self._lock:
+            self._entries.pop(self._key("email", email), None)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "rejected": self.rejected}
+
+login_throttle = LoginThrottle(
+    email_threshold=LOGIN_MAX_FAILURES_PER_EMAIL,
+    ip_threshold=LOGIN_MAX_FAILURES_PER_IP,
+    base_delay=LOGIN_BACKOFF_BASE_SECONDS,
+    max_delay=LOGIN_BACKOFF_MAX_SECONDS,
+    idle_ttl=LOGIN_THROTTLE_IDLE_SECONDS,
+    max_entries=LOGIN_THROTTLE_MAX_ENTRIES
+)
 
 def validate_password_strength(password: str) -> Tuple[bool, str]:
     """Validar fortaleza de contraseña"""
@@ -0,0 +1,190 @@
+import asyncio
+import itertools
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.core.config import (
+    engine,
+    SLOW_QUERY_THRESHOLD_MS,
+    SLOW_QUERY_LOG_SIZE,
+    SLOW_QUERY_EXPLAIN
+)
+
+logger = logging.getLogger("neocare.sql")
+
+
+class SlowQueryLog:
+    """Registro acotado (ring buffer) de las sentencias SQL más lentas que el umbral.
+
+    Guarda la sentencia, la forma de sus parámetros (tipos, nunca valores),
+    la duración y la ruta que la lanzó. Los SELECT se explican después en un
+    hilo aparte con ``EXPLAIN (FORMAT JSON)`` (PostgreSQL) o ``EXPLAIN QUERY
+    PLAN`` (SQLite), sin ANALYZE: el plan no vuelve a ejecutar la consulta.
+
+    Cada sentencia se explica en el engine que la ejecutó (``engine`` de
+    ``record``): los parámetros ya están en el formato de su driver (``$1`` en
+    asyncpg, ``%(name)s`` en psycopg2) y el plan de una réplica es el de la
+    réplica. Las de engines asíncronos se explican en una tarea del event loop.
+    """
+
+    # EXPLAIN asíncronos en curso a la vez; el resto se descarta (plan_status "skipped")
+    max_async_explains = 2
+
+    def __init__(self, engine, threshold_ms: float = 200, capacity: int = 100, explain: bool = True):
+        self.engine = engine
+        self.threshold_ns = int(threshold_ms * 1_000_000)
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self._entries: deque = deque(maxlen=capacity)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tasks: set = set()
+
+    def record(self, statement: str, parameters: Any, duration_ns: int, executemany: bool = False,
+               method: Optional[str] = None, route: Optional[str] = None, engine=None) -> dict:
+        entry = {
+            "id": next(self._ids),
+            "timestamp": datetime.utcnow(),
+            "method": method,
+            "route": route,
+            "duration_ms": round(duration_ns / 1e6, 3),
+            "statement": statement,
+            "parameter_shapes": parameter_shapes(parameters, executemany),
+            "plan": None,
+            "plan_status": "skipped",
+        }
+        with self._lock:
+            self._entries.append(entry)
+
+        logger.warning(
+            "Consulta lenta (%.1f ms) en %s %s: %s",
+            entry["duration_ms"], method or "-", route or "-", " ".join(statement.split())[:200]
+        )
+
+        engine = engine if engine is not None else self.engine
+        if self.explain and not executemany and _is_select(statement):
+            if engine.dialect.name not in ("postgresql", "sqlite"):
+                entry["plan_status"] = "unsupported"
+            elif engine.dialect.is_async:
+                self._explain_in_loop(entry, engine, statement, parameters)
+            else:
+                entry["plan_status"] = "pending"
+                self._get_executor().submit(self._explain, entry, engine, statement, parameters)
+        return entry
+
+    @property
+    def capacity(self) -> int:
+        return self._entries.maxlen
+
+    def entries(self, limit: Optional[int] = None) -> List[dict]:
+        """Entradas de la más reciente a la más antigua"""
+        with self._lock:
+            entries = list(reversed(self._entries))
+        return entries[:limit] if limit else entries
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Un solo hilo: como mucho una conexión del pool ocupada explicando planes
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+        return self._executor
+
+    def _explain(self, entry: dict, engine, statement: str, parameters: Any) -> None:
+        # raw_connection no dispara los eventos de cursor: el EXPLAIN no se registra a sí mismo
+        try:
+            connection = engine.raw_connection()
+            try:
+                plan = _explain_plan(connection, engine.dialect.name, statement, parameters)
+            finally:
+                connection.close()
+        except Exception as e:
+            entry["plan_status"] = f"error: {e}"
+            return
+        entry["plan"] = plan
+        entry["plan_status"] = "done"
+
+    def _explain_in_loop(self, entry: dict, engine, statement: str, parameters: Any) -> None:
+        # Los drivers asíncronos solo funcionan en su event loop (el hilo que ejecutó la sentencia)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            entry["plan_status"] = "unsupported"
+            return
+        if len(self._tasks) >= self.max_async_explains:
+            return
+        entry["plan_status"] = "pending"
+        task = loop.create_task(self._explain_async(entry, AsyncEngine(engine), statement, parameters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain_async(self, entry: dict, engine: AsyncEngine, statement: str, parameters: Any) -> None:
+        try:
+            async with engine.connect() as connection:
+                # Cursor del driver adaptado, como raw_connection: sin eventos de cursor
+                plan = await connection.run_sync(
+                    lambda sync_connection: _explain_plan(
+                        sync_connection.connection, engine.dialect.name, statement, parameters
+                    )
+                )
+        except Exception as e:
+            entry["plan_status"] = f"error: {e}"
+            return
+        entry["plan"] = plan
+        entry["plan_status"] = "done"
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _explain_plan(connection, dialect: str, statement: str, parameters: Any) -> Any:
+    cursor = connection.cursor()
+    if dialect == "postgresql":
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        plan = cursor.fetchone()[0]
+    else:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        columns = [column[0] for column in cursor.description]
+        plan = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    cursor.close()
+    connection.rollback()
+    return plan
+
+
+def parameter_shapes(parameters: Any, executemany: bool = False) -> Any:
+    """Tipos de los parámetros enlazados, sin sus valores (pueden contener datos personales)"""
+    if executemany:
+        rows = list(parameters or [])
+        return {"rows": len(rows), "row": parameter_shapes(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__ if parameters is not None else None
+
+
+def _is_select(statement: str) -> bool:
+    head = statement.lstrip()[:6].upper()
+    return head.startswith("SELECT") or head.startswith("WITH")
+
+
+# Instancia global
+slow_query_log = SlowQueryLog(
+    engine,
+    threshold_ms=SLOW_QUERY_THRESHOLD_MS,
+    capacity=SLOW_QUERY_LOG_SIZE,
+    explain=SLOW_QUERY_EXPLAIN
+)
@@ -0,0 +1,292 @@
+import asyncio
+import functools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from backend.core.config import (
+    SQL_STATEMENT_BUDGET, SQL_REPEAT_BUDGET, SQL_BUDGET_MODE, SQL_DEBUG_HEADERS, DB_SESSION_EARLY_RELEASE
+)
+from backend.core.logging_config import log_access
+from backend.core.metrics import http_request_duration, http_requests, http_requests_in_flight, status_class
+from backend.core.slow_queries import slow_query_log
+
+sql_logger = logging.getLogger("neocare.sql")
+
+
+class SQLBudgetExceeded(RuntimeError):
+    """Una request se pasó del presupuesto de SQL con SQL_BUDGET_MODE=raise"""
+
+
+class RequestTimings:
+    """Tiempos (en ns) de las fases de una request.
+
+    Se comparte por referencia a través de un ContextVar: los handlers
+    síncronos corren en el threadpool con una copia del contexto, pero la
+    copia apunta al mismo objeto, así que sus mediciones llegan al middleware.
+    """
+
+    __slots__ = (
+        "start", "method", "route", "auth", "db", "db_statements", "statement_counts",
+        "route_start", "endpoint_start", "endpoint_end", "route_end"
+    )
+
+    def __init__(self):
+        self.start = time.perf_counter_ns()
+        self.method: Optional[str] = None
+        self.route: Optional[str] = None
+        self.auth = 0
+        self.db = 0
+        self.db_statements = 0
+        # Veces que se ejecuta cada sentencia (mismo SQL, distintos parámetros)
+        self.statement_counts: Dict[str, int] = {}
+        self.route_start = 0
+        self.endpoint_start = 0
+        self.endpoint_end = 0
+        self.route_end = 0
+
+    def most_repeated(self):
+        """(sentencia, veces) de la sentencia más repetida, o (None, 0)"""
+        if not self.statement_counts:
+            return None, 0
+        statement = max(self.statement_counts, key=self.statement_counts.get)
+        return statement, self.statement_counts[statement]
+
+    def server_timing(self, end: int) -> str:
+        """Cabecera Server-Timing (duraciones en ms)"""
+        phases = [("auth", self.auth), ("db", self.db)]
+        if self.endpoint_start:
+            # deps: resolución de dependencias (incluye auth y get_db); serialize: response_model + JSON
+            phases.append(("deps", self.endpoint_start - self.route_start))
+            phases.append(("handler", self.endpoint_end - self.endpoint_start))
+            if self.route_end:
+                phases.append(("serialize", self.route_end - self.endpoint_end))
+        phases.append(("total", end - self.start))
+        return ", ".join(f"{name};dur={ns / 1e6:.3f}" for name, ns in phases)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+@contextmanager
+def timed(phase: str):
+    """Acumular la duración del bloque en la fase ``phase`` de la request actual"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        setattr(timings, phase, getattr(timings, phase) + time.perf_counter_ns() - start)
+
+
+class TimingMiddleware:
+    """Middleware ASGI puro: mide la request con ``perf_counter_ns``, añade la
+    cabecera Server-Timing, actualiza las métricas por ruta y registra la
+    request en el access log.
+
+    A diferencia de ``@app.middleware("http")`` (BaseHTTPMiddleware) no crea
+    una tarea ni un stream intermedio por respuesta, así que las respuestas
+    en streaming pasan sin buffer.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        status_code = 500
+        http_requests_in_flight.inc()
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.server_timing(time.perf_counter_ns()).encode()))
+                if SQL_DEBUG_HEADERS:
+                    headers.append((b"x-db-statements", str(timings.db_statements).encode()))
+                    headers.append((b"x-db-time-ms", f"{timings.db / 1e6:.3f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            http_requests_in_flight.dec()
+            elapsed_ns = time.perf_counter_ns() - timings.start
+            route = getattr(scope.get("route"), "path", None)
+            labels = (scope["method"], route or "<unmatched>", status_class(status_code))
+            http_requests.inc(labels)
+            http_request_duration.observe(elapsed_ns / 1e9, labels)
+            _, max_repeat = timings.most_repeated()
+            log_access(
+                scope["method"], scope["path"], route, status_code, elapsed_ns / 1e6,
+                db_ms=timings.db / 1e6, db_statements=timings.db_statements, db_max_repeat=max_repeat
+            )
+            if timings.db_statements > SQL_STATEMENT_BUDGET or max_repeat > SQL_REPEAT_BUDGET:
+                _warn_sql_budget(scope["method"], route or scope["path"], timings)
+
+
+class TimedRoute(APIRoute):
+    """APIRoute que separa dependencias, handler y serialización en los tiempos de la request.
+
+    Con DB_SESSION_EARLY_RELEASE también cierra las sesiones que recibe el
+    handler en cuanto este termina: FastAPI 0.104 ejecuta el final de las
+    dependencias con yield después de enviar la respuesta, y hasta entonces
+    la conexión seguiría fuera del pool.
+    """
+
+    def get_route_handler(self) -> Callable:
+        call = self.dependant.call
+        if call is not None and not getattr(call, "_timed", False):
+            if DB_SESSION_EARLY_RELEASE:
+                call = _releasing_endpoint(call)
+            self.dependant.call = _timed_endpoint(call)
+        route_handler = super().get_route_handler()
+
+        async def timed_route_handler(request):
+            timings = _current.get()
+            if timings is None:
+                return await route_handler(request)
+            timings.method = request.method
+            timings.route = self.path
+            timings.route_start = time.perf_counter_ns()
+            try:
+                return await route_handler(request)
+            finally:
+                timings.route_end = time.perf_counter_ns()
+
+        return timed_route_handler
+
+
+def _timed_endpoint(call: Callable) -> Callable:
+    # Mantener la naturaleza sync/async: FastAPI decide con ella si usar el threadpool
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def wrapper(*args, **kwargs):
+            timings = _current.get()
+            if timings is None:
+                return await call(*args, **kwargs)
+            timings.endpoint_start = time.perf_counter_ns()
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                timings.endpoint_end = time.perf_counter_ns()
+    else:
+        @functools.wraps(call)
+        def wrapper(*args, **kwargs):
+            timings = _current.get()
+            if timings is None:
+                return call(*args, **kwargs)
+            timings.endpoint_start = time.perf_counter_ns()
+            try:
+                return call(*args, **kwargs)
+            finally:
+                timings.endpoint_end = time.perf_counter_ns()
+
+    wrapper._timed = True
+    return wrapper
+
+
+def _releasing_endpoint(call: Callable) -> Callable:
+    # Los objetos devueltos quedan desligados con su estado cargado: la serialización no hace I/O
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                for value in kwargs.values():
+                    if isinstance(value, AsyncSession):
+                        await value.close()
+                    elif isinstance(value, Session):
+                        # Sesión síncrona en un handler async (login, register): el cierre con conexión es I/O
+                        if value.in_transaction():
+                            await run_in_threadpool(value.close)
+                        else:
+                            value.close()
+    else:
+        @functools.wraps(call)
+        def wrapper(*args, **kwargs):
+            try:
+                return call(*args, **kwargs)
+            finally:
+                for value in kwargs.values():
+                    if isinstance(value, Session):
+                        value.close()
+
+    return wrapper
+
+
+def _warn_sql_budget(method: str, route: str, timings: RequestTimings) -> None:
+    statement, repeats = timings.most_repeated()
+    sql_logger.warning(
+        "%s %s excede el presupuesto de SQL: %d sentencias (máx. %d), la más repetida %d veces (máx. %d): %s",
+        method, route, timings.db_statements, SQL_STATEMENT_BUDGET, repeats, SQL_REPEAT_BUDGET,
+        " ".join((statement or "").split())[:200]
+    )
+
+
+def install_db_timing(engine) -> None:
+    """Contar las sentencias SQL de la request actual, sumar su tiempo a la fase ``db``
+    y pasar las lentas al slow-query log"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        timings = _current.get()
+        if timings is not None:
+            timings.db_statements += 1
+            # Los lotes de executemany (p. ej. INSERT multi-fila) no son un bucle N+1
+            if not executemany:
+                timings.statement_counts[statement] = timings.statement_counts.get(statement, 0) + 1
+            if SQL_BUDGET_MODE == "raise":
+                _check_sql_budget(timings, statement)
+        conn.info["query_start"] = time.perf_counter_ns()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter_ns() - conn.info["query_start"]
+        timings = _current.get()
+        if timings is not None:
+            timings.db += elapsed
+        if elapsed >= slow_query_log.threshold_ns:
+            slow_query_log.record(
+                statement, parameters, elapsed, executemany,
+                method=timings.method if timings else None,
+                route=timings.route if timings else None,
+                engine=conn.engine
+            )
+
+
+def _check_sql_budget(timings: RequestTimings, statement: str) -> None:
+    if timings.db_statements > SQL_STATEMENT_BUDGET:
+        raise SQLBudgetExceeded(
+            f"{timings.db_statements} sentencias SQL en una request (SQL_STATEMENT_BUDGET={SQL_STATEMENT_BUDGET})"
+        )
+    repeats = timings.statement_counts.get(statement, 0)
+    if repeats > SQL_REPEAT_BUDGET:
+        raise SQLBudgetExceeded(
+            f"Sentencia repetida {repeats} veces en una request (SQL_REPEAT_BUDGET={SQL_REPEAT_BUDGET}): "
+            + " ".join(statement.split())[:200]
+        )
@@ -1,44 +1,39 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from backend.routers import auth, boards, cards, lists, health, worklogs, reports 
-from backend.core.config import Base, engine, CORS_ORIGINS 
-from backend.models import user, board, list, card, worklog
-from backend.core.logging_config import setup_logging
-import logging
-import time
-import os
-
-# Configurar logging
-if not os.path.exists('logs'):
-    os.makedirs('logs')
+from backend.routers import auth, boards, cards, lists, health, worklogs, reports, admin, metrics
+from backend.core.config import (
+    Base, engine, get_async_engine, CORS_ORIGINS, RATE_LIMIT_ENABLED, METRICS_ENABLED, DB_CREATE_ALL,
+    DB_POOL_WARMUP, THREADPOOL_SIZE
+)
+from backend.models import user, board, list, card, worklog, revoked_token, api_key
+from backend.core.logging_config import setup_logging, stop_logging
+from backend.core.hashing import password_hasher
+from backend.core.slow_queries import slow_query_log
+from backend.core.middleware import RateLimitMiddleware
+from backend.core.profiler import ProfilingMiddleware
+from backend.core.timing import TimingMiddleware, install_db_timing
+from backend.core.replicas import replica_router
+from backend.core.db_pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, warm_async_pool, warm_pool
+import anyio.to_thread
+
+# Configurar logging (el directorio LOG_DIR se crea al abrir el fichero)
 logger = setup_logging()
 
 app = FastAPI(title="NeoCare Backend API", version="1.0.0")
 
-# Middleware para logging de requests
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    
-    # Procesar request
-    response = await call_next(request)
-    
-    # Calcular tiempo de procesamiento
-    process_time = time.time() - start_time
-    
-    # Log de la request
-    logger.info(
-        f"{request.method} {request.url.path} - "
-        f"Status: {response.status_code} - "
-        f"Time: {process_time:.3f}s"
-    )
-    
-    # Agregar header con tiempo de procesamiento
-    response.headers["X-Process-Time"] = str(process_time)
-    
-    return response
-
-# Configurar CORS
+# Perfil de requests sueltas con X-Profile-Token (solo si PROFILE_TOKEN está definido)
+app.add_middleware(ProfilingMiddleware)
+
+# Rate limiting por usuario (o IP) y coste de ruta, antes de tocar la base de datos
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
+# Logging de requests y cabecera Server-Timing (ASGI puro, sin BaseHTTPMiddleware);
+# incluye las respuestas 429 del rate limiter
+install_db_timing(engine)
+app.add_middleware(TimingMiddleware)
+
+# Configurar CORS (el último middleware añadido es el más externo)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=CORS_ORIGINS,
@@ -47,9 +42,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Crear las tablas en la base de datos
-Base.metadata.create_all(bind=engine)
-
 # Registrar los routers
 app.include_router(health.router)
 app.include_router(auth.router)
@@ -58,6 +50,68 @@ app.include_router(lists.router)
 app.include_router(cards.router)
 app.include_router(worklogs.router)
 app.include_router(reports.router)
+app.include_router(admin.router)
+if METRICS_ENABLED:
+    app.include_router(metrics.router)
+
+@app.on_event("startup")
+def create_tables():
+    # Al arrancar y no al importar: importar la app (tests, scripts, alembic) no toca la base
+    if DB_CREATE_ALL:
+        Base.metadata.create_all(bind=engine)
+
+@app.on_event("startup")
+async def configure_threadpool():
+    # Tope de handlers síncronos en paralelo; el pool de conexiones se dimensiona con él
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+@app.on_event("startup")
+def warm_db_pool():
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        opened = warm_pool(engine, min(DB_POOL_WARMUP, engine.pool.size()))
+        logger.info(f"Pool de conexiones precalentado: {opened} conexiones")
+
+@app.on_event("startup")
+def install_async_db_timing():
+    # Al arrancar y no al importar: importar la app no crea el engine asíncrono ni carga su driver.
+    # Los eventos de cursor de un engine asíncrono se registran en su engine síncrono subyacente
+    install_db_timing(get_async_engine().sync_engine)
+    for replica in replica_router.replicas:
+        install_db_timing(replica.engine.sync_engine)
+
+@app.on_event("startup")
+async def warm_async_db_pool():
+    async_engine = get_async_engine()
+    if isinstance(async_engine.pool, InstrumentedAsyncQueuePool):
+        opened = await warm_async_pool(async_engine, min(DB_POOL_WARMUP, async_engine.pool.size()))
+        logger.info(f"Pool asíncrono precalentado: {opened} conexiones")
+
+@app.on_event("startup")
+def start_metrics():
+    if METRICS_ENABLED:
+        metrics.start_metrics()
+
+@app.on_event("shutdown")
+def stop_metrics():
+    if METRICS_ENABLED:
+        metrics.stop_metrics()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await get_async_engine().dispose()
+    await replica_router.dispose()
+
+@app.on_event("shutdown")
+def shutdown_password_hasher():
+    password_hasher.shutdown()
+
+@app.on_event("shutdown")
+def shutdown_slow_query_log():
+    slow_query_log.shutdown()
+
+@app.on_event("shutdown")
+def shutdown_logging():
+    stop_logging()
 
 @app.get("/")
 def read_root():
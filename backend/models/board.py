@@ -7,7 +7,7 @@ class Board(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)   # 👈 columna correcta
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
 
     # Relación con User
     owner = relationship("User", back_populates="boards")
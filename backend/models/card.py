@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from backend.core.config import Base
 
 class Card(Base):
@@ -9,3 +9,8 @@ class Card(Base):
     list_id = Column(Integer, ForeignKey("lists.id"))  # relación con la tabla de listas
     status = Column(String, default="todo")            # opcional: estado de la tarjeta
     order = Column(Integer, default=0)                 # opcional: posición dentro de la lista
+
+    __table_args__ = (
+        # Tarjetas de una lista (propiedad, reportes) ya ordenadas por posición
+        Index("ix_cards_list_id_order", "list_id", "order"),
+    )
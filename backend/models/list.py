@@ -7,7 +7,7 @@ class List(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
-    board_id = Column(Integer, ForeignKey("boards.id"))
+    board_id = Column(Integer, ForeignKey("boards.id"), index=True)
 
     # Relación con Board
     board = relationship("Board", back_populates="lists")
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, DateTime
+from backend.core.config import Base
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    # jti de un token concreto o id de familia de refresh tokens
+    jti = Column(String(64), primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, nullable=False, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, Date, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Float, String, Date, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from backend.core.config import Base
 
@@ -13,3 +13,10 @@ class Worklog(Base):
     note = Column(String(200), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Horas de una tarjeta y reportes por board (card_id + rango de fechas)
+        Index("ix_worklogs_card_id_date", "card_id", "date"),
+        # Semana de un usuario (/users/me/worklogs)
+        Index("ix_worklogs_user_id_date", "user_id", "date"),
+    )
@@ -0,0 +1,56 @@
+"""Alta masiva de personal desde CSV o JSON.
+
+    python -m backend.provision_users staff.csv
+    python -m backend.provision_users staff.json --report report.json
+
+El CSV lleva cabecera username,email,password. Cada usuario recibe su
+tablero por defecto, igual que en /auth/register.
+"""
+import argparse
+import json
+import sys
+import time
+
+from backend.core.config import SessionLocal, BULK_PROVISION_MAX_ROWS
+from backend.core.hashing import password_hasher
+from backend.models import board, card, list as list_model, worklog  # noqa: F401 (registrar tablas)
+from backend.core.provisioning import parse_rows, prepare_rows, insert_users, build_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="Fichero .csv o .json con el personal")
+    parser.add_argument("--report", help="Guardar el resultado por fila en este fichero JSON")
+    args = parser.parse_args()
+
+    with open(args.path, "rb") as f:
+        content = f.read()
+    content_type = "text/csv" if args.path.lower().endswith(".csv") else "application/json"
+
+    start = time.perf_counter()
+    rows = parse_rows(content, content_type)
+    if len(rows) > BULK_PROVISION_MAX_ROWS:
+        sys.exit(f"Máximo {BULK_PROVISION_MAX_ROWS} usuarios por lote (BULK_PROVISION_MAX_ROWS)")
+
+    db = SessionLocal()
+    try:
+        valid, results = prepare_rows(db, rows)
+        password_hashes = password_hasher.hash_many_sync([user.password for _, user in valid])
+        results += insert_users(db, valid, password_hashes)
+    finally:
+        db.close()
+        password_hasher.shutdown()
+
+    report = build_report(len(rows), results, time.perf_counter() - start)
+    for result in report.results:
+        if result.status != "created":
+            print(f"Fila {result.row} ({result.email}): {result.error}")
+    print(f"Creados {report.created}/{report.total} en {report.elapsed_ms} ms ({report.rows_per_second} filas/s)")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report.model_dump(), f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
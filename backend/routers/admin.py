@@ -0,0 +1,242 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from backend.core.config import (
+    get_db, BULK_PROVISION_MAX_ROWS, PROFILE_INTERVAL_MS, PROFILE_MAX_SECONDS, MEMORY_TRACEMALLOC_FRAMES
+)
+from backend.core.hashing import password_hasher
+from backend.core.logging_config import log_queue_size
+from backend.core.memory import memory_tracker, object_counts, process_memory
+from backend.core.provisioning import parse_rows, prepare_rows, insert_users, build_report
+from backend.core.profiler import Profile, StackSampler, profile_store
+from backend.core.rate_limit import MemoryRateLimitBackend
+from backend.core.revocation import revocation_store
+from backend.core.security import login_throttle, rate_limiter
+from backend.core.slow_queries import slow_query_log
+from backend.routers.auth import AuthenticatedUser, api_key_cache, get_current_admin, token_cache, user_cache
+from backend.core.timing import TimedRoute
+from backend.schemas.diagnostics import (
+    MemoryDiffOut, MemoryReport, MemorySnapshotOut, ProfileSummary, SlowQueryLogOut, TracemallocStatus
+)
+from backend.schemas.provisioning import ProvisioningReport
+from typing import Optional
+import asyncio
+import gc
+import logging
+import os
+import time
+
+logger = logging.getLogger("neocare.admin")
+
+router = APIRouter(prefix="/admin", tags=["admin"], route_class=TimedRoute)
+
+# --- Alta masiva de usuarios ---
+@router.post("/users/bulk", response_model=ProvisioningReport)
+async def bulk_provision_users(
+    request: Request,
+    db: Session = Depends(get_db),
+    admin: AuthenticatedUser = Depends(get_current_admin)
+):
+    """
+    Bulk-provision staff accounts, each with its default board.
+
+    - Requires an admin account (ADMIN_EMAILS)
+    - Body: JSON list of {username, email, password} or text/csv with that header
+    - Passwords are hashed in small chunks on at most half of the hashing pool, so logins keep flowing
+    - No database connection is held while hashing; the insert opens its own transaction
+    - Rows whose email is registered concurrently are reported as conflict
+    - Users and boards are inserted with multi-row INSERTs in one transaction
+    - Returns per-row results and throughput
+    """
+    start = time.perf_counter()
+    try:
+        rows = parse_rows(await request.body(), request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Formato inválido: {e}")
+
+    if len(rows) > BULK_PROVISION_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"Máximo {BULK_PROVISION_MAX_ROWS} usuarios por lote")
+
+    valid, results = await run_in_threadpool(prepare_rows, db, rows)
+    password_hashes = await password_hasher.hash_many([user.password for _, user in valid])
+    results += await run_in_threadpool(insert_users, db, valid, password_hashes)
+
+    report = build_report(len(rows), results, time.perf_counter() - start)
+    logger.info(
+        f"Alta masiva por {admin.email}: {report.created}/{report.total} usuarios "
+        f"en {report.elapsed_ms} ms ({report.rows_per_second} filas/s)"
+    )
+    return report
+
+# --- Diagnóstico ---
+@router.get("/slow-queries", response_model=SlowQueryLogOut)
+def list_slow_queries(
+    limit: int = Query(50, ge=1, le=1000),
+    admin: AuthenticatedUser = Depends(get_current_admin)
+):
+    """
+    Slow SQL statements captured by this worker, newest first.
+
+    - Statements slower than SLOW_QUERY_THRESHOLD_MS, with parameter types and calling route
+    - SELECT plans are filled in asynchronously (plan_status: pending -> done)
+    - Each gunicorn worker keeps its own ring buffer
+    """
+    return {
+        "pid": os.getpid(),
+        "threshold_ms": slow_query_log.threshold_ms,
+        "capacity": slow_query_log.capacity,
+        "queries": slow_query_log.entries(limit),
+    }
+
+@router.delete("/slow-queries", status_code=204)
+def clear_slow_queries(admin: AuthenticatedUser = Depends(get_current_admin)):
+    """Empty this worker's slow-query ring buffer"""
+    slow_query_log.clear()
+
+@router.get("/profile")
+async def profile_worker(
+    seconds: float = Query(10, gt=0),
+    interval_ms: float = Query(PROFILE_INTERVAL_MS, ge=1, le=1000),
+    format: str = Query("speedscope", pattern="^(speedscope|collapsed)$"),
+    admin: AuthenticatedUser = Depends(get_current_admin)
+):
+    """
+    Sample the stacks of every thread in this worker for N seconds.
+
+    - format=speedscope: open the file at https://www.speedscope.app
+    - format=collapsed: input for flamegraph.pl / inferno
+    - The profile is also kept and listed in GET /admin/profiles
+    """
+    if seconds > PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=422, detail=f"Máximo {PROFILE_MAX_SECONDS} segundos")
+    if not profile_store.busy.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="Ya hay un perfil en curso en este worker")
+    try:
+        sampler = StackSampler(interval_ms / 1000).start()
+        await asyncio.sleep(seconds)
+        profile = sampler.stop(profile_store.next_id(), "live")
+    finally:
+        profile_store.busy.release()
+    profile_store.add(profile)
+    logger.info(f"Perfil {profile.id} de {seconds}s por {admin.email} (overhead {profile.overhead_pct}%)")
+    return _profile_response(profile, format)
+
+@router.get("/profiles", response_model=list[ProfileSummary])
+def list_profiles(admin: AuthenticatedUser = Depends(get_current_admin)):
+    """Profiles stored in this worker (live and per-request), newest first"""
+    return [profile.summary() for profile in profile_store.list()]
+
+@router.get("/profiles/{profile_id}")
+def get_profile(
+    profile_id: int,
+    format: str = Query("speedscope", pattern="^(speedscope|collapsed)$"),
+    admin: AuthenticatedUser = Depends(get_current_admin)
+):
+    """Download a stored profile (X-Profile-Id of a profiled request)"""
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Perfil no encontrado en este worker")
+    return _profile_response(profile, format)
+
+def _profile_response(profile: Profile, format: str):
+    headers = {"X-Profile-Id": str(profile.id), "X-Profile-Overhead-Pct": str(profile.overhead_pct)}
+    if format == "collapsed":
+        return PlainTextResponse(profile.collapsed(), headers=headers)
+    headers["Content-Disposition"] = f'attachment; filename="profile-{profile.id}.speedscope.json"'
+    return JSONResponse(profile.speedscope(), headers=headers)
+
+# --- Memoria ---
+@router.get("/memory", response_model=MemoryReport)
+def memory_report(
+    objects: int = Query(25, ge=0, le=500),
+    admin: AuthenticatedUser = Depends(get_current_admin)
+):
+    """
+    Memory usage of this worker.
+
+    - RSS and peak RSS of the process
+    - Entries held by the in-process caches, stores and buffers
+    - Most common live object types (walks the whole heap: use objects=0 to skip)
+    """
+    return {
+        **process_memory(),
+        "gc_counts": list(gc.get_count()),
+        "components": _component_sizes(),
+        "objects": object_counts(objects) if objects else [],
+        "tracemalloc": memory_tracker.status(),
+    }
+
+@router.post("/memory/tracemalloc/start", response_model=TracemallocStatus)
+def start_tracemalloc(
+    frames: int = Query(MEMORY_TRACEMALLOC_FRAMES, ge=1, le=100),
+    admin: AuthenticatedUser = Depends(get_current_admin)
+):
+    """
+    Start tracing allocations in this worker.
+
+    - Every allocation gets slower while tracing: stop it when done
+    - frames > 1 allows group_by=traceback in diffs, at a higher cost
+    """
+    memory_tracker.start(frames)
+    logger.info(f"tracemalloc iniciado por {admin.email} ({frames} frames)")
+    return memory_tracker.status()
+
+@router.post("/memory/tracemalloc/stop", response_model=TracemallocStatus)
+def stop_tracemalloc(admin: AuthenticatedUser = Depends(get_current_admin)):
+    """Stop tracing allocations and drop the stored snapshots"""
+    memory_tracker.stop()
+    logger.info(f"tracemalloc detenido por {admin.email}")
+    return memory_tracker.status()
+
+@router.post("/memory/snapshots", response_model=MemorySnapshotOut, status_code=201)
+def take_memory_snapshot(admin: AuthenticatedUser = Depends(get_current_admin)):
+    """Take a tracemalloc snapshot of this worker (tracing must be started)"""
+    try:
+        return memory_tracker.take_snapshot()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.get("/memory/snapshots", response_model=list[MemorySnapshotOut])
+def list_memory_snapshots(admin: AuthenticatedUser = Depends(get_current_admin)):
+    """Snapshots stored in this worker, oldest first"""
+    return memory_tracker.snapshots()
+
+@router.get("/memory/diff", response_model=MemoryDiffOut)
+def diff_memory_snapshots(
+    from_id: int = Query(..., alias="from"),
+    to_id: Optional[int] = Query(None, alias="to"),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    limit: int = Query(25, ge=1, le=500),
+    admin: AuthenticatedUser = Depends(get_current_admin)
+):
+    """
+    Top allocation differences between two snapshots.
+
+    - Without to, compares against a new snapshot taken now
+    - group_by=lineno (module:line), filename (module) or traceback
+    - Snapshots are per worker: repeat until the same pid answers
+    """
+    if not memory_tracker.tracing:
+        raise HTTPException(status_code=409, detail="tracemalloc no está activo")
+    try:
+        diff = memory_tracker.diff(from_id, to_id, group_by, limit)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    return {"pid": os.getpid(), **diff}
+
+def _component_sizes() -> dict:
+    backend = rate_limiter.backend
+    return {
+        "user_cache": len(user_cache),
+        "token_cache": len(token_cache),
+        "api_key_cache": len(api_key_cache),
+        # Los backends sqlite/redis no ocupan memoria del worker
+        "rate_limit_buckets": len(backend) if isinstance(backend, MemoryRateLimitBackend) else None,
+        "login_throttle": login_throttle.stats()["entries"],
+        "revoked_tokens": len(revocation_store),
+        "slow_queries": len(slow_query_log.entries()),
+        "profiles": len(profile_store.list()),
+        "memory_snapshots": len(memory_tracker),
+        "log_queue": log_queue_size(),
+    }
@@ -1,31 +1,87 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from backend.core.config import (
     get_db,
+    get_async_db,
+    release_connection,
+    release_async_connection,
     SECRET_KEY,
     JWT_ALGORITHM,
     ACCESS_TOKEN_EXPIRE_MINUTES,
     REFRESH_TOKEN_EXPIRE_DAYS,
-    BCRYPT_ROUNDS
+    ADMIN_EMAILS,
+    USER_CACHE_SIZE,
+    USER_CACHE_TTL_SECONDS,
+    TOKEN_CACHE_SIZE,
+    API_KEY_CACHE_TTL_SECONDS,
+    API_KEY_TTL_DAYS,
+    API_KEY_MAX_TTL_DAYS
 )
+from backend.core.cache import TTLCache
+from backend.core.hashing import password_hasher
+from backend.core.security import get_client_ip, login_throttle
+from backend.core.revocation import revocation_store
+from backend.core.replicas import replica_router
+from backend.core.timing import TimedRoute, timed
+from backend.core.api_keys import generate_api_key, hash_api_key, parse_prefix, is_api_key, revocation_id
 from backend.models.user import User
 from backend.models.board import Board
-from passlib.context import CryptContext
-from jose import jwt, JWTError
-from datetime import datetime, timedelta
-from pydantic import BaseModel, EmailStr, constr
+from backend.models.api_key import ApiKey
+from sqlalchemy import event
+from dataclasses import dataclass
+import hashlib
+import hmac
+import time
+import uuid
+from jose import JWTError
+from datetime import datetime, timedelta, timezone
+from pydantic import BaseModel, EmailStr, Field, constr
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import Optional
+from typing import AsyncIterator, Optional, List
 from backend.core.logging_config import log_auth_attempt
 import logging
 
 logger = logging.getLogger("neocare.auth")
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=TimedRoute)
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 security = HTTPBearer()
 
+# --- Cache de usuarios autenticados ---
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """Vista ligera del usuario autenticado que sirve el cache"""
+    id: int
+    email: str
+    username: str
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthenticatedUser":
+        return cls(id=user.id, email=user.email, username=user.username)
+
+user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+# Clave: HMAC de la API key, valor: AuthenticatedUser de la cuenta de servicio
+api_key_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=API_KEY_CACHE_TTL_SECONDS)
+
+def invalidate_user(user_id: int) -> None:
+    """Eliminar un usuario del cache (por ejemplo tras modificarlo o borrarlo).
+
+    Solo en este proceso: los demás workers lo descartan al expirar su entrada
+    (USER_CACHE_TTL_SECONDS). Para bloquear a alguien al momento, revocar sus
+    sesiones en ``revocation_store``, que sí se sincroniza entre workers.
+    """
+    user_cache.pop(user_id)
+    # Los cambios de usuario son raros; se descartan también sus API keys cacheadas
+    api_key_cache.clear()
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    invalidate_user(target.id)
+
 # --- Schemas ---
 class UserCreate(BaseModel):
     username: constr(min_length=3, max_length=50)
@@ -44,32 +100,99 @@ class TokenResponse(BaseModel):
 class RefreshTokenRequest(BaseModel):
     refresh_token: str
 
+class ApiKeyCreate(BaseModel):
+    name: constr(min_length=1, max_length=100)
+    # Cuenta de servicio a la que pertenece la clave (por defecto, la del admin)
+    user_id: Optional[int] = None
+    expires_in_days: Optional[int] = Field(None, ge=1)
+
+class ApiKeyOut(BaseModel):
+    id: int
+    user_id: int
+    name: str
+    prefix: str
+    created_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    revoked_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class ApiKeyCreated(ApiKeyOut):
+    key: str
+
+def _jwt():
+    # jose.jwt arrastra el backend criptográfico: se importa con el primer token
+    from jose import jwt
+    return jwt
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire, "type": "access"})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=JWT_ALGORITHM)
+    to_encode.update({"exp": expire, "type": "access", "jti": uuid.uuid4().hex})
+    return _jwt().encode(to_encode, SECRET_KEY, algorithm=JWT_ALGORITHM)
 
 def create_refresh_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=JWT_ALGORITHM)
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
+    return _jwt().encode(to_encode, SECRET_KEY, algorithm=JWT_ALGORITHM)
 
-# --- Registro ---
-@router.post("/register")
-def register(user: UserCreate, request: Request, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter(User.email == user.email).first()
-    if existing_user:
-        logger.warning(f"Intento de registro con email duplicado: {user.email}")
-        raise HTTPException(status_code=400, detail="El email ya está registrado")
+def issue_tokens(user, family: Optional[str] = None) -> dict:
+    """Emitir access y refresh token de una misma familia (sesión de login).
+
+    Revocar la familia invalida todos los tokens emitidos a partir del mismo
+    login, incluidos los obtenidos por rotación del refresh token.
+    """
+    family = family or uuid.uuid4().hex
+    token_data = {
+        "sub": user.email,
+        "user_id": user.id,
+        "username": user.username,
+        "fam": family
+    }
+    return {
+        "access_token": create_access_token(token_data),
+        "refresh_token": create_refresh_token({"sub": user.email, "user_id": user.id, "fam": family}),
+        "token_type": "bearer"
+    }
 
-    hashed_pw = pwd_context.hash(user.password)
+def _expiration(payload: dict) -> datetime:
+    return datetime.utcfromtimestamp(payload["exp"])
 
+# --- Cache de verificación de tokens ---
+token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE)
+
+def decode_token(token: str) -> dict:
+    """Verificar y decodificar un JWT, reutilizando verificaciones previas.
+
+    La clave es el digest SHA-256 del token, así el cache nunca guarda tokens
+    en claro. Cada entrada expira con el claim ``exp`` del propio token.
+    Lanza ``JWTError`` si el token es inválido o ha expirado.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = _jwt().decode(token, SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    exp = payload.get("exp")
+    if exp is not None:
+        token_cache.set(key, payload, ttl=exp - time.time())
+    return payload
+
+# --- Registro ---
+def _find_user_by_email(db: Session, email: str) -> Optional[User]:
+    user = db.query(User).filter(User.email == email).first()
+    # Sin retener la conexión durante el hashing de la contraseña
+    release_connection(db)
+    return user
+
+def _create_user_with_board(db: Session, username: str, email: str, password_hash: str):
     new_user = User(
-        username=user.username,
-        email=user.email,
-        password_hash=hashed_pw
+        username=username,
+        email=email,
+        password_hash=password_hash
     )
     db.add(new_user)
     db.commit()
@@ -79,41 +202,65 @@ def register(user: UserCreate, request: Request, db: Session = Depends(get_db)):
     db.add(default_board)
     db.commit()
     db.refresh(default_board)
+    return new_user, default_board
+
+def _update_password_hash(db: Session, user: User, password_hash: str) -> None:
+    user.password_hash = password_hash
+    db.commit()
+    db.refresh(user)
+
+# login y register son async: las consultas van al threadpool y el hashing al
+# pool de procesos, así un pico de logins no agota los hilos de requests
+@router.post("/register")
+async def register(user: UserCreate, request: Request, db: Session = Depends(get_db)):
+    existing_user = await run_in_threadpool(_find_user_by_email, db, user.email)
+    if existing_user:
+        logger.warning(f"Intento de registro con email duplicado: {user.email}")
+        raise HTTPException(status_code=400, detail="El email ya está registrado")
+
+    hashed_pw = await password_hasher.hash(user.password)
+
+    new_user, default_board = await run_in_threadpool(
+        _create_user_with_board, db, user.username, user.email, hashed_pw
+    )
 
     logger.info(f"Nuevo usuario registrado: {user.email} (ID: {new_user.id})")
     return {"msg": "Usuario registrado", "id": new_user.id, "default_board_id": default_board.id}
 
 # --- Login ---
 @router.post("/login", response_model=TokenResponse)
-def login(login_request: LoginRequest, request: Request, db: Session = Depends(get_db)):
-    client_ip = request.client.host if request.client else "unknown"
+async def login(login_request: LoginRequest, request: Request, db: Session = Depends(get_db)):
+    client_ip = get_client_ip(request)
+
+    # Rechazar emails/IPs bloqueados antes de consultar la base y calcular el hash
+    login_throttle.check(login_request.email, client_ip)
     
-    user = db.query(User).filter(User.email == login_request.email).first()
-    if not user or not pwd_context.verify(login_request.password, user.password_hash):
+    user = await run_in_threadpool(_find_user_by_email, db, login_request.email)
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await password_hasher.verify_and_update(login_request.password, user.password_hash)
+    if not verified:
+        login_throttle.record_failure(login_request.email, client_ip)
         log_auth_attempt(login_request.email, False, client_ip)
         raise HTTPException(status_code=401, detail="Credenciales inválidas")
 
-    token_data = {
-        "sub": user.email,
-        "user_id": user.id,
-        "username": user.username
-    }
-    access_token = create_access_token(token_data)
-    refresh_token = create_refresh_token({"sub": user.email, "user_id": user.id})
-    
+    login_throttle.record_success(login_request.email, client_ip)
+
+    # Rehash transparente cuando cambia el esquema o el coste configurado
+    if new_hash:
+        await run_in_threadpool(_update_password_hash, db, user, new_hash)
+        logger.info(f"Hash de contraseña actualizado al coste actual (ID: {user.id})")
+
     log_auth_attempt(login_request.email, True, client_ip)
+    user_cache.set(user.id, AuthenticatedUser.from_user(user))
     
-    return {
-        "access_token": access_token,
-        "refresh_token": refresh_token,
-        "token_type": "bearer"
-    }
+    return issue_tokens(user)
 
 # --- Refresh Token ---
 @router.post("/refresh", response_model=TokenResponse)
 def refresh_access_token(request: RefreshTokenRequest, db: Session = Depends(get_db)):
     try:
-        payload = jwt.decode(request.refresh_token, SECRET_KEY, algorithms=[JWT_ALGORITHM])
+        payload = decode_token(request.refresh_token)
         if payload.get("type") != "refresh":
             raise HTTPException(status_code=401, detail="Token type inválido")
         
@@ -121,31 +268,119 @@ def refresh_access_token(request: RefreshTokenRequest, db: Session = Depends(get
         user_id: int = payload.get("user_id")
         if not email or not user_id:
             raise HTTPException(status_code=401, detail="Token inválido")
+
+        jti = payload.get("jti")
+        family = payload.get("fam")
+        if revocation_store.is_revoked(family):
+            raise HTTPException(status_code=401, detail="Sesión revocada")
+
+        # Rotación: cada refresh token se usa una sola vez. Si ya estaba revocado
+        # alguien lo está reutilizando y se revoca toda la familia.
+        if jti and not revocation_store.revoke(jti, _expiration(payload)):
+            if family:
+                revocation_store.revoke(family, datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
+            logger.warning(f"Reutilización de refresh token detectada (user_id: {user_id}, familia: {family})")
+            raise HTTPException(status_code=401, detail="Refresh token ya utilizado")
         
         user = db.query(User).filter(User.id == user_id).first()
         if not user:
             raise HTTPException(status_code=401, detail="Usuario no encontrado")
         
-        token_data = {
-            "sub": user.email,
-            "user_id": user.id,
-            "username": user.username
-        }
-        access_token = create_access_token(token_data)
-        refresh_token = create_refresh_token({"sub": user.email, "user_id": user.id})
-        
-        return {
-            "access_token": access_token,
-            "refresh_token": refresh_token,
-            "token_type": "bearer"
-        }
+        return issue_tokens(user, family)
     except JWTError:
         raise HTTPException(status_code=401, detail="Token inválido o expirado")
 
+# --- API keys de cuentas de servicio ---
+def _utc_naive(value: datetime) -> datetime:
+    # PostgreSQL devuelve timestamptz con zona; SQLite, la fecha UTC sin zona
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+def _api_key_statement(prefix: str):
+    return (
+        select(ApiKey, User)
+        .join(User, ApiKey.user_id == User.id)
+        .where(ApiKey.prefix == prefix, ApiKey.revoked_at.is_(None), ApiKey.expires_at > datetime.utcnow())
+    )
+
+def _api_key_user(row, key_hash: str) -> AuthenticatedUser:
+    if row is None or not hmac.compare_digest(row.ApiKey.key_hash, key_hash):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="API key inválida")
+
+    authenticated = AuthenticatedUser.from_user(row.User)
+    # La entrada del cache no sobrevive a la caducidad de la clave
+    remaining = (_utc_naive(row.ApiKey.expires_at) - datetime.utcnow()).total_seconds()
+    api_key_cache.set(key_hash, authenticated, ttl=min(API_KEY_CACHE_TTL_SECONDS, remaining))
+    return authenticated
+
+def _reject_revoked_api_key(key_hash: str) -> None:
+    api_key_cache.pop(key_hash)
+    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="API key revocada")
+
+def authenticate_api_key(key: str, db: Session) -> AuthenticatedUser:
+    """Validar una API key con una búsqueda indexada por prefijo (o ninguna si está en cache).
+
+    Las revocaciones se consultan en ``revocation_store`` incluso con la clave en
+    cache: una clave revocada en otro worker deja de valer tras su sincronización.
+    """
+    key_hash = hash_api_key(key)
+    prefix = parse_prefix(key)
+    if prefix and revocation_store.is_revoked(revocation_id(prefix)):
+        _reject_revoked_api_key(key_hash)
+    cached = api_key_cache.get(key_hash)
+    if cached is not None:
+        return cached
+
+    row = db.execute(_api_key_statement(prefix)).first() if prefix else None
+    return _api_key_user(row, key_hash)
+
+async def authenticate_api_key_async(key: str, db: AsyncSession) -> AuthenticatedUser:
+    """Versión de ``authenticate_api_key`` para la sesión asíncrona"""
+    key_hash = hash_api_key(key)
+    prefix = parse_prefix(key)
+    if prefix:
+        if revocation_store.sync_due():
+            revoked = await run_in_threadpool(revocation_store.is_revoked, revocation_id(prefix))
+        else:
+            revoked = revocation_store.is_revoked(revocation_id(prefix))
+        if revoked:
+            _reject_revoked_api_key(key_hash)
+    cached = api_key_cache.get(key_hash)
+    if cached is not None:
+        return cached
+
+    row = (await db.execute(_api_key_statement(prefix))).first() if prefix else None
+    return _api_key_user(row, key_hash)
+
 # --- Dependencia centralizada para autenticación ---
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)) -> User:
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)) -> AuthenticatedUser:
+    with timed("auth"):
+        user = _authenticate(credentials, db)
+    # El handler comparte la sesión; si la autenticación consultó la base, la conexión
+    # vuelve al pool hasta que el handler ejecute su primera sentencia
+    release_connection(db)
+    return user
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> AuthenticatedUser:
+    """Igual que ``get_current_user`` pero sin pasar por el threadpool (routers async)"""
+    with timed("auth"):
+        user = await _authenticate_async(credentials, db)
+    await release_async_connection(db)
+    # La sesión es la misma que usa el handler: sus commits cuentan como escrituras del usuario
+    db.info["user_id"] = user.id
+    return user
+
+async def get_read_db(current_user: AuthenticatedUser = Depends(get_current_user_async)) -> AsyncIterator[AsyncSession]:
+    """Sesión de solo lectura para los GET: una réplica de DATABASE_REPLICA_URLS, o el
+    primario si no hay réplicas sanas o el usuario acaba de escribir (read-your-writes)"""
+    async with replica_router.session(current_user.id) as db:
+        yield db
+
+def _access_token_payload(token: str) -> dict:
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[JWT_ALGORITHM])
+        payload = decode_token(token)
         
         if payload.get("type") != "access":
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token type inválido")
@@ -157,14 +392,65 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido o expirado")
+    return payload
 
-    user = db.query(User).filter(User.id == user_id).first()
+def _cache_user(user_id: int, user: Optional[User]) -> AuthenticatedUser:
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuario no encontrado")
-    return user
+
+    authenticated = AuthenticatedUser.from_user(user)
+    user_cache.set(user_id, authenticated)
+    return authenticated
+
+def _authenticate(credentials: HTTPAuthorizationCredentials, db: Session) -> AuthenticatedUser:
+    # Segundo tipo de credencial: API keys de integraciones (payroll, BI, ...)
+    if is_api_key(credentials.credentials):
+        return authenticate_api_key(credentials.credentials, db)
+
+    payload = _access_token_payload(credentials.credentials)
+    if revocation_store.is_revoked(payload.get("jti"), payload.get("fam")):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revocado")
+
+    user_id = payload["user_id"]
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    return _cache_user(user_id, db.query(User).filter(User.id == user_id).first())
+
+async def _authenticate_async(credentials: HTTPAuthorizationCredentials, db: AsyncSession) -> AuthenticatedUser:
+    if is_api_key(credentials.credentials):
+        return await authenticate_api_key_async(credentials.credentials, db)
+
+    payload = _access_token_payload(credentials.credentials)
+    token_ids = (payload.get("jti"), payload.get("fam"))
+    # La sincronización periódica con revoked_tokens usa la sesión síncrona: fuera del event loop
+    if revocation_store.sync_due():
+        revoked = await run_in_threadpool(revocation_store.is_revoked, *token_ids)
+    else:
+        revoked = revocation_store.is_revoked(*token_ids)
+    if revoked:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revocado")
+
+    user_id = payload["user_id"]
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
+    return _cache_user(user_id, user)
+
+def _is_admin(user: AuthenticatedUser) -> bool:
+    return user.email.lower() in ADMIN_EMAILS
+
+def get_current_admin(current_user: AuthenticatedUser = Depends(get_current_user)) -> AuthenticatedUser:
+    """Dependencia para endpoints de administración (emails en ADMIN_EMAILS)"""
+    if not _is_admin(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Se requieren permisos de administrador")
+    return current_user
 
 @router.get("/me")
-def read_users_me(current_user: User = Depends(get_current_user)):
+def read_users_me(current_user: AuthenticatedUser = Depends(get_current_user)):
     return {
         "id": current_user.id,
         "email": current_user.email,
@@ -172,8 +458,80 @@ def read_users_me(current_user: User = Depends(get_current_user)):
     }
 
 @router.post("/logout")
-def logout(current_user: User = Depends(get_current_user)):
+def logout(credentials: HTTPAuthorizationCredentials = Depends(security), current_user: AuthenticatedUser = Depends(get_current_user)):
+    # Revocar el access token y la familia de refresh tokens de esta sesión
+    if is_api_key(credentials.credentials):
+        return {"msg": "Logout exitoso"}
+    payload = decode_token(credentials.credentials)
+    if payload.get("jti"):
+        revocation_store.revoke(payload["jti"], _expiration(payload))
+    if payload.get("fam"):
+        revocation_store.revoke(payload["fam"], datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
     return {"msg": "Logout exitoso"}
 
+@router.post("/api-keys", response_model=ApiKeyCreated, status_code=201)
+def create_api_key(
+    data: ApiKeyCreate,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+    admin: AuthenticatedUser = Depends(get_current_admin)
+):
+    """Crear una API key con caducidad para una cuenta de servicio (o la del admin).
 
+    Solo administradores con sesión de login: una API key no puede crear otras.
+    La clave completa solo se devuelve aquí.
+    """
+    if is_api_key(credentials.credentials):
+        raise HTTPException(status_code=403, detail="Las API keys no pueden crear otras API keys")
+
+    owner_id = data.user_id or admin.id
+    if data.user_id is not None and db.query(User.id).filter(User.id == data.user_id).first() is None:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+
+    days = min(data.expires_in_days or API_KEY_TTL_DAYS, API_KEY_MAX_TTL_DAYS)
+    key, prefix, key_hash = generate_api_key()
+    api_key = ApiKey(
+        user_id=owner_id, name=data.name, prefix=prefix, key_hash=key_hash,
+        expires_at=datetime.utcnow() + timedelta(days=days)
+    )
+    db.add(api_key)
+    db.commit()
+    db.refresh(api_key)
+
+    logger.info(f"API key creada: {prefix} (user_id: {owner_id}, por admin {admin.id}, {days} días)")
+    return ApiKeyCreated(
+        id=api_key.id,
+        user_id=api_key.user_id,
+        name=api_key.name,
+        prefix=api_key.prefix,
+        created_at=api_key.created_at,
+        expires_at=api_key.expires_at,
+        key=key
+    )
+
+@router.get("/api-keys", response_model=List[ApiKeyOut])
+def list_api_keys(db: Session = Depends(get_db), current_user: AuthenticatedUser = Depends(get_current_user)):
+    # Cada cuenta ve sus claves; los admins, todas
+    query = db.query(ApiKey)
+    if not _is_admin(current_user):
+        query = query.filter(ApiKey.user_id == current_user.id)
+    return query.order_by(ApiKey.id).all()
+
+@router.delete("/api-keys/{api_key_id}")
+def revoke_api_key(api_key_id: int, db: Session = Depends(get_db), current_user: AuthenticatedUser = Depends(get_current_user)):
+    api_key = db.query(ApiKey).filter(ApiKey.id == api_key_id).first()
+    if not api_key:
+        raise HTTPException(status_code=404, detail="API key no encontrada")
+
+    if api_key.user_id != current_user.id and not _is_admin(current_user):
+        raise HTTPException(status_code=403, detail="No tienes permiso para revocar esta API key")
+
+    api_key.revoked_at = datetime.utcnow()
+    db.commit()
+    # En revoked_tokens hasta que la clave caduque: el resto de workers la rechaza al sincronizar
+    expires_at = _utc_naive(api_key.expires_at) if api_key.expires_at else datetime.utcnow() + timedelta(days=API_KEY_MAX_TTL_DAYS)
+    revocation_store.revoke(revocation_id(api_key.prefix), expires_at)
+    api_key_cache.pop(api_key.key_hash)
 
+    logger.info(f"API key revocada: {api_key.prefix} (user_id: {current_user.id})")
+    return {"detail": "API key revocada"}
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from backend.core.config import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.config import get_async_db
 from backend.models.board import Board
-from backend.models.user import User
-from backend.routers.auth import get_current_user
+from backend.routers.auth import AuthenticatedUser, get_current_user_async, get_read_db
+from backend.core.timing import TimedRoute
 from pydantic import BaseModel
 
-router = APIRouter(prefix="/boards", tags=["boards"])
+router = APIRouter(prefix="/boards", tags=["boards"], route_class=TimedRoute)
 
 # --- Schemas ---
 class BoardCreate(BaseModel):
@@ -25,21 +26,21 @@ class BoardOut(BaseModel):
 
 # --- Endpoints ---
 @router.post("/", response_model=BoardOut)
-def create_board(board: BoardCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_board(board: BoardCreate, db: AsyncSession = Depends(get_async_db), current_user: AuthenticatedUser = Depends(get_current_user_async)):
     new_board = Board(title=board.title, user_id=current_user.id)
     db.add(new_board)
-    db.commit()
-    db.refresh(new_board)
+    await db.commit()
+    await db.refresh(new_board)
     return new_board
 
 @router.get("/", response_model=list[BoardOut])
-def get_boards(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    boards = db.query(Board).filter(Board.user_id == current_user.id).all()
+async def get_boards(db: AsyncSession = Depends(get_read_db), current_user: AuthenticatedUser = Depends(get_current_user_async)):
+    boards = (await db.scalars(select(Board).where(Board.user_id == current_user.id))).all()
     return boards
 
 @router.get("/{board_id}", response_model=BoardOut)
-def get_board(board_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    board = db.query(Board).filter(Board.id == board_id).first()
+async def get_board(board_id: int, db: AsyncSession = Depends(get_read_db), current_user: AuthenticatedUser = Depends(get_current_user_async)):
+    board = await db.get(Board, board_id)
     if not board:
         raise HTTPException(status_code=404, detail="Board no encontrado")
     
@@ -49,8 +50,8 @@ def get_board(board_id: int, db: Session = Depends(get_db), current_user: User =
     return board
 
 @router.put("/{board_id}", response_model=BoardOut)
-def update_board(board_id: int, board_data: BoardUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    board = db.query(Board).filter(Board.id == board_id).first()
+async def update_board(board_id: int, board_data: BoardUpdate, db: AsyncSession = Depends(get_async_db), current_user: AuthenticatedUser = Depends(get_current_user_async)):
+    board = await db.get(Board, board_id)
     if not board:
         raise HTTPException(status_code=404, detail="Board no encontrado")
     
@@ -58,19 +59,19 @@ def update_board(board_id: int, board_data: BoardUpdate, db: Session = Depends(g
         raise HTTPException(status_code=403, detail="No tienes permiso para modificar este board")
     
     board.title = board_data.title
-    db.commit()
-    db.refresh(board)
+    await db.commit()
+    await db.refresh(board)
     return board
 
 @router.delete("/{board_id}")
-def delete_board(board_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    board = db.query(Board).filter(Board.id == board_id).first()
+async def delete_board(board_id: int, db: AsyncSession = Depends(get_async_db), current_user: AuthenticatedUser = Depends(get_current_user_async)):
+    board = await db.get(Board, board_id)
     if not board:
         raise HTTPException(status_code=404, detail="Board no encontrado")
     
     if board.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="No tienes permiso para eliminar este board")
     
-    db.delete(board)
-    db.commit()
+    await db.delete(board)
+    await db.commit()
     return {"detail": "Board eliminado"}
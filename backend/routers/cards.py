@@ -1,27 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from backend.core.config import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.config import get_async_db
 from backend.models.card import Card
 from backend.models.list import List
 from backend.models.board import Board
-from backend.models.user import User
-from backend.routers.auth import get_current_user
+from backend.routers.auth import AuthenticatedUser, get_current_user_async, get_read_db
 from backend.schemas.card import CardCreate, CardUpdate, CardOut
+from backend.core.timing import TimedRoute
 
 router = APIRouter(
     prefix="/cards",
-    tags=["cards"]
+    tags=["cards"],
+    route_class=TimedRoute
 )
 
 # Crear tarjeta
 @router.post("/", response_model=CardOut)
-def create_card(card_data: CardCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_card(card_data: CardCreate, db: AsyncSession = Depends(get_async_db), current_user: AuthenticatedUser = Depends(get_current_user_async)):
     # Validar que la lista pertenece a un board del usuario
-    list_obj = db.query(List).filter(List.id == card_data.list_id).first()
+    list_obj = await db.get(List, card_data.list_id)
     if not list_obj:
         raise HTTPException(status_code=404, detail="Lista no encontrada")
     
-    board = db.query(Board).filter(Board.id == list_obj.board_id).first()
+    board = await db.get(Board, list_obj.board_id)
     if not board or board.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="No tienes permiso para crear tarjetas en esta lista")
     
@@ -32,46 +34,45 @@ def create_card(card_data: CardCreate, db: Session = Depends(get_db), current_us
         order=0
     )
     db.add(card)
-    db.commit()
-    db.refresh(card)
+    await db.commit()
+    await db.refresh(card)
     return card
 
 # Listar tarjetas del usuario autenticado
 @router.get("/", response_model=list[CardOut])
-def read_cards(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def read_cards(db: AsyncSession = Depends(get_read_db), current_user: AuthenticatedUser = Depends(get_current_user_async)):
     # Obtener solo las tarjetas de boards que pertenecen al usuario
-    cards = (
-        db.query(Card)
+    cards = (await db.scalars(
+        select(Card)
         .join(List, Card.list_id == List.id)
         .join(Board, List.board_id == Board.id)
-        .filter(Board.user_id == current_user.id)
-        .all()
-    )
+        .where(Board.user_id == current_user.id)
+    )).all()
     return cards
 
 # Actualizar tarjeta
 @router.put("/{card_id}", response_model=CardOut)
-def update_card(card_id: int, card_data: CardUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    card = db.query(Card).filter(Card.id == card_id).first()
+async def update_card(card_id: int, card_data: CardUpdate, db: AsyncSession = Depends(get_async_db), current_user: AuthenticatedUser = Depends(get_current_user_async)):
+    card = await db.get(Card, card_id)
     if not card:
         raise HTTPException(status_code=404, detail="Tarjeta no encontrada")
     
     # Validar ownership a través de list -> board
-    list_obj = db.query(List).filter(List.id == card.list_id).first()
+    list_obj = await db.get(List, card.list_id)
     if not list_obj:
         raise HTTPException(status_code=404, detail="Lista no encontrada")
     
-    board = db.query(Board).filter(Board.id == list_obj.board_id).first()
+    board = await db.get(Board, list_obj.board_id)
     if not board or board.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="No tienes permiso para modificar esta tarjeta")
     
     # Si se cambia de lista, validar que la nueva lista también pertenece al usuario
     if card_data.list_id is not None and card_data.list_id != card.list_id:
-        new_list = db.query(List).filter(List.id == card_data.list_id).first()
+        new_list = await db.get(List, card_data.list_id)
         if not new_list:
             raise HTTPException(status_code=404, detail="Nueva lista no encontrada")
         
-        new_board = db.query(Board).filter(Board.id == new_list.board_id).first()
+        new_board = await db.get(Board, new_list.board_id)
         if not new_board or new_board.user_id != current_user.id:
             raise HTTPException(status_code=403, detail="No tienes permiso para mover la tarjeta a esta lista")
         
@@ -85,12 +86,11 @@ def update_card(card_id: int, card_data: CardUpdate, db: Session = Depends(get_d
     
     # Lógica de orden
     if card_data.order is not None:
-        cards_in_list = (
-            db.query(Card)
-            .filter(Card.list_id == card.list_id, Card.id != card.id)
+        cards_in_list = list((await db.scalars(
+            select(Card)
+            .where(Card.list_id == card.list_id, Card.id != card.id)
             .order_by(Card.order)
-            .all()
-        )
+        )).all())
         
         new_order = card_data.order
         cards_in_list.insert(new_order, card)
@@ -98,27 +98,27 @@ def update_card(card_id: int, card_data: CardUpdate, db: Session = Depends(get_d
         for idx, c in enumerate(cards_in_list):
             c.order = idx
     
-    db.commit()
-    db.refresh(card)
+    await db.commit()
+    await db.refresh(card)
     return card
 
 # Eliminar tarjeta
 @router.delete("/{card_id}")
-def delete_card(card_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    card = db.query(Card).filter(Card.id == card_id).first()
+async def delete_card(card_id: int, db: AsyncSession = Depends(get_async_db), current_user: AuthenticatedUser = Depends(get_current_user_async)):
+    card = await db.get(Card, card_id)
     if not card:
         raise HTTPException(status_code=404, detail="Tarjeta no encontrada")
     
     # Validar ownership
-    list_obj = db.query(List).filter(List.id == card.list_id).first()
+    list_obj = await db.get(List, card.list_id)
     if not list_obj:
         raise HTTPException(status_code=404, detail="Lista no encontrada")
     
-    board = db.query(Board).filter(Board.id == list_obj.board_id).first()
+    board = await db.get(Board, list_obj.board_id)
     if not board or board.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="No tienes permiso para eliminar esta tarjeta")
     
-    db.delete(card)
-    db.commit()
+    await db.delete(card)
+    await db.commit()
     return {"detail": "Tarjeta eliminada"}
 
@@ -2,10 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from backend.core.config import get_db, ENVIRONMENT
 from backend.models.user import User
-from backend.routers.auth import get_current_user
+from backend.routers.auth import AuthenticatedUser, get_current_user
+from backend.core.timing import TimedRoute
 from datetime import datetime
 
-router = APIRouter(prefix="/health", tags=["health"])
+router = APIRouter(prefix="/health", tags=["health"], route_class=TimedRoute)
 
 @router.get("/")
 def health_check():
@@ -31,7 +32,7 @@ def health_check_db(db: Session = Depends(get_db)):
         raise HTTPException(status_code=503, detail=f"Database unhealthy: {str(e)}")
 
 @router.get("/metrics")
-def get_metrics(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_metrics(current_user: AuthenticatedUser = Depends(get_current_user), db: Session = Depends(get_db)):
     """Métricas básicas protegidas (requiere autenticación)"""
     from backend.models.board import Board
     from backend.models.list import List
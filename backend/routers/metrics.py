@@ -0,0 +1,119 @@
+import hmac
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from backend.core.config import (
+    engine, async_engine_created, get_async_engine, DB_MAX_OVERFLOW, DB_ASYNC_MAX_OVERFLOW,
+    METRICS_TOKEN, METRICS_MULTIPROC_DIR, METRICS_FLUSH_SECONDS
+)
+from backend.core.db_pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+from backend.core.hashing import password_hasher
+from backend.core.metrics import MultiProcessStore, family, prune_stale_directories, registry, render
+from backend.core.replicas import replica_router
+from backend.core.timing import TimedRoute
+from backend.routers.auth import api_key_cache, token_cache, user_cache
+
+router = APIRouter(tags=["metrics"], route_class=TimedRoute)
+
+# Starlette añade "; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Los workers de gunicorn comparten el proceso maestro: un subdirectorio por despliegue
+metrics_store: Optional[MultiProcessStore] = None
+if METRICS_MULTIPROC_DIR:
+    metrics_store = MultiProcessStore(
+        os.path.join(METRICS_MULTIPROC_DIR, str(os.getppid())), registry, flush_interval=METRICS_FLUSH_SECONDS
+    )
+
+
+def _db_pool_families():
+    pools = [("sync", engine.pool, DB_MAX_OVERFLOW)]
+    if async_engine_created():
+        pools.append(("async", get_async_engine().pool, DB_ASYNC_MAX_OVERFLOW))
+    pools.extend(
+        (f"replica:{replica.name}", replica.engine.pool, DB_ASYNC_MAX_OVERFLOW) for replica in replica_router.replicas
+    )
+    # Solo los pools instrumentados (SQLite usa el pool por defecto de SQLAlchemy)
+    pools = [entry for entry in pools if isinstance(entry[1], (InstrumentedQueuePool, InstrumentedAsyncQueuePool))]
+    if not pools:
+        return []
+    return [
+        family("neocare_db_pool_size", "gauge", "Tamaño configurado del pool de conexiones", ("pool",),
+               [((name,), pool.size()) for name, pool, _ in pools]),
+        family("neocare_db_pool_max_overflow", "gauge", "Conexiones de overflow permitidas", ("pool",),
+               [((name,), max_overflow) for name, _, max_overflow in pools]),
+        family("neocare_db_pool_connections", "gauge", "Conexiones del pool por estado", ("pool", "state"), [
+            sample
+            for name, pool, _ in pools
+            for sample in (
+                ((name, "checked_out"), pool.checkedout()),
+                ((name, "idle"), pool.checkedin()),
+                ((name, "overflow"), max(pool.overflow(), 0)),
+            )
+        ]),
+    ]
+
+
+def _replica_families():
+    if not replica_router.enabled:
+        return []
+    return [
+        family("neocare_db_replica_healthy", "gauge", "1 si la réplica recibe lecturas (0 durante el cooldown)",
+               ("replica",), [((replica.name,), int(replica.healthy)) for replica in replica_router.replicas]),
+        family("neocare_db_replica_sessions", "gauge", "Sesiones de lectura abiertas en cada réplica",
+               ("replica",), [((replica.name,), replica.in_use) for replica in replica_router.replicas]),
+    ]
+
+
+def _auth_cache_families():
+    caches = (("user", user_cache), ("token", token_cache), ("api_key", api_key_cache))
+    return [
+        family("neocare_auth_cache_hits_total", "counter", "Aciertos de los caches de autenticación",
+               ("cache",), [((name,), cache.hits) for name, cache in caches]),
+        family("neocare_auth_cache_misses_total", "counter", "Fallos de los caches de autenticación",
+               ("cache",), [((name,), cache.misses) for name, cache in caches]),
+        family("neocare_auth_cache_entries", "gauge", "Entradas en los caches de autenticación",
+               ("cache",), [((name,), len(cache)) for name, cache in caches]),
+    ]
+
+
+def _password_hash_families():
+    stats = password_hasher.stats()
+    return [
+        family("neocare_password_hash_in_flight", "gauge", "Hashes de contraseña en curso", (), [((), stats["in_flight"])]),
+        family("neocare_password_hash_waiting", "gauge", "Hashes de contraseña en cola", (), [((), stats["waiting"])]),
+        family("neocare_password_hash_rejected_total", "counter", "Hashes rechazados con 503 por saturación",
+               (), [((), stats["rejected"])]),
+    ]
+
+
+registry.add_collector(_db_pool_families)
+registry.add_collector(_replica_families)
+registry.add_collector(_auth_cache_families)
+registry.add_collector(_password_hash_families)
+
+
+def start_metrics() -> None:
+    if metrics_store is not None:
+        prune_stale_directories(METRICS_MULTIPROC_DIR, metrics_store.directory)
+        metrics_store.start()
+
+
+def stop_metrics() -> None:
+    if metrics_store is not None:
+        metrics_store.stop()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_prometheus_metrics(authorization: Optional[str] = Header(default=None)):
+    """Métricas en formato de texto de Prometheus, agregadas entre workers"""
+    if METRICS_TOKEN:
+        scheme, _, token = (authorization or "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(token, METRICS_TOKEN):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token de métricas inválido")
+
+    families = metrics_store.collect() if metrics_store is not None else registry.collect()
+    return PlainTextResponse(render(families), media_type=PROMETHEUS_CONTENT_TYPE)
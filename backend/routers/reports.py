@@ -1,13 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, case
-from backend.core.config import get_db
+from sqlalchemy import func, case, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from backend.models.worklog import Worklog
 from backend.models.card import Card
 from backend.models.list import List
 from backend.models.board import Board
 from backend.models.user import User
-from backend.routers.auth import get_current_user
+from backend.routers.auth import AuthenticatedUser, get_current_user_async, get_read_db
+from backend.core.timing import TimedRoute
 from backend.schemas.report import (
     WeeklySummaryResponse,
     HoursByUserResponse,
@@ -19,7 +19,8 @@ from datetime import date, datetime, timedelta
 from typing import Optional
 
 router = APIRouter(
-    tags=["reports"]
+    tags=["reports"],
+    route_class=TimedRoute
 )
 
 # Helper function to get ISO week from date
@@ -50,9 +51,9 @@ def get_week_dates(week_str: str) -> tuple[date, date]:
         raise HTTPException(status_code=422, detail="Invalid week format. Use YYYY-WW")
 
 # Helper function to validate board ownership
-def validate_board_access(board_id: int, user_id: int, db: Session) -> Board:
+async def validate_board_access(board_id: int, user_id: int, db: AsyncSession) -> Board:
     """Validates that the user owns the board"""
-    board = db.query(Board).filter(Board.id == board_id).first()
+    board = await db.get(Board, board_id)
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
 
@@ -63,11 +64,11 @@ def validate_board_access(board_id: int, user_id: int, db: Session) -> Board:
 
 # GET /report/{board_id}/summary
 @router.get("/report/{board_id}/summary", response_model=WeeklySummaryResponse)
-def get_weekly_summary(
+async def get_weekly_summary(
     board_id: int,
     week: Optional[str] = Query(None, description="Week in ISO format (YYYY-WW). Defaults to current week."),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: AuthenticatedUser = Depends(get_current_user_async)
 ):
     """
     Get weekly summary report for a board.
@@ -78,7 +79,7 @@ def get_weekly_summary(
     - Week format: YYYY-WW (ISO 8601)
     """
     # Validate board access
-    validate_board_access(board_id, current_user.id, db)
+    await validate_board_access(board_id, current_user.id, db)
 
     # Determine the target week
     if week:
@@ -90,8 +91,7 @@ def get_weekly_summary(
     week_start, week_end = get_week_dates(target_week)
 
     # Get all lists for this board
-    list_ids = db.query(List.id).filter(List.board_id == board_id).all()
-    list_ids = [lid[0] for lid in list_ids]
+    list_ids = (await db.scalars(select(List.id).where(List.board_id == board_id))).all()
 
     if not list_ids:
         # Board has no lists, return zeros
@@ -107,17 +107,17 @@ def get_weekly_summary(
     # Overdue: cards not completed and created before this week
     # New: cards created during this week
 
-    completed_count = db.query(func.count(Card.id)).filter(
+    completed_count = await db.scalar(select(func.count(Card.id)).where(
         Card.list_id.in_(list_ids),
         Card.status.in_(['done', 'completed'])
-    ).scalar() or 0
+    )) or 0
 
     # For overdue: cards not in done/completed status that were created before this week
     # Assuming we don't have a due_date field, we'll count pending cards created before this week
-    overdue_count = db.query(func.count(Card.id)).filter(
+    overdue_count = await db.scalar(select(func.count(Card.id)).where(
         Card.list_id.in_(list_ids),
         ~Card.status.in_(['done', 'completed'])
-    ).scalar() or 0
+    )) or 0
 
     # New cards created during the week
     # Note: Card model doesn't have created_at, so we'll return 0 for now
@@ -138,11 +138,11 @@ def get_weekly_summary(
 
 # GET /report/{board_id}/hours-by-user
 @router.get("/report/{board_id}/hours-by-user", response_model=HoursByUserReport)
-def get_hours_by_user(
+async def get_hours_by_user(
     board_id: int,
     week: Optional[str] = Query(None, description="Week in ISO format (YYYY-WW). Defaults to current week."),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: AuthenticatedUser = Depends(get_current_user_async)
 ):
     """
     Get hours worked by each user on a board for a specific week.
@@ -153,7 +153,7 @@ def get_hours_by_user(
     - Week format: YYYY-WW (ISO 8601)
     """
     # Validate board access
-    validate_board_access(board_id, current_user.id, db)
+    await validate_board_access(board_id, current_user.id, db)
 
     # Determine the target week
     if week:
@@ -165,11 +165,11 @@ def get_hours_by_user(
     week_start, week_end = get_week_dates(target_week)
 
     # Get all lists for this board
-    list_ids = db.query(List.id).filter(List.board_id == board_id).subquery()
+    list_ids = select(List.id).where(List.board_id == board_id)
 
     # Optimized query: GROUP BY user with SUM and COUNT aggregations
-    results = (
-        db.query(
+    results = (await db.execute(
+        select(
             User.id.label('user_id'),
             User.username.label('username'),
             func.sum(Worklog.hours).label('total_hours'),
@@ -177,14 +177,13 @@ def get_hours_by_user(
         )
         .join(Worklog, User.id == Worklog.user_id)
         .join(Card, Worklog.card_id == Card.id)
-        .filter(
+        .where(
             Card.list_id.in_(list_ids),
             Worklog.date >= week_start,
             Worklog.date <= week_end
         )
         .group_by(User.id, User.username)
-        .all()
-    )
+    )).all()
 
     # Convert to response objects
     users = [
@@ -204,11 +203,11 @@ def get_hours_by_user(
 
 # GET /report/{board_id}/hours-by-card
 @router.get("/report/{board_id}/hours-by-card", response_model=HoursByCardReport)
-def get_hours_by_card(
+async def get_hours_by_card(
     board_id: int,
     week: Optional[str] = Query(None, description="Week in ISO format (YYYY-WW). Defaults to current week."),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: AuthenticatedUser = Depends(get_current_user_async)
 ):
     """
     Get hours worked on each card for a specific week.
@@ -219,7 +218,7 @@ def get_hours_by_card(
     - Week format: YYYY-WW (ISO 8601)
     """
     # Validate board access
-    validate_board_access(board_id, current_user.id, db)
+    await validate_board_access(board_id, current_user.id, db)
 
     # Determine the target week
     if week:
@@ -231,26 +230,25 @@ def get_hours_by_card(
     week_start, week_end = get_week_dates(target_week)
 
     # Get all lists for this board
-    list_ids = db.query(List.id).filter(List.board_id == board_id).subquery()
+    list_ids = select(List.id).where(List.board_id == board_id)
 
     # Optimized query: GROUP BY card with SUM aggregation
     # Note: Card model doesn't have 'responsible' field, so we'll leave it as None
-    results = (
-        db.query(
+    results = (await db.execute(
+        select(
             Card.id.label('card_id'),
             Card.title.label('title'),
             Card.status.label('status'),
             func.sum(Worklog.hours).label('total_hours')
         )
         .join(Worklog, Card.id == Worklog.card_id)
-        .filter(
+        .where(
             Card.list_id.in_(list_ids),
             Worklog.date >= week_start,
             Worklog.date <= week_end
         )
         .group_by(Card.id, Card.title, Card.status)
-        .all()
-    )
+    )).all()
 
     # Convert to response objects
     cards = [
@@ -1,18 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from backend.core.config import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.config import get_async_db
 from backend.models.worklog import Worklog
 from backend.models.card import Card
 from backend.models.list import List
 from backend.models.board import Board
-from backend.models.user import User
-from backend.routers.auth import get_current_user
+from backend.routers.auth import AuthenticatedUser, get_current_user_async, get_read_db
 from backend.schemas.worklog import WorklogCreate, WorklogUpdate, WorklogOut, WeeklyWorklogResponse
+from backend.core.timing import TimedRoute
 from datetime import date, datetime, timedelta
 from typing import Optional
 
 router = APIRouter(
-    tags=["worklogs"]
+    tags=["worklogs"],
+    route_class=TimedRoute
 )
 
 # Helper function to get ISO week from date
@@ -43,18 +45,18 @@ def get_week_dates(week_str: str) -> tuple[date, date]:
         raise HTTPException(status_code=422, detail="Invalid week format. Use YYYY-WW")
 
 # Helper function to validate card ownership
-def validate_card_access(card_id: int, user_id: int, db: Session) -> Card:
+async def validate_card_access(card_id: int, user_id: int, db: AsyncSession) -> Card:
     """Validates that the user has access to the card through board ownership"""
-    card = db.query(Card).filter(Card.id == card_id).first()
+    card = await db.get(Card, card_id)
     if not card:
         raise HTTPException(status_code=404, detail="Card not found")
 
     # Get the list and board
-    list_obj = db.query(List).filter(List.id == card.list_id).first()
+    list_obj = await db.get(List, card.list_id)
     if not list_obj:
         raise HTTPException(status_code=404, detail="List not found")
 
-    board = db.query(Board).filter(Board.id == list_obj.board_id).first()
+    board = await db.get(Board, list_obj.board_id)
     if not board or board.user_id != user_id:
         raise HTTPException(status_code=403, detail="You don't have access to this card")
 
@@ -62,11 +64,11 @@ def validate_card_access(card_id: int, user_id: int, db: Session) -> Card:
 
 # Create worklog for a card
 @router.post("/cards/{card_id}/worklogs", response_model=WorklogOut, status_code=201)
-def create_worklog(
+async def create_worklog(
     card_id: int,
     worklog_data: WorklogCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_user_async)
 ):
     """
     Create a new worklog entry for a card.
@@ -78,7 +80,7 @@ def create_worklog(
     - Note is optional (max 200 characters)
     """
     # Validate card access
-    validate_card_access(card_id, current_user.id, db)
+    await validate_card_access(card_id, current_user.id, db)
 
     # Create worklog
     worklog = Worklog(
@@ -90,17 +92,17 @@ def create_worklog(
     )
 
     db.add(worklog)
-    db.commit()
-    db.refresh(worklog)
+    await db.commit()
+    await db.refresh(worklog)
 
     return worklog
 
 # Get all worklogs for a card
 @router.get("/cards/{card_id}/worklogs", response_model=list[WorklogOut])
-def get_card_worklogs(
+async def get_card_worklogs(
     card_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: AuthenticatedUser = Depends(get_current_user_async)
 ):
     """
     Get all worklogs for a specific card.
@@ -111,25 +113,24 @@ def get_card_worklogs(
     - Ordered by date descending
     """
     # Validate card access
-    validate_card_access(card_id, current_user.id, db)
+    await validate_card_access(card_id, current_user.id, db)
 
     # Get all worklogs for this card
-    worklogs = (
-        db.query(Worklog)
-        .filter(Worklog.card_id == card_id)
+    worklogs = (await db.scalars(
+        select(Worklog)
+        .where(Worklog.card_id == card_id)
         .order_by(Worklog.date.desc())
-        .all()
-    )
+    )).all()
 
     return worklogs
 
 # Update a worklog (only owner can update)
 @router.patch("/worklogs/{worklog_id}", response_model=WorklogOut)
-def update_worklog(
+async def update_worklog(
     worklog_id: int,
     worklog_data: WorklogUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_user_async)
 ):
     """
     Update a worklog entry.
@@ -138,7 +139,7 @@ def update_worklog(
     - Only the author can update their worklog
     - Can only update hours and note (not date or card)
     """
-    worklog = db.query(Worklog).filter(Worklog.id == worklog_id).first()
+    worklog = await db.get(Worklog, worklog_id)
 
     if not worklog:
         raise HTTPException(status_code=404, detail="Worklog not found")
@@ -154,17 +155,17 @@ def update_worklog(
     if worklog_data.note is not None:
         worklog.note = worklog_data.note
 
-    db.commit()
-    db.refresh(worklog)
+    await db.commit()
+    await db.refresh(worklog)
 
     return worklog
 
 # Delete a worklog (only owner can delete)
 @router.delete("/worklogs/{worklog_id}", status_code=204)
-def delete_worklog(
+async def delete_worklog(
     worklog_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_user_async)
 ):
     """
     Delete a worklog entry.
@@ -172,7 +173,7 @@ def delete_worklog(
     - Requires JWT authentication
     - Only the author can delete their worklog
     """
-    worklog = db.query(Worklog).filter(Worklog.id == worklog_id).first()
+    worklog = await db.get(Worklog, worklog_id)
 
     if not worklog:
         raise HTTPException(status_code=404, detail="Worklog not found")
@@ -181,17 +182,17 @@ def delete_worklog(
     if worklog.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="You can only delete your own worklogs")
 
-    db.delete(worklog)
-    db.commit()
+    await db.delete(worklog)
+    await db.commit()
 
     return None
 
 # Get weekly worklogs for current user
 @router.get("/users/me/worklogs", response_model=WeeklyWorklogResponse)
-def get_my_weekly_worklogs(
+async def get_my_weekly_worklogs(
     week: Optional[str] = Query(None, description="Week in ISO format (YYYY-WW). Defaults to current week."),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: AuthenticatedUser = Depends(get_current_user_async)
 ):
     """
     Get worklogs for the current user for a specific week.
@@ -212,16 +213,15 @@ def get_my_weekly_worklogs(
     week_start, week_end = get_week_dates(target_week)
 
     # Get worklogs for the user in this week
-    worklogs = (
-        db.query(Worklog)
-        .filter(
+    worklogs = (await db.scalars(
+        select(Worklog)
+        .where(
             Worklog.user_id == current_user.id,
             Worklog.date >= week_start,
             Worklog.date <= week_end
         )
         .order_by(Worklog.date.desc())
-        .all()
-    )
+    )).all()
 
     # Calculate daily totals
     daily_totals = {}
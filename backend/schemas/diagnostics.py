@@ -0,0 +1,81 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Any, Optional
+
+class SlowQueryOut(BaseModel):
+    """Schema for a captured slow SQL statement"""
+    id: int = Field(..., description="Sequential ID within this worker")
+    timestamp: datetime = Field(..., description="When the statement finished (UTC)")
+    method: Optional[str] = Field(None, description="HTTP method of the calling request")
+    route: Optional[str] = Field(None, description="Route template of the calling request")
+    duration_ms: float = Field(..., description="Execution time")
+    statement: str = Field(..., description="SQL statement with bound-parameter placeholders")
+    parameter_shapes: Any = Field(None, description="Types of the bound parameters (values are never stored)")
+    plan: Any = Field(None, description="Query plan, once EXPLAIN has run")
+    plan_status: str = Field(..., description="pending, done, skipped, unsupported or error")
+
+class SlowQueryLogOut(BaseModel):
+    """Schema for the slow-query ring buffer of one worker"""
+    pid: int = Field(..., description="Worker process that served the request")
+    threshold_ms: float = Field(..., description="Capture threshold")
+    capacity: int = Field(..., description="Ring buffer size")
+    queries: list[SlowQueryOut] = Field(..., description="Captured statements, newest first")
+
+class ProfileSummary(BaseModel):
+    """Schema for a stored sampling profile"""
+    id: int = Field(..., description="Profile ID within this worker")
+    name: str = Field(..., description="live or the profiled request (METHOD /path)")
+    started_at: datetime = Field(..., description="When sampling started (UTC)")
+    duration_s: float = Field(..., description="Sampling duration")
+    interval_ms: float = Field(..., description="Sampling interval")
+    samples: int = Field(..., description="Sampling passes over all threads")
+    stacks: int = Field(..., description="Non-idle thread stacks recorded")
+    overhead_pct: float = Field(..., description="Sampler CPU time as a share of the duration")
+
+class TracemallocStatus(BaseModel):
+    """Schema for the tracemalloc state of one worker"""
+    pid: int = Field(..., description="Worker process that served the request")
+    tracing: bool = Field(..., description="Whether tracemalloc is recording allocations")
+    frames: int = Field(..., description="Frames stored per allocation traceback")
+    traced_bytes: int = Field(..., description="Memory currently traced")
+    peak_traced_bytes: int = Field(..., description="Peak traced memory since tracing started")
+    overhead_bytes: int = Field(..., description="Memory used by tracemalloc itself")
+
+class MemorySnapshotOut(BaseModel):
+    """Schema for a stored tracemalloc snapshot"""
+    id: int = Field(..., description="Snapshot ID within this worker")
+    taken_at: datetime = Field(..., description="When the snapshot was taken (UTC)")
+    traced_bytes: int = Field(..., description="Traced memory in the snapshot")
+    traces: int = Field(..., description="Traced allocations in the snapshot")
+
+class AllocationDiff(BaseModel):
+    """Schema for one allocation site in a snapshot diff"""
+    location: str = Field(..., description="module:line, module or traceback, depending on group_by")
+    size_bytes: int = Field(..., description="Size in the newer snapshot")
+    size_diff_bytes: int = Field(..., description="Growth since the older snapshot")
+    count: int = Field(..., description="Allocations in the newer snapshot")
+    count_diff: int = Field(..., description="Allocation count growth")
+
+class MemoryDiffOut(BaseModel):
+    """Schema for the top allocation differences between two snapshots"""
+    pid: int = Field(..., description="Worker process that served the request")
+    from_id: int = Field(..., description="Older snapshot")
+    to_id: int = Field(..., description="Newer snapshot (taken now if not given)")
+    group_by: str = Field(..., description="lineno, filename or traceback")
+    size_diff_bytes: int = Field(..., description="Total growth across all allocation sites")
+    top: list[AllocationDiff] = Field(..., description="Largest differences first")
+
+class ObjectCount(BaseModel):
+    """Schema for the live object count of one type"""
+    type: str = Field(..., description="Type name")
+    count: int = Field(..., description="Live objects tracked by the garbage collector")
+
+class MemoryReport(BaseModel):
+    """Schema for the memory usage of one worker"""
+    pid: int = Field(..., description="Worker process that served the request")
+    rss_bytes: Optional[int] = Field(None, description="Current resident set size")
+    peak_rss_bytes: Optional[int] = Field(None, description="Peak resident set size")
+    gc_counts: list[int] = Field(..., description="Pending collections per GC generation")
+    components: dict[str, Optional[int]] = Field(..., description="Entries held by in-process caches and buffers")
+    objects: list[ObjectCount] = Field(..., description="Most common live object types")
+    tracemalloc: TracemallocStatus
@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+class ProvisioningRowResult(BaseModel):
+    """Schema for the result of a single provisioned row"""
+    row: int = Field(..., description="Row number in the input (starting at 1)")
+    email: Optional[str] = Field(None, description="Email of the row")
+    status: str = Field(..., description="created, error or conflict (email registered concurrently)")
+    id: Optional[int] = Field(None, description="ID of the created user")
+    default_board_id: Optional[int] = Field(None, description="ID of the default board")
+    error: Optional[str] = Field(None, description="Reason why the row was rejected")
+
+class ProvisioningReport(BaseModel):
+    """Schema for a bulk provisioning report"""
+    total: int = Field(..., description="Rows received")
+    created: int = Field(..., description="Users created")
+    failed: int = Field(..., description="Rows rejected")
+    elapsed_ms: float = Field(..., description="Total processing time")
+    rows_per_second: float = Field(..., description="Throughput over created rows")
+    results: list[ProvisioningRowResult] = Field(..., description="Per-row results")
@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# La configuración se lee al importar backend.core.config; los procesos hijos la heredan
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="neocare_tests_"), "app.db"))
+os.environ.setdefault("SECRET_KEY", "neocare-tests-" + "x" * 32)
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+os.environ.setdefault("METRICS_MULTIPROC_DIR", "")
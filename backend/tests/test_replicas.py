@@ -0,0 +1,63 @@
+import multiprocessing
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.core.replicas import ReplicaRouter, SQLiteWriteTracker
+
+REPLICA_URL = "postgresql://postgres@replica-1:5432/neocare"
+
+
+def _router(path: str) -> ReplicaRouter:
+    # Sin engines: el enrutado por escritura reciente no abre conexiones
+    return ReplicaRouter(
+        [REPLICA_URL], read_your_writes=5, write_tracker=SQLiteWriteTracker(path),
+        engine_factory=lambda url, poolclass: None
+    )
+
+
+def _note_write(path: str, user_id: int) -> None:
+    _router(path).note_write(user_id)
+
+
+def _recently_wrote(path: str, user_id: int) -> bool:
+    return _router(path).recently_wrote(user_id)
+
+
+def _in_worker(fn, *args):
+    # Un proceso nuevo por llamada, como dos workers de gunicorn distintos
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as worker:
+        return worker.submit(fn, *args).result()
+
+
+def test_read_your_writes_across_workers(tmp_path):
+    path = str(tmp_path / "writes.sqlite3")
+    _in_worker(_note_write, path, 7)
+
+    assert _in_worker(_recently_wrote, path, 7) is True
+    assert _in_worker(_recently_wrote, path, 8) is False
+
+
+def test_locked_tracker_keeps_write_in_worker(tmp_path):
+    path = str(tmp_path / "writes.sqlite3")
+    router = _router(path)
+    router.note_write(7)
+
+    # Otro proceso retiene el bloqueo de escritura (en WAL las lecturas siguen funcionando)
+    lock = sqlite3.connect(path, isolation_level=None)
+    lock.execute("BEGIN EXCLUSIVE")
+    try:
+        start = time.perf_counter()
+        router.note_write(8)
+        assert time.perf_counter() - start < 1
+        assert router.recently_wrote(7) is True
+        assert router.recently_wrote(8) is True
+    finally:
+        lock.execute("ROLLBACK")
+        lock.close()
+
+
+def test_unreadable_tracker_routes_to_primary(tmp_path):
+    # Un directorio no se puede abrir como base de datos: sin registro, se lee del primario
+    router = _router(str(tmp_path))
+    assert router.recently_wrote(7) is True
@@ -11,6 +11,14 @@ if [ -z "$DATABASE_URL" ]; then
     exit 1
 fi
 
-# Iniciar aplicación directamente sin migraciones
+# IP del cliente tras el proxy de la plataforma (rate limit y bloqueo de login por IP)
+export FORWARDED_PROXY_HOPS=${FORWARDED_PROXY_HOPS:-1}
+# Producción: exige METRICS_TOKEN para /metrics (o METRICS_ENABLED=false)
+export ENVIRONMENT=${ENVIRONMENT:-production}
+
+# Migraciones: crean el esquema completo o completan uno creado con create_all
+echo "Running migrations..."
+alembic -c backend/alembic.ini upgrade head
+
 echo "Starting Uvicorn..."
 exec uvicorn backend.main:app --host 0.0.0.0 --port ${PORT:-8000}